@@ -1,17 +1,24 @@
 from __future__ import unicode_literals
 import base64
+import copy
 import hmac
+import threading
 import time
 import uuid
+import weakref
 
 from django.conf import settings
 from django.contrib.auth import authenticate
-from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import get_cache
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.db.models import signals
 from django.middleware.csrf import _sanitize_token, constant_time_compare
+from django.utils import six
+from django.utils.encoding import force_bytes
 from django.utils.http import same_origin
 from django.utils.translation import ugettext as _
 from tastypie.http import HttpUnauthorized
-from tastypie.compat import User, username_field
+from tastypie.compat import OrderedDict, User, username_field
 
 try:
     from hashlib import sha1
@@ -35,6 +42,221 @@ except ImportError:
     oauth_provider = None
 
 
+# Every ``CredentialCache`` in the process, so saving/deleting a user can
+# reach them all. (A ``WeakKeyDictionary``, as ``WeakSet`` is Python 2.7+.)
+_credential_caches = weakref.WeakKeyDictionary()
+
+
+def invalidate_user_credentials(sender, instance, **kwargs):
+    """
+    A signal for dropping any verified credentials of a saved/deleted user.
+    """
+    if instance.pk is None:
+        return
+
+    for credential_cache in list(_credential_caches.keys()):
+        credential_cache.invalidate(instance.pk)
+
+
+def invalidate_api_key_credentials(sender, instance, **kwargs):
+    """
+    A signal for dropping any verified credentials of the user whose
+    ``ApiKey`` was saved/deleted.
+    """
+    try:
+        user = instance.user
+    except ObjectDoesNotExist:
+        return
+
+    invalidate_user_credentials(sender, user)
+
+
+def connect_credential_cache_signals():
+    """
+    Hooks up the signals that keep ``CredentialCache`` instances current.
+    Safe to call repeatedly.
+    """
+    from tastypie.compat import User
+
+    if User is not None:
+        signals.post_save.connect(invalidate_user_credentials, sender=User, dispatch_uid='tastypie_user_credentials_saved')
+        signals.post_delete.connect(invalidate_user_credentials, sender=User, dispatch_uid='tastypie_user_credentials_deleted')
+
+    if 'django.contrib.auth' in settings.INSTALLED_APPS:
+        from tastypie.models import ApiKey
+
+        if not ApiKey._meta.abstract:
+            signals.post_save.connect(invalidate_api_key_credentials, sender=ApiKey, dispatch_uid='tastypie_api_key_credentials_saved')
+            signals.post_delete.connect(invalidate_api_key_credentials, sender=ApiKey, dispatch_uid='tastypie_api_key_credentials_deleted')
+
+
+class CredentialCache(object):
+    """
+    Remembers which credentials have recently been verified & who they belong
+    to, so they don't need checking against the database on every request.
+
+    Verified users are kept for ``timeout`` seconds in an in-process LRU (of
+    up to ``max_entries``) &, if a ``cache_name`` is given, in that Django
+    cache as well, so other processes can share them. Only a keyed hash of
+    the credentials is ever used as a cache key.
+
+    Saving or deleting a user (or their ``ApiKey``) invalidates their entries
+    in this process & in the shared cache. Entries are tied to the user's
+    ``pk``, not the username they logged in with, so this works whichever
+    auth backend checked them. The in-process entries of *other*
+    processes can't be reached, so those stay until they expire. Keep the
+    ``timeout`` short.
+    """
+    def __init__(self, timeout=60, max_entries=1000, cache_name=None, key_prefix='tastypie_credentials'):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self.cache = None
+
+        if cache_name is not None:
+            self.cache = get_cache(cache_name)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        _credential_caches[self] = True
+        connect_credential_cache_signals()
+
+    def make_key(self, username, secret):
+        """
+        Builds the cache key for a username & secret (API key, password...).
+        """
+        digest = hmac.new(force_bytes(settings.SECRET_KEY), digestmod=sha1)
+        digest.update(force_bytes(username))
+        digest.update(b'\0')
+        digest.update(force_bytes(secret))
+        return '%s_%s' % (self.key_prefix, digest.hexdigest())
+
+    def make_revoked_key(self, user_pk):
+        """
+        Builds the cache key recording when a user's credentials were last
+        invalidated.
+        """
+        return '%s_revoked_%s' % (self.key_prefix, sha1(force_bytes(user_pk)).hexdigest())
+
+    def get(self, username, secret):
+        """
+        Returns a copy of the user the credentials were verified for, or
+        ``None`` if they haven't been (recently).
+        """
+        key = self.make_key(username, secret)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None and entry[2] + self.timeout > time.time():
+                # Most recently used goes last.
+                self._entries[key] = entry
+                return copy.copy(entry[1])
+
+        if self.cache is None:
+            return None
+
+        shared = self.cache.get(key)
+
+        try:
+            verified, user_pk, user = shared
+        except (TypeError, ValueError):
+            # Missing, or left over from an older format.
+            return None
+
+        if verified <= self.cache.get(self.make_revoked_key(user_pk), 0):
+            return None
+
+        self._remember(key, user_pk, user, verified)
+        return copy.copy(user)
+
+    def set(self, username, secret, user, user_pk=None, shared=True):
+        """
+        Records that the credentials were verified for ``user`` (or whatever
+        else the authentication class needs to remember).
+
+        ``user_pk`` is what ``invalidate`` matches the entry on. It defaults
+        to ``user.pk``, so it only needs passing when ``user`` isn't a user.
+
+        With ``shared=False``, the entry is only kept in-process, even if
+        there's a shared cache (for anything too sensitive to put there).
+        """
+        if user_pk is None:
+            user_pk = user.pk
+
+        key = self.make_key(username, secret)
+        verified = time.time()
+        self._remember(key, user_pk, user, verified)
+
+        if self.cache is not None and shared:
+            self.cache.set(key, (verified, user_pk, user), self.timeout)
+
+    def invalidate(self, user_pk):
+        """
+        Forgets every verified credential for the user with the given ``pk``.
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] == user_pk]:
+                del self._entries[key]
+
+        if self.cache is not None:
+            # Anything verified before now is stale. Shared entries can't
+            # outlive the timeout, so neither needs this.
+            self.cache.set(self.make_revoked_key(user_pk), time.time(), self.timeout)
+
+    def clear(self):
+        """
+        Forgets everything held in-process.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, user_pk, user, verified):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (user_pk, user, verified)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+
+class DigestNonceStore(object):
+    """
+    Keeps track of the Digest nonces (& nonce counts) that have been used, in
+    a Django cache, so old nonces expire & replayed requests are turned away.
+
+    Nonces are good for ``timeout`` seconds after being issued. Each nonce
+    count can only be used once per nonce. Clients which don't send a ``qop``
+    (& so no nonce count) can only be held to the expiry.
+    """
+    def __init__(self, cache_name='default', timeout=300, key_prefix='tastypie_digest_nonce'):
+        self.cache = get_cache(cache_name)
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    def is_expired(self, nonce):
+        """
+        Checks whether the nonce is too old to be used.
+        """
+        timestamp = python_digest.get_nonce_timestamp(nonce)
+        return timestamp is None or timestamp + self.timeout < time.time()
+
+    def use(self, nonce, nonce_count):
+        """
+        Records the nonce count as used. Returns ``False`` if it already had
+        been (i.e. the request is a replay).
+
+        Without a ``nonce_count``, there's nothing to track, so it's always
+        allowed.
+        """
+        if not nonce_count:
+            return True
+
+        key = '%s_%s_%s' % (self.key_prefix, sha1(force_bytes(nonce)).hexdigest(), nonce_count)
+        # ``add`` is atomic, so only one request can claim the count.
+        return bool(self.cache.add(key, 1, self.timeout))
+
+
 class Authentication(object):
     """
     A simple base class to establish the protocol for auth.
@@ -73,6 +295,33 @@ class Authentication(object):
 
         return user.is_active
 
+    def get_request_memo(self, request):
+        """
+        Returns a dictionary (specific to this instance & the ``request``)
+        for remembering the work already done authenticating/identifying the
+        request, so repeated calls during the same request are cheap.
+        """
+        try:
+            memos = request._tastypie_authentication
+        except AttributeError:
+            memos = request._tastypie_authentication = {}
+
+        return memos.setdefault(self, {})
+
+    def memoize_check(self, request, credentials, check):
+        """
+        Runs ``check`` (a callable returning the result of
+        ``is_authenticated``) once per request for the given ``credentials``,
+        returning the remembered result on subsequent calls.
+        """
+        memo = self.get_request_memo(request)
+
+        if 'result' not in memo or memo.get('credentials') != credentials:
+            memo['credentials'] = credentials
+            memo['result'] = check()
+
+        return memo['result']
+
 
 class BasicAuthentication(Authentication):
     """
@@ -89,11 +338,16 @@ class BasicAuthentication(Authentication):
     ``realm``
         The realm to use in the ``HttpUnauthorized`` response.  Default:
         ``django-tastypie``.
+    ``credential_cache``
+        A ``CredentialCache`` for remembering recently verified username &
+        password pairs, to avoid running the password hasher on every
+        request. Default: ``None``.
     """
-    def __init__(self, backend=None, realm='django-tastypie', **kwargs):
+    def __init__(self, backend=None, realm='django-tastypie', credential_cache=None, **kwargs):
         super(BasicAuthentication, self).__init__(**kwargs)
         self.backend = backend
         self.realm = realm
+        self.credential_cache = credential_cache
 
     def _unauthorized(self):
         response = HttpUnauthorized()
@@ -125,13 +379,25 @@ class BasicAuthentication(Authentication):
         if len(bits) != 2:
             return self._unauthorized()
 
-        if self.backend:
-            user = self.backend.authenticate(username=bits[0], password=bits[1])
-        else:
-            user = authenticate(username=bits[0], password=bits[1])
+        return self.memoize_check(request, tuple(bits), lambda: self._authenticate(request, bits[0], bits[1]))
+
+    def _authenticate(self, request, username, password):
+        user = None
+
+        if self.credential_cache is not None:
+            user = self.credential_cache.get(username, password)
 
         if user is None:
-            return self._unauthorized()
+            if self.backend:
+                user = self.backend.authenticate(username=username, password=password)
+            else:
+                user = authenticate(username=username, password=password)
+
+            if user is None:
+                return self._unauthorized()
+
+            if self.credential_cache is not None:
+                self.credential_cache.set(username, password, user)
 
         if not self.check_active(user):
             return False
@@ -155,7 +421,14 @@ class ApiKeyAuthentication(Authentication):
     Uses the ``ApiKey`` model that ships with tastypie. If you wish to use
     a different model, override the ``get_key`` method to perform the key check
     as suits your needs.
+
+    Optionally accepts a ``credential_cache`` (a ``CredentialCache``), which
+    skips the database entirely for recently verified keys.
     """
+    def __init__(self, credential_cache=None, **kwargs):
+        super(ApiKeyAuthentication, self).__init__(**kwargs)
+        self.credential_cache = credential_cache
+
     def _unauthorized(self):
         return HttpUnauthorized()
 
@@ -180,30 +453,85 @@ class ApiKeyAuthentication(Authentication):
         Should return either ``True`` if allowed, ``False`` if not or an
         ``HttpResponse`` if you need something custom.
         """
-        from tastypie.compat import User
+        memo = self.get_request_memo(request)
 
         try:
             username, api_key = self.extract_credentials(request)
         except ValueError:
+            memo.pop('identifier', None)
             return self._unauthorized()
 
+        # Remember who they claim to be for ``get_identifier``.
+        memo['identifier'] = username or 'nouser'
+
         if not username or not api_key:
             return self._unauthorized()
 
-        try:
-            lookup_kwargs = {username_field: username}
-            user = User.objects.get(**lookup_kwargs)
-        except (User.DoesNotExist, User.MultipleObjectsReturned):
-            return self._unauthorized()
+        return self.memoize_check(request, (username, api_key), lambda: self._authenticate(request, username, api_key))
+
+    def _authenticate(self, request, username, api_key):
+        from tastypie.compat import User
+
+        user = None
+
+        if self.credential_cache is not None:
+            user = self.credential_cache.get(username, api_key)
+
+        if user is None:
+            if six.get_method_function(self.get_key) is not six.get_unbound_function(ApiKeyAuthentication.get_key):
+                # A custom key check, so the user has to be looked up on
+                # its own.
+                try:
+                    lookup_kwargs = {username_field: username}
+                    user = User.objects.get(**lookup_kwargs)
+                except (User.DoesNotExist, User.MultipleObjectsReturned):
+                    return self._unauthorized()
+
+                if not self.check_active(user):
+                    return False
+
+                key_auth_check = self.get_key(user, api_key)
+
+                if key_auth_check and not isinstance(key_auth_check, HttpUnauthorized):
+                    request.user = user
+
+                    if self.credential_cache is not None:
+                        self.credential_cache.set(username, api_key, user)
+
+                return key_auth_check
+
+            user = self.get_user_for_key(username, api_key)
+
+            if user is None:
+                return self._unauthorized()
+
+            if self.credential_cache is not None:
+                self.credential_cache.set(username, api_key, user)
 
         if not self.check_active(user):
             return False
 
-        key_auth_check = self.get_key(user, api_key)
-        if key_auth_check and not isinstance(key_auth_check, HttpUnauthorized):
-            request.user = user
+        request.user = user
+        return True
 
-        return key_auth_check
+    def get_user_for_key(self, username, api_key):
+        """
+        Finds the user with the given username & API key, in a single query.
+        Returns ``None`` if there isn't one.
+
+        Used unless ``get_key`` has been overridden.
+        """
+        from tastypie.models import ApiKey
+
+        lookup_kwargs = {
+            'user__%s' % username_field: username,
+            'key': api_key,
+        }
+
+        try:
+            return ApiKey.objects.select_related('user').get(**lookup_kwargs).user
+        except (ApiKey.DoesNotExist, ApiKey.MultipleObjectsReturned):
+            return None
 
     def get_key(self, user, api_key):
         """
@@ -225,8 +553,13 @@ class ApiKeyAuthentication(Authentication):
 
         This implementation returns the user's username.
         """
-        username, api_key = self.extract_credentials(request)
-        return username or 'nouser'
+        memo = self.get_request_memo(request)
+
+        if 'identifier' not in memo:
+            username, api_key = self.extract_credentials(request)
+            memo['identifier'] = username or 'nouser'
+
+        return memo['identifier']
 
 
 class SessionAuthentication(Authentication):
@@ -299,16 +632,25 @@ class DigestAuthentication(Authentication):
     ``realm``
         The realm to use in the ``HttpUnauthorized`` response.  Default:
         ``django-tastypie``.
+    ``nonce_store``
+        A ``DigestNonceStore`` for expiring nonces & rejecting replayed
+        requests. Default: ``None``.
+    ``credential_cache``
+        A ``CredentialCache`` for remembering users & their partial digests,
+        to avoid looking them up on every request. These are only kept
+        in-process. Default: ``None``.
     """
-    def __init__(self, backend=None, realm='django-tastypie', **kwargs):
+    def __init__(self, backend=None, realm='django-tastypie', nonce_store=None, credential_cache=None, **kwargs):
         super(DigestAuthentication, self).__init__(**kwargs)
         self.backend = backend
         self.realm = realm
+        self.nonce_store = nonce_store
+        self.credential_cache = credential_cache
 
         if python_digest is None:
             raise ImproperlyConfigured("The 'python_digest' package could not be imported. It is required for use with the 'DigestAuthentication' class.")
 
-    def _unauthorized(self):
+    def _unauthorized(self, stale=False):
         response = HttpUnauthorized()
         new_uuid = uuid.uuid4()
         opaque = hmac.new(str(new_uuid).encode('utf-8'), digestmod=sha1).hexdigest()
@@ -317,7 +659,7 @@ class DigestAuthentication(Authentication):
             secret=getattr(settings, 'SECRET_KEY', ''),
             realm=self.realm,
             opaque=opaque,
-            stale=False
+            stale=stale
         )
         return response
 
@@ -339,26 +681,58 @@ class DigestAuthentication(Authentication):
         except:
             return self._unauthorized()
 
+        credentials = (request.method, request.META['HTTP_AUTHORIZATION'])
+        return self.memoize_check(request, credentials, lambda: self._authenticate(request))
+
+    def _authenticate(self, request):
         digest_response = python_digest.parse_digest_credentials(request.META['HTTP_AUTHORIZATION'])
 
+        if digest_response is None:
+            return self._unauthorized()
+
         # FIXME: Should the nonce be per-user?
         if not python_digest.validate_nonce(digest_response.nonce, getattr(settings, 'SECRET_KEY', '')):
             return self._unauthorized()
 
-        user = self.get_user(digest_response.username)
-        api_key = self.get_key(user)
+        if self.nonce_store is not None and self.nonce_store.is_expired(digest_response.nonce):
+            # Lets the client retry with a fresh nonce.
+            return self._unauthorized(stale=True)
 
-        if user is False or api_key is False:
-            return self._unauthorized()
+        user, partial_digest, cached = False, None, None
+
+        if self.credential_cache is not None:
+            cached = self.credential_cache.get(digest_response.username, self.realm)
+
+            if cached:
+                user, partial_digest = cached
+                user = copy.copy(user)
+
+        if not cached:
+            user = self.get_user(digest_response.username)
+            api_key = self.get_key(user)
+
+            if user is False or api_key is False:
+                return self._unauthorized()
+
+            partial_digest = python_digest.calculate_partial_digest(digest_response.username, self.realm, api_key)
 
         expected = python_digest.calculate_request_digest(
             request.method,
-            python_digest.calculate_partial_digest(digest_response.username, self.realm, api_key),
+            partial_digest,
             digest_response)
 
         if not digest_response.response == expected:
             return self._unauthorized()
 
+        # Only genuine requests get to use up a nonce count.
+        if self.nonce_store is not None and not self.nonce_store.use(digest_response.nonce, getattr(digest_response, 'nc', None)):
+            return self._unauthorized()
+
+        if self.credential_cache is not None and not cached:
+            # The partial digest is as good as the password, so it's kept out
+            # of any shared cache.
+            self.credential_cache.set(digest_response.username, self.realm, (user, partial_digest), user_pk=user.pk, shared=False)
+
         if not self.check_active(user):
             return False
 
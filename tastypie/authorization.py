@@ -1,4 +1,5 @@
 from __future__ import unicode_literals
+from django.core.cache import get_cache
 from tastypie.exceptions import TastypieError, Unauthorized
 
 
@@ -33,6 +34,19 @@ class Authorization(object):
         """
         return object_list
 
+    def read_list_filter(self, bundle):
+        """
+        Optionally returns a ``Q`` object limiting which objects the user is
+        allowed to read, so ``QuerySet``-based lists can be narrowed within
+        the database query (before ``read_list`` sees them).
+
+        ``read_list`` still receives any object lists that aren't
+        ``QuerySets``, so should keep doing its own filtering for those.
+
+        Returns ``None`` (no filter) by default.
+        """
+        return None
+
     def read_detail(self, object_list, bundle):
         """
         Returns either ``True`` if the user is allowed to read the object in
@@ -68,6 +82,19 @@ class Authorization(object):
         """
         return object_list
 
+    def update_list_filter(self, bundle):
+        """
+        Optionally returns a ``Q`` object limiting which objects the user is
+        allowed to update, so ``QuerySet``-based lists can be narrowed within
+        the database query (before ``update_list`` sees them).
+
+        ``update_list`` still receives any object lists that aren't
+        ``QuerySets``, so should keep doing its own filtering for those.
+
+        Returns ``None`` (no filter) by default.
+        """
+        return None
+
     def update_detail(self, object_list, bundle):
         """
         Returns either ``True`` if the user is allowed to update the object in
@@ -87,6 +114,19 @@ class Authorization(object):
         """
         return object_list
 
+    def delete_list_filter(self, bundle):
+        """
+        Optionally returns a ``Q`` object limiting which objects the user is
+        allowed to delete, so ``QuerySet``-based lists can be narrowed within
+        the database query (before ``delete_list`` sees them).
+
+        ``delete_list`` still receives any object lists that aren't
+        ``QuerySets``, so should keep doing its own filtering for those.
+
+        Returns ``None`` (no filter) by default.
+        """
+        return None
+
     def delete_detail(self, object_list, bundle):
         """
         Returns either ``True`` if the user is allowed to delete the object in
@@ -136,7 +176,80 @@ class DjangoAuthorization(Authorization):
 
     Both the list & detail variants simply check the model they're based
     on, as that's all the more granular Django's permission setup gets.
+
+    Each permission is only checked once per request. Optionally accepts a
+    ``cache_name`` (from ``CACHES``) to also remember them across requests,
+    for ``timeout`` seconds.
     """
+    # Defaults for subclasses which don't call ``__init__``.
+    cache = None
+    timeout = 60
+    key_prefix = 'tastypie_permissions'
+
+    def __init__(self, cache_name=None, timeout=60, key_prefix='tastypie_permissions'):
+        self.cache = None
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+        if cache_name is not None:
+            self.cache = get_cache(cache_name)
+
+    def get_cache_key(self, user):
+        """
+        Builds the key the user's permissions are cached under, if they can
+        be cached at all.
+        """
+        if user.pk is None:
+            return None
+
+        # Deactivating a user or changing their superuser status changes
+        # every answer, so don't wait for the timeout.
+        return '%s_%s_%d_%d' % (self.key_prefix, user.pk, bool(getattr(user, 'is_active', True)), bool(getattr(user, 'is_superuser', False)))
+
+    def get_permissions(self, request):
+        """
+        Returns the dictionary of permission -> ``has_perm`` answers known so
+        far for the request's user.
+        """
+        try:
+            permissions = request._tastypie_permissions
+        except AttributeError:
+            permissions = request._tastypie_permissions = {}
+
+        user = request.user
+        key = (user.__class__, user.pk)
+
+        if key not in permissions:
+            cache_key = None
+
+            if self.cache is not None:
+                cache_key = self.get_cache_key(user)
+
+            permissions[key] = {}
+
+            if cache_key is not None:
+                permissions[key] = self.cache.get(cache_key) or {}
+
+        return permissions[key]
+
+    def has_permission(self, request, permission):
+        """
+        Checks whether the request's user has the permission, asking
+        ``has_perm`` at most once per request.
+        """
+        permissions = self.get_permissions(request)
+
+        if permission not in permissions:
+            permissions[permission] = request.user.has_perm(permission)
+
+            if self.cache is not None:
+                cache_key = self.get_cache_key(request.user)
+
+                if cache_key is not None:
+                    self.cache.set(cache_key, permissions, self.timeout)
+
+        return permissions[permission]
+
     def base_checks(self, request, model_klass):
         # If it doesn't look like a model, we can't check permissions.
         if not model_klass or not getattr(model_klass, '_meta', None):
@@ -174,7 +287,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.add_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             return []
 
         return object_list
@@ -187,7 +300,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.add_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             raise Unauthorized("You are not allowed to access that resource.")
 
         return True
@@ -200,7 +313,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.change_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             return []
 
         return object_list
@@ -213,7 +326,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.change_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             raise Unauthorized("You are not allowed to access that resource.")
 
         return True
@@ -226,7 +339,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.delete_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             return []
 
         return object_list
@@ -239,7 +352,7 @@ class DjangoAuthorization(Authorization):
 
         permission = '%s.delete_%s' % (klass._meta.app_label, klass._meta.module_name)
 
-        if not bundle.request.user.has_perm(permission):
+        if not self.has_permission(bundle.request, permission):
             raise Unauthorized("You are not allowed to access that resource.")
 
         return True
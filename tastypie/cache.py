@@ -1,5 +1,71 @@
 from __future__ import unicode_literals
+import math
+import random
+import threading
+import time
 from django.core.cache import get_cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import six
+from django.utils.six.moves import cPickle as pickle
+from tastypie.compat import OrderedDict
+
+
+# The caches holding generations for each watched model, so saves & deletes
+# can invalidate every resource built on that model.
+_watched_models = {}
+
+
+def model_generation_key(model):
+    """
+    The cache key a model's generation is stored under.
+    """
+    return 'tastypie:generation:%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
+
+
+def invalidate_model(sender, **kwargs):
+    """
+    Bumps the generation of ``sender`` in every cache watching it.
+
+    Connected to ``post_save`` & ``post_delete`` by ``watch_model``.
+    """
+    key = model_generation_key(sender)
+
+    for cache in _watched_models.get(sender, []):
+        cache.bump_generation(key)
+
+
+def keeps_generations(cache):
+    """
+    Whether ``cache`` keeps generations, rather than inheriting the no-op
+    ``NoCache.get_generation``.
+    """
+    get_generation = getattr(cache, 'get_generation', None)
+
+    if get_generation is None:
+        return False
+
+    return six.get_method_function(get_generation) is not six.get_unbound_function(NoCache.get_generation)
+
+
+def watch_model(model, cache):
+    """
+    Has saves & deletes of ``model`` invalidate what's stored in ``cache``.
+
+    Caches which don't keep generations (like ``NoCache``) have nothing to
+    invalidate, so aren't watched. That way models only get the signal
+    receivers (which rule out Django's fast deletes) when needed.
+    """
+    if not keeps_generations(cache):
+        return
+
+    caches = _watched_models.setdefault(model, [])
+
+    if not any(watching is cache for watching in caches):
+        caches.append(cache)
+
+    dispatch_uid = 'tastypie.cache.invalidate_model:%s' % model_generation_key(model)
+    post_save.connect(invalidate_model, sender=model, dispatch_uid=dispatch_uid)
+    post_delete.connect(invalidate_model, sender=model, dispatch_uid=dispatch_uid)
 
 
 class NoCache(object):
@@ -8,13 +74,30 @@ class NoCache(object):
 
     Does nothing save for simulating the cache API.
     """
-    def __init__(self, varies=None, *args, **kwargs):
+    def __init__(self, varies=None, grace=None, lock_timeout=10, lock_wait=1,
+                 early_refresh=0, *args, **kwargs):
         """
         Optionally accepts a ``varies`` list that will be used in the
         Vary header. Defaults to ["Accept"].
+
+        Optionally accepts a ``grace`` in seconds, for how long values used
+        through ``get_or_compute`` are kept (& served) past their timeout
+        while one caller refreshes them. Defaults to ``None`` (no grace).
+
+        Optionally accepts ``lock_timeout`` & ``lock_wait`` in seconds, for
+        how long a refresh may take & how long callers with nothing to serve
+        wait on someone else's. Default to ``10`` & ``1``.
+
+        Optionally accepts an ``early_refresh`` factor, to randomly refresh
+        values (with a ``grace``) a little before they expire, more eagerly
+        for values that are slow to compute. Defaults to ``0`` (off).
         """
         super(NoCache, self).__init__(*args, **kwargs)
         self.varies = varies
+        self.grace = grace
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        self.early_refresh = early_refresh
 
         if self.varies is None:
             self.varies = ["Accept"]
@@ -31,6 +114,133 @@ class NoCache(object):
         """
         pass
 
+    def add(self, key, value, timeout=60):
+        """
+        Sets a key-value only if the key isn't already set. Returns whether
+        it was.
+
+        Built on ``get`` & ``set``, so isn't atomic. Backends that can should
+        do better.
+        """
+        if self.get(key) is not None:
+            return False
+
+        self.set(key, value, timeout)
+        return True
+
+    def delete(self, key):
+        """
+        No-op for removing a key from the cache.
+        """
+        pass
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Gets a key from the cache, calling ``compute`` for the value (&
+        storing it) when it's not there.
+
+        With a ``grace``, values stay around for that long past their
+        ``timeout``. Once stale, one caller (holding a lock taken with
+        ``add``) refreshes it while everyone else is still served the stale
+        value, rather than all of them computing it at once.
+        """
+        if not self.grace:
+            value = self.get(key)
+
+            if value is None:
+                value = compute()
+                self.set(key, value, timeout)
+
+            return value
+
+        if timeout is None:
+            timeout = getattr(self, 'timeout', None) or 60
+
+        lock_key = '%s:lock' % key
+        entry = self._unwrap(self.get(key))
+
+        if entry is None:
+            have_lock = self.add(lock_key, 1, self.lock_timeout)
+
+            if not have_lock:
+                # Someone else is on it. Give them a moment.
+                entry = self._wait_for(key)
+
+                if entry is not None:
+                    return entry[0]
+        else:
+            value, expires, delta = entry
+
+            if not self._is_due(expires, delta):
+                return value
+
+            have_lock = self.add(lock_key, 1, self.lock_timeout)
+
+            if not have_lock:
+                return value
+
+        try:
+            started = time.time()
+            value = compute()
+            delta = time.time() - started
+            self.set(key, (value, time.time() + timeout, delta), timeout + self.grace)
+        finally:
+            # Only release the lock if it's ours, or everyone else waiting on
+            # whoever holds it would pile in too.
+            if have_lock:
+                self.delete(lock_key)
+
+        return value
+
+    def _unwrap(self, entry):
+        """
+        Returns the ``(value, expires, delta)`` entry stored by
+        ``get_or_compute``, or ``None`` for anything else (such as values
+        cached before ``grace`` was turned on), which is treated as a miss.
+        """
+        numbers = six.integer_types + (float,)
+
+        if isinstance(entry, tuple) and len(entry) == 3 and isinstance(entry[1], numbers) and isinstance(entry[2], numbers):
+            return entry
+
+        return None
+
+    def _is_due(self, expires, delta):
+        """
+        Whether a value expiring at ``expires`` (& taking ``delta`` seconds
+        to compute) should be refreshed now.
+        """
+        now = time.time()
+
+        if self.early_refresh:
+            # Probabilistic early expiration ("XFetch"): refreshes get likelier
+            # as the value nears expiry & the slower it is to compute.
+            now -= delta * self.early_refresh * math.log(1 - random.random())
+
+        return now >= expires
+
+    def _wait_for(self, key, interval=0.05):
+        for attempt in range(int(math.ceil(self.lock_wait / float(interval)))):
+            time.sleep(interval)
+            entry = self._unwrap(self.get(key))
+
+            if entry is not None:
+                return entry
+
+        return None
+
+    def get_generation(self, key):
+        """
+        Always returns ``None``, as there's nothing to invalidate.
+        """
+        return None
+
+    def bump_generation(self, key):
+        """
+        No-op for invalidating cached values.
+        """
+        return None
+
     def cacheable(self, request, response):
         """
         Returns True or False if the request -> response is capable of being
@@ -53,16 +263,20 @@ class SimpleCache(NoCache):
     """
 
     def __init__(self, cache_name='default', timeout=None, public=None,
-                 private=None, *args, **kwargs):
+                 private=None, generation_timeout=60 * 60 * 24 * 30, *args, **kwargs):
         """
         Optionally accepts a ``timeout`` in seconds for the resource's cache.
         Defaults to ``60`` seconds.
+
+        Optionally accepts a ``generation_timeout`` in seconds for how long
+        generations are kept. Defaults to 30 days.
         """
         super(SimpleCache, self).__init__(*args, **kwargs)
         self.cache = get_cache(cache_name)
         self.timeout = timeout or self.cache.default_timeout
         self.public = public
         self.private = private
+        self.generation_timeout = generation_timeout
 
     def get(self, key, **kwargs):
         """
@@ -83,6 +297,52 @@ class SimpleCache(NoCache):
 
         self.cache.set(key, value, timeout)
 
+    def add(self, key, value, timeout=None):
+        """
+        Sets a key-value in the cache only if the key isn't already set
+        (atomically, where the backend supports it). Returns whether it was.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        return self.cache.add(key, value, timeout)
+
+    def delete(self, key):
+        """
+        Removes a key from the cache.
+        """
+        self.cache.delete(key)
+
+    def get_generation(self, key):
+        """
+        Gets the current generation stored under ``key``, starting one if
+        there isn't one.
+
+        Generations start from the clock (in milliseconds) rather than zero,
+        so one that's been evicted can't come back as one already used.
+        """
+        generation = self.cache.get(key)
+
+        if generation is None:
+            generation = self._start_generation(key)
+
+        return generation
+
+    def bump_generation(self, key):
+        """
+        Moves the generation stored under ``key`` on, so anything cached
+        under the old one is no longer used.
+        """
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Not there (or evicted). A fresh one is already ahead.
+            return self._start_generation(key)
+
+    def _start_generation(self, key):
+        self.cache.add(key, int(time.time() * 1000), self.generation_timeout)
+        return self.cache.get(key)
+
     def cache_control(self):
         control = {
             'max_age': self.timeout,
@@ -96,3 +356,181 @@ class SimpleCache(NoCache):
             control["private"] = self.private
 
         return control
+
+
+class TieredCache(SimpleCache):
+    """
+    A ``SimpleCache`` with an in-process LRU in front of it, so hot keys are
+    served without a round trip to the cache backend.
+
+    Values are kept locally for up to ``local_timeout`` seconds, in an LRU of
+    up to ``max_entries`` (&, optionally, ``max_size`` bytes, as pickled).
+    Every process has its own, so what other processes change only shows up
+    once the local entries expire. Cache generations are kept locally too.
+    Keep the ``local_timeout`` short.
+
+    ``invalidate`` empties the local tiers of every process, as each checks
+    a shared version key (at most every ``version_check_interval`` seconds).
+    """
+    def __init__(self, cache_name='default', timeout=None, local_timeout=5,
+                 max_entries=1000, max_size=None, version_check_interval=1,
+                 version_key='tastypie:tiered_cache_version', *args, **kwargs):
+        super(TieredCache, self).__init__(cache_name, timeout, *args, **kwargs)
+        self.local_timeout = local_timeout
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.version_check_interval = version_check_interval
+        self.version_key = version_key
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = None
+
+    def get(self, key, **kwargs):
+        """
+        Gets a key from the in-process tier, falling back to the cache.
+        Returns ``None`` if the key is not found.
+        """
+        if kwargs:
+            # Anything more than a plain key is left to the backend.
+            return super(TieredCache, self).get(key, **kwargs)
+
+        found, value = self._get_local(key)
+
+        if found:
+            return value
+
+        value = super(TieredCache, self).get(key)
+
+        if value is not None:
+            self._remember(key, value)
+
+        return value
+
+    def set(self, key, value, timeout=None):
+        """
+        Sets a key-value in both the in-process tier & the cache.
+        """
+        super(TieredCache, self).set(key, value, timeout)
+        self._remember(key, value, timeout)
+
+    def delete(self, key):
+        """
+        Removes a key from both the in-process tier & the cache.
+        """
+        super(TieredCache, self).delete(key)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                self._size -= len(entry[1])
+
+    def get_generation(self, key):
+        found, generation = self._get_local(key)
+
+        if found:
+            return generation
+
+        generation = super(TieredCache, self).get_generation(key)
+        self._remember(key, generation)
+        return generation
+
+    def bump_generation(self, key):
+        generation = super(TieredCache, self).bump_generation(key)
+        self._remember(key, generation)
+        return generation
+
+    def invalidate(self):
+        """
+        Empties the in-process tier of this & (within
+        ``version_check_interval`` seconds) every other process.
+        """
+        self._version = super(TieredCache, self).bump_generation(self.version_key)
+        self._version_checked = time.time()
+        self.clear_local()
+
+    def clear_local(self):
+        """
+        Empties the in-process tier of this process only.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """
+        Returns the in-process tier's hit & miss counts & current size.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'size': self._size,
+            }
+
+    def _check_version(self):
+        now = time.time()
+
+        if self._version_checked is not None and now - self._version_checked < self.version_check_interval:
+            return
+
+        self._version_checked = now
+        version = self.cache.get(self.version_key)
+
+        if version != self._version:
+            self.clear_local()
+            self._version = version
+
+    def _get_local(self, key):
+        """
+        Returns a tuple of whether ``key`` was found in the in-process tier &
+        (a copy of) its value.
+        """
+        self._check_version()
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                if entry[0] > time.time():
+                    # Most recently used goes last.
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return True, pickle.loads(entry[1])
+
+                self._size -= len(entry[1])
+
+            self.misses += 1
+
+        return False, None
+
+    def _remember(self, key, value, timeout=None):
+        local_timeout = self.local_timeout
+
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+
+        # Pickled, so callers each get their own copy (& to measure it).
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                self._size -= len(entry[1])
+
+            if self.max_size is not None and len(pickled) > self.max_size:
+                return
+
+            self._entries[key] = (time.time() + local_timeout, pickled)
+            self._size += len(pickled)
+
+            while len(self._entries) > self.max_entries or (self.max_size is not None and self._size > self.max_size):
+                evicted = self._entries.pop(next(iter(self._entries)))
+                self._size -= len(evicted[1])
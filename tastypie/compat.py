@@ -3,7 +3,14 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 import django
 
-__all__ = ['User', 'AUTH_USER_MODEL']
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6. Lacks ``popitem(last=False)``, so evict with
+    # ``pop(next(iter(...)))`` instead.
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+__all__ = ['User', 'AUTH_USER_MODEL', 'OrderedDict']
 
 AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL', 'auth.User')
 
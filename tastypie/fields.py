@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 import datetime
 from dateutil.parser import parse
 from decimal import Decimal
+import operator
 import re
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.utils import datetime_safe, importlib
@@ -20,6 +21,28 @@ DATE_REGEX = re.compile('^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2}).*?$')
 DATETIME_REGEX = re.compile('^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})(T|\s+)(?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2}).*?$')
 
 
+def compile_attribute_accessor(attribute):
+    """
+    Given an ``attribute`` path (like ``foo__bar__baz``), returns a callable
+    that walks the path on an object in a single step.
+
+    The callable raises ``AttributeError`` (or whatever the attribute access
+    raises) if any part of the path is missing. Returns ``None`` if the
+    ``attribute`` isn't a path that can be compiled.
+    """
+    if not isinstance(attribute, six.string_types) or '.' in attribute:
+        return None
+
+    getter = operator.attrgetter(str('.'.join(attribute.split('__'))))
+
+    # Wrapped in a plain function (rather than stored as-is) so that fields
+    # can still be ``deepcopy``'d by the ``Resource`` metaclass.
+    def accessor(obj):
+        return getter(obj)
+
+    return accessor
+
+
 # All the ApiField variants.
 
 class ApiField(object):
@@ -83,6 +106,20 @@ class ApiField(object):
         if help_text:
             self.help_text = help_text
 
+    @property
+    def attribute(self):
+        return self._attribute
+
+    @attribute.setter
+    def attribute(self, value):
+        # Parse the path once, rather than on every ``dehydrate``.
+        self._attribute = value
+        self._attribute_bits = None
+        self._attribute_accessor = compile_attribute_accessor(value)
+
+        if isinstance(value, six.string_types):
+            self._attribute_bits = tuple(value.split('__'))
+
     def contribute_to_class(self, cls, name):
         # Do the least we can here so that we don't hate ourselves in the
         # morning.
@@ -107,27 +144,17 @@ class ApiField(object):
         resource.
         """
         if self.attribute is not None:
-            # Check for `__` in the field for looking through the relation.
-            attrs = self.attribute.split('__')
-            current_object = bundle.obj
-
-            for attr in attrs:
-                previous_object = current_object
-                current_object = getattr(current_object, attr, None)
+            if self._attribute_accessor is not None:
+                try:
+                    current_object = self._attribute_accessor(bundle.obj)
+                except AttributeError:
+                    current_object = None
 
                 if current_object is None:
-                    if self.has_default():
-                        current_object = self._default
-                        # Fall out of the loop, given any further attempts at
-                        # accesses will fail miserably.
-                        break
-                    elif self.null:
-                        current_object = None
-                        # Fall out of the loop, given any further attempts at
-                        # accesses will fail miserably.
-                        break
-                    else:
-                        raise ApiFieldError("The object '%r' has an empty attribute '%s' and doesn't allow a default or null value." % (previous_object, attr))
+                    # Something along the path came up empty.
+                    current_object = self._empty_attribute(bundle.obj)
+            else:
+                current_object = self._walk_attribute(bundle.obj)
 
             if callable(current_object):
                 current_object = current_object()
@@ -139,6 +166,49 @@ class ApiField(object):
         else:
             return None
 
+    def _empty_attribute(self, obj):
+        """
+        Returns the default (or ``None`` if the field is nullable) for an
+        ``attribute`` path that came up empty on ``obj``.
+
+        Otherwise, raises an ``ApiFieldError``, walking the path again to
+        report which part of it was empty.
+        """
+        if self.has_default():
+            return self._default
+
+        if self.null:
+            return None
+
+        return self._walk_attribute(obj)
+
+    def _walk_attribute(self, obj):
+        """
+        Follows the (possibly ``__``-separated) ``attribute`` path on ``obj``,
+        falling back to the default or ``None`` if part of it is empty.
+        """
+        current_object = obj
+
+        for attr in self._attribute_bits:
+            previous_object = current_object
+            current_object = getattr(current_object, attr, None)
+
+            if current_object is None:
+                if self.has_default():
+                    current_object = self._default
+                    # Fall out of the loop, given any further attempts at
+                    # accesses will fail miserably.
+                    break
+                elif self.null:
+                    current_object = None
+                    # Fall out of the loop, given any further attempts at
+                    # accesses will fail miserably.
+                    break
+                else:
+                    raise ApiFieldError("The object '%r' has an empty attribute '%s' and doesn't allow a default or null value." % (previous_object, attr))
+
+        return current_object
+
     def convert(self, value):
         """
         Handles conversion between the data found and the type of the field.
@@ -550,6 +620,33 @@ class RelatedField(ApiField):
 
         return self._to_class
 
+    def _walk_related(self, obj, stop_at_empty=False):
+        """
+        Follows the ``attribute`` path on ``obj`` one step at a time.
+
+        Returns what was found (or ``None``), along with the last object &
+        attribute name looked at, for reporting an empty path.
+        """
+        related = obj
+        previous_obj = obj
+        attr = self.attribute
+
+        if not isinstance(self.attribute, six.string_types):
+            return None, previous_obj, attr
+
+        for attr in self._attribute_bits:
+            previous_obj = related
+
+            try:
+                related = getattr(related, attr, None)
+            except ObjectDoesNotExist:
+                related = None
+
+            if stop_at_empty and not related:
+                break
+
+        return related, previous_obj, attr
+
     def dehydrate_related(self, bundle, related_resource, for_list=True):
         """
         Based on the ``full_resource``, returns either the endpoint or the data
@@ -708,21 +805,20 @@ class ToOneField(RelatedField):
     def dehydrate(self, bundle, for_list=True):
         foreign_obj = None
 
-        if isinstance(self.attribute, six.string_types):
-            attrs = self.attribute.split('__')
-            foreign_obj = bundle.obj
-
-            for attr in attrs:
-                previous_obj = foreign_obj
-                try:
-                    foreign_obj = getattr(foreign_obj, attr, None)
-                except ObjectDoesNotExist:
-                    foreign_obj = None
+        if self._attribute_accessor is not None:
+            try:
+                foreign_obj = self._attribute_accessor(bundle.obj)
+            except (AttributeError, ObjectDoesNotExist):
+                foreign_obj = None
+        elif isinstance(self.attribute, six.string_types):
+            foreign_obj = self._walk_related(bundle.obj)[0]
         elif callable(self.attribute):
             foreign_obj = self.attribute(bundle)
 
         if not foreign_obj:
             if not self.null:
+                # Walk the path again, only to report which part was empty.
+                foreign_obj, previous_obj, attr = self._walk_related(bundle.obj)
                 raise ApiFieldError("The model '%r' has an empty attribute '%s' and doesn't allow a null value." % (previous_obj, attr))
 
             return None
@@ -785,28 +881,21 @@ class ToManyField(RelatedField):
             return []
 
         the_m2ms = None
-        previous_obj = bundle.obj
-        attr = self.attribute
-
-        if isinstance(self.attribute, six.string_types):
-            attrs = self.attribute.split('__')
-            the_m2ms = bundle.obj
-
-            for attr in attrs:
-                previous_obj = the_m2ms
-                try:
-                    the_m2ms = getattr(the_m2ms, attr, None)
-                except ObjectDoesNotExist:
-                    the_m2ms = None
-
-                if not the_m2ms:
-                    break
 
+        if self._attribute_accessor is not None:
+            try:
+                the_m2ms = self._attribute_accessor(bundle.obj)
+            except (AttributeError, ObjectDoesNotExist):
+                the_m2ms = None
+        elif isinstance(self.attribute, six.string_types):
+            the_m2ms = self._walk_related(bundle.obj, stop_at_empty=True)[0]
         elif callable(self.attribute):
             the_m2ms = self.attribute(bundle)
 
         if not the_m2ms:
             if not self.null:
+                # Walk the path again, only to report which part was empty.
+                the_m2ms, previous_obj, attr = self._walk_related(bundle.obj, stop_at_empty=True)
                 raise ApiFieldError("The model '%r' has an empty attribute '%s' and doesn't allow a null value." % (previous_obj, attr))
 
             return []
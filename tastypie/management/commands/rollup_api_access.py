@@ -0,0 +1,62 @@
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import make_option
+import time
+from django.core.management.base import NoArgsCommand
+from tastypie.models import ApiAccess, ApiAccessRollup, HOUR, period_start
+
+
+class Command(NoArgsCommand):
+    help = "Rolls raw API accesses up into hourly/daily counts & prunes the old raw rows."
+    option_list = NoArgsCommand.option_list + (
+        make_option('--retention-days', type='int', dest='retention_days', default=30,
+            help="How many days of raw accesses to keep. Defaults to 30."),
+        make_option('--chunk-size', type='int', dest='chunk_size', default=10000,
+            help="How many raw accesses to delete at a time. Defaults to 10000."),
+        make_option('--grace', type='int', dest='grace', default=300,
+            help="How many seconds to allow for late writes before rolling up an hour. Defaults to 300."),
+        make_option('--no-prune', action='store_false', dest='prune', default=True,
+            help="Don't delete any raw accesses."),
+    )
+
+    def handle_noargs(self, **options):
+        """Rolls raw API accesses up into hourly/daily counts & prunes the old raw rows."""
+        self.verbosity = int(options.get('verbosity', 1))
+        now = int(time.time())
+        # Only finished hours get rolled up.
+        end = period_start(now - options.get('grace', 300), HOUR)
+
+        try:
+            # Carry on from the last hour that was rolled up.
+            latest = ApiAccessRollup.objects.filter(period=HOUR).order_by('-period_start')[0]
+            start = latest.period_start + 60 * 60
+        except IndexError:
+            try:
+                start = ApiAccess.objects.order_by('accessed')[0].accessed
+            except IndexError:
+                start = end
+
+        hours = ApiAccessRollup.objects.roll_up(start, end)
+
+        if self.verbosity >= 1:
+            print(u"Rolled up %d hour(s) of API accesses." % hours)
+
+        if not options.get('prune', True):
+            return
+
+        # Never prune anything that hasn't been rolled up.
+        cutoff = min(end, now - options.get('retention_days', 30) * 60 * 60 * 24)
+        chunk_size = options.get('chunk_size', 10000)
+        pruned = 0
+
+        while True:
+            pks = list(ApiAccess.objects.filter(accessed__lt=cutoff).values_list('pk', flat=True)[:chunk_size])
+
+            if not pks:
+                break
+
+            ApiAccess.objects.filter(pk__in=pks).delete()
+            pruned += len(pks)
+
+        if self.verbosity >= 1:
+            print(u"Pruned %d raw API access(es)." % pruned)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+from tastypie.compat import AUTH_USER_MODEL
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding index on 'ApiAccess', fields ['accessed']
+        db.create_index('tastypie_apiaccess', ['accessed'])
+
+        # Adding index on 'ApiAccess', fields ['identifier', 'accessed']
+        db.create_index('tastypie_apiaccess', ['identifier', 'accessed'])
+
+        # Adding model 'ApiAccessRollup'
+        db.create_table('tastypie_apiaccessrollup', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('identifier', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('url', self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True)),
+            ('request_method', self.gf('django.db.models.fields.CharField')(default='', max_length=10, blank=True)),
+            ('period', self.gf('django.db.models.fields.CharField')(max_length=4)),
+            ('period_start', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+        ))
+        db.send_create_signal('tastypie', ['ApiAccessRollup'])
+
+        # Adding unique constraint on 'ApiAccessRollup', fields ['identifier', 'url', 'request_method', 'period', 'period_start']
+        db.create_unique('tastypie_apiaccessrollup', ['identifier', 'url', 'request_method', 'period', 'period_start'])
+
+        # Adding index on 'ApiAccessRollup', fields ['period', 'period_start']
+        db.create_index('tastypie_apiaccessrollup', ['period', 'period_start'])
+
+    def backwards(self, orm):
+        # Removing index on 'ApiAccessRollup', fields ['period', 'period_start']
+        db.delete_index('tastypie_apiaccessrollup', ['period', 'period_start'])
+
+        # Removing unique constraint on 'ApiAccessRollup', fields ['identifier', 'url', 'request_method', 'period', 'period_start']
+        db.delete_unique('tastypie_apiaccessrollup', ['identifier', 'url', 'request_method', 'period', 'period_start'])
+
+        # Deleting model 'ApiAccessRollup'
+        db.delete_table('tastypie_apiaccessrollup')
+
+        # Removing index on 'ApiAccess', fields ['identifier', 'accessed']
+        db.delete_index('tastypie_apiaccess', ['identifier', 'accessed'])
+
+        # Removing index on 'ApiAccess', fields ['accessed']
+        db.delete_index('tastypie_apiaccess', ['accessed'])
+
+    models = {
+        'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        'auth.permission': {
+            'Meta': {'ordering': "('content_type__app_label', 'content_type__model', 'codename')", 'unique_together': "(('content_type', 'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        AUTH_USER_MODEL: {
+            'Meta': {'object_name': AUTH_USER_MODEL.split('.')[-1]},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Group']", 'symmetrical': 'False', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True', 'blank': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False', 'blank': 'True'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False', 'blank': 'True'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'tastypie.apiaccess': {
+            'Meta': {'object_name': 'ApiAccess', 'index_together': "[('identifier', 'accessed')]"},
+            'accessed': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'identifier': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'request_method': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '10', 'blank': 'True'}),
+            'url': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '255', 'blank': 'True'})
+        },
+        'tastypie.apiaccessrollup': {
+            'Meta': {'unique_together': "[('identifier', 'url', 'request_method', 'period', 'period_start')]", 'object_name': 'ApiAccessRollup', 'index_together': "[('period', 'period_start')]"},
+            'count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'identifier': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'period': ('django.db.models.fields.CharField', [], {'max_length': '4'}),
+            'period_start': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'request_method': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '10', 'blank': 'True'}),
+            'url': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '255', 'blank': 'True'})
+        },
+        'tastypie.apikey': {
+            'Meta': {'object_name': 'ApiKey'},
+            'created': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime(2012, 11, 5, 0, 0)'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'key': ('django.db.models.fields.CharField', [], {'default': "''", 'max_length': '256', 'db_index': 'True', 'blank': 'True'}),
+            'user': ('django.db.models.fields.related.OneToOneField', [], {'related_name': "'api_key'", 'unique': 'True', 'to': "orm['%s']" % AUTH_USER_MODEL})
+        }
+    }
+
+    complete_apps = ['tastypie']
\ No newline at end of file
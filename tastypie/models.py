@@ -2,7 +2,8 @@ from __future__ import unicode_literals
 import hmac
 import time
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Sum
 from tastypie.utils import now
 
 try:
@@ -17,7 +18,12 @@ class ApiAccess(models.Model):
     identifier = models.CharField(max_length=255)
     url = models.CharField(max_length=255, blank=True, default='')
     request_method = models.CharField(max_length=10, blank=True, default='')
-    accessed = models.PositiveIntegerField()
+    accessed = models.PositiveIntegerField(db_index=True)
+
+    class Meta:
+        index_together = [
+            ('identifier', 'accessed'),
+        ]
 
     def __unicode__(self):
         return u"%s @ %s" % (self.identifier, self.accessed)
@@ -27,6 +33,124 @@ class ApiAccess(models.Model):
         return super(ApiAccess, self).save(*args, **kwargs)
 
 
+HOUR = 'hour'
+DAY = 'day'
+ROLLUP_PERIODS = {
+    HOUR: 60 * 60,
+    DAY: 60 * 60 * 24,
+}
+
+
+def period_start(timestamp, period=HOUR):
+    """
+    Returns the start (as a UNIX timestamp) of the hour/day ``timestamp``
+    falls in.
+    """
+    length = ROLLUP_PERIODS[period]
+    return int(timestamp) - (int(timestamp) % length)
+
+
+class ApiAccessRollupManager(models.Manager):
+    def roll_up(self, start, end):
+        """
+        Counts the raw ``ApiAccess`` rows between ``start`` & ``end`` (UNIX
+        timestamps) into hourly rollups, then recomputes the daily rollups
+        for the days those hours fall in.
+
+        Rolling up a period replaces whatever was previously recorded for
+        it, so it's safe to re-run as long as the raw rows are still there.
+        Returns the number of hours rolled up.
+        """
+        start = period_start(start, HOUR)
+        end = period_start(end, HOUR)
+        hours = 0
+
+        for hour in range(start, end, ROLLUP_PERIODS[HOUR]):
+            counts = ApiAccess.objects.filter(
+                accessed__gte=hour,
+                accessed__lt=hour + ROLLUP_PERIODS[HOUR]
+            ).values('identifier', 'url', 'request_method').annotate(accesses=Count('id')).order_by()
+            self.replace(HOUR, hour, counts)
+            hours += 1
+
+        for day in range(period_start(start, DAY), end, ROLLUP_PERIODS[DAY]):
+            counts = self.filter(
+                period=HOUR,
+                period_start__gte=day,
+                period_start__lt=day + ROLLUP_PERIODS[DAY]
+            ).values('identifier', 'url', 'request_method').annotate(accesses=Sum('count')).order_by()
+            self.replace(DAY, day, counts)
+
+        return hours
+
+    def replace(self, period, start, counts):
+        """
+        Swaps out the rollups for a single period for the given ``counts``
+        (dicts of ``identifier``/``url``/``request_method``/``accesses``).
+        """
+        with transaction.commit_on_success():
+            self.filter(period=period, period_start=start).delete()
+            self.bulk_create([
+                self.model(
+                    identifier=count['identifier'],
+                    url=count['url'],
+                    request_method=count['request_method'],
+                    period=period,
+                    period_start=start,
+                    count=count['accesses']
+                ) for count in counts
+            ])
+
+    def usage(self, identifier=None, start=None, end=None, period=DAY, group_by=('identifier',)):
+        """
+        Totals up the accesses between ``start`` & ``end`` (UNIX timestamps,
+        either of which may be omitted), optionally for a single
+        ``identifier``.
+
+        Returns a ``ValuesQuerySet`` of dicts of the ``group_by`` fields plus
+        an ``accesses`` total. Adding ``period_start`` to ``group_by`` gives a
+        per-hour/per-day breakdown.
+        """
+        rollups = self.filter(period=period)
+
+        if identifier is not None:
+            rollups = rollups.filter(identifier=identifier)
+
+        if start is not None:
+            rollups = rollups.filter(period_start__gte=start)
+
+        if end is not None:
+            rollups = rollups.filter(period_start__lt=end)
+
+        return rollups.values(*group_by).annotate(accesses=Sum('count')).order_by(*group_by)
+
+
+class ApiAccessRollup(models.Model):
+    """
+    Hourly/daily counts of ``ApiAccess`` rows, per identifier, URL & request
+    method. Maintained by the ``rollup_api_access`` management command.
+    """
+    identifier = models.CharField(max_length=255)
+    url = models.CharField(max_length=255, blank=True, default='')
+    request_method = models.CharField(max_length=10, blank=True, default='')
+    period = models.CharField(max_length=4, choices=((HOUR, 'Hour'), (DAY, 'Day')))
+    period_start = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    objects = ApiAccessRollupManager()
+
+    class Meta:
+        unique_together = [
+            ('identifier', 'url', 'request_method', 'period', 'period_start'),
+        ]
+        index_together = [
+            ('period', 'period_start'),
+        ]
+
+    def __unicode__(self):
+        return u"%s @ %s (%s): %s" % (self.identifier, self.period_start, self.period, self.count)
+
+
 if 'django.contrib.auth' in settings.INSTALLED_APPS:
     import uuid
     from tastypie.compat import AUTH_USER_MODEL
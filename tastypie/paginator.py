@@ -1,6 +1,18 @@
 from __future__ import unicode_literals
 
+import base64
+import binascii
+import datetime
+import decimal
+import hashlib
+import json
+
 from django.conf import settings
+from django.core.cache import get_cache
+from django.db import connections
+from django.db.models import Model, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql.datastructures import EmptyResultSet
 from django.utils import six
 
 from tastypie.exceptions import BadRequest
@@ -22,7 +34,26 @@ class Paginator(object):
     This implementation also provides additional details like the
     ``total_count`` of resources seen and convenience links to the
     ``previous``/``next`` pages of data as available.
+
+    How ``total_count`` is worked out depends on ``count_mode``:
+
+        * ``'exact'`` runs a ``COUNT`` for every page (the default).
+        * ``'none'`` skips counting altogether, fetching one extra object to
+          tell whether there's a ``next`` page.
+        * ``'estimated'`` uses the database's estimate when it's at least
+          ``estimated_count_threshold`` (falling back to ``'exact'`` for
+          smaller results, or backends without estimates).
+        * ``'cached'`` caches the exact count of each distinct query for
+          ``count_cache_timeout`` seconds.
+
+    Other than ``'exact'``, the ``next`` page is found by fetching one extra
+    object, so a stale or estimated count only affects ``total_count``.
     """
+    count_mode = 'exact'
+    count_cache_name = 'default'
+    count_cache_timeout = 60
+    estimated_count_threshold = 10000
+
     def __init__(self, request_data, objects, resource_uri=None, limit=None, offset=0, max_limit=1000, collection_name='objects'):
         """
         Instantiates the ``Paginator`` and allows for some configuration.
@@ -120,7 +151,25 @@ class Paginator(object):
 
     def get_count(self):
         """
-        Returns a count of the total number of objects seen.
+        Returns a count of the total number of objects seen, as determined by
+        the ``count_mode``.
+
+        Returns ``None`` if the objects shouldn't be counted.
+        """
+        if self.count_mode == 'none':
+            return None
+
+        if self.count_mode == 'estimated':
+            return self.get_estimated_count()
+
+        if self.count_mode == 'cached':
+            return self.get_cached_count()
+
+        return self.get_exact_count()
+
+    def get_exact_count(self):
+        """
+        Returns an exact count of the total number of objects seen.
         """
         try:
             return self.objects.count()
@@ -128,6 +177,91 @@ class Paginator(object):
             # If it's not a QuerySet (or it's ilk), fallback to ``len``.
             return len(self.objects)
 
+    def get_estimated_count(self):
+        """
+        Returns the database's estimate of the number of objects seen, if
+        it's at least ``estimated_count_threshold``.
+
+        Otherwise (or if no estimate is available), returns the exact count.
+        """
+        estimate = self.get_database_estimate()
+
+        if estimate is None or estimate < self.estimated_count_threshold:
+            return self.get_exact_count()
+
+        return estimate
+
+    def get_database_estimate(self):
+        """
+        Asks the query planner for an estimated row count of the objects.
+
+        Only supported on PostgreSQL. Returns ``None`` if no estimate is
+        available.
+        """
+        query = getattr(self.objects, 'query', None)
+
+        if query is None:
+            return None
+
+        connection = connections[self.objects.db]
+
+        if connection.vendor != 'postgresql':
+            return None
+
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN (FORMAT JSON) %s' % sql, params)
+        explain = cursor.fetchone()[0]
+
+        # Older psycopg2 versions do not convert json automatically.
+        if isinstance(explain, six.string_types):
+            explain = json.loads(explain)
+
+        return int(explain[0]['Plan']['Plan Rows'])
+
+    def get_count_cache_key(self):
+        """
+        Generates a cache key for the count, unique to the query (filters,
+        ordering & all) being counted.
+
+        Returns ``None`` if the objects can't be identified.
+        """
+        query = getattr(self.objects, 'query', None)
+
+        if query is None:
+            return None
+
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            return None
+
+        signature = '%s:%s:%r' % (self.objects.db, sql, params)
+        return 'tastypie:count:%s' % hashlib.md5(signature.encode('utf-8')).hexdigest()
+
+    def get_cached_count(self):
+        """
+        Returns the exact count, caching it for ``count_cache_timeout``
+        seconds.
+        """
+        cache_key = self.get_count_cache_key()
+
+        if cache_key is None:
+            return self.get_exact_count()
+
+        cache = get_cache(self.count_cache_name)
+        count = cache.get(cache_key)
+
+        if count is None:
+            count = self.get_exact_count()
+            cache.set(cache_key, count, self.count_cache_timeout)
+
+        return count
+
     def get_previous(self, limit, offset):
         """
         If a previous page is available, will generate a URL to request that
@@ -142,24 +276,33 @@ class Paginator(object):
         """
         If a next page is available, will generate a URL to request that
         page. If not available, this returns ``None``.
+
+        If the ``count`` is ``None``, the next page is assumed to exist.
         """
-        if offset + limit >= count:
+        if count is not None and offset + limit >= count:
             return None
 
         return self._generate_uri(limit, offset+limit)
 
     def _generate_uri(self, limit, offset):
+        return self._generate_uri_with_params({'limit': limit, 'offset': offset})
+
+    def _generate_uri_with_params(self, params):
         if self.resource_uri is None:
             return None
 
+        # Any pagination parameters the client sent are replaced wholesale.
+        stale_keys = set(['limit', 'offset']) | set(params.keys())
+
         try:
             # QueryDict has a urlencode method that can handle multiple values for the same key
             request_params = self.request_data.copy()
-            if 'limit' in request_params:
-                del request_params['limit']
-            if 'offset' in request_params:
-                del request_params['offset']
-            request_params.update({'limit': limit, 'offset': offset})
+
+            for key in stale_keys:
+                if key in request_params:
+                    del request_params[key]
+
+            request_params.update(params)
             encoded_params = request_params.urlencode()
         except AttributeError:
             request_params = {}
@@ -170,11 +313,11 @@ class Paginator(object):
                 else:
                     request_params[k] = v
 
-            if 'limit' in request_params:
-                del request_params['limit']
-            if 'offset' in request_params:
-                del request_params['offset']
-            request_params.update({'limit': limit, 'offset': offset})
+            for key in stale_keys:
+                if key in request_params:
+                    del request_params[key]
+
+            request_params.update(params)
             encoded_params = urlencode(request_params)
 
         return '%s?%s' % (
@@ -192,7 +335,19 @@ class Paginator(object):
         limit = self.get_limit()
         offset = self.get_offset()
         count = self.get_count()
-        objects = self.get_slice(limit, offset)
+        next_count = count
+
+        if limit and (count is None or self.count_mode != 'exact'):
+            # Without an exact count (estimates & cached counts can be off),
+            # fetch one extra to see if there's more.
+            objects = list(self.get_slice(limit + 1, offset))
+            has_next = len(objects) > limit
+            objects = objects[:limit]
+            next_count = None
+        else:
+            objects = self.get_slice(limit, offset)
+            has_next = True
+
         meta = {
             'offset': offset,
             'limit': limit,
@@ -201,9 +356,201 @@ class Paginator(object):
 
         if limit:
             meta['previous'] = self.get_previous(limit, offset)
-            meta['next'] = self.get_next(limit, offset, count)
+            meta['next'] = self.get_next(limit, offset, next_count) if has_next else None
 
         return {
             self.collection_name: objects,
             'meta': meta,
         }
+
+
+class CursorPaginator(Paginator):
+    """
+    Limits result sets using keyset (AKA "cursor") pagination.
+
+    Rather than slicing with an ``offset`` (which the database has to scan
+    past), each page picks up where the last one left off by filtering on
+    the values of the ordering fields of its last object. Those values are
+    handed to the client as an opaque ``cursor`` in the ``previous``/``next``
+    links, so deep pages cost the same as the first one.
+
+    The ordering comes from the ``QuerySet`` (so ``order_by`` in the request
+    or the model's default ordering), with the primary key added as a
+    tie-breaker. The ordering fields should not be nullable.
+
+    As there's no ``offset``, there's no ``total_count`` either, sparing the
+    ``COUNT(*)`` query. Objects which aren't a ``QuerySet`` fall back to
+    ``Paginator``.
+    """
+    cursor_param = 'cursor'
+
+    def get_cursor(self):
+        """
+        Decodes the user-provided ``cursor`` from the GET parameters, if
+        specified.
+
+        Returns a tuple of whether the page runs backwards & the ordering
+        values to start after, or ``None`` if no cursor was provided.
+        """
+        cursor = self.request_data.get(self.cursor_param)
+
+        if not cursor:
+            return None
+
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            return bool(data['r']), list(data['v'])
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise BadRequest("Invalid cursor '%s' provided." % cursor)
+
+    def encode_cursor(self, obj, ordering, reverse=False):
+        """
+        Builds an opaque cursor from the ordering values of ``obj``.
+        """
+        data = {
+            'r': reverse,
+            'v': [self._prepare_cursor_value(self._get_ordering_value(obj, field)) for field in ordering],
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(data).encode('utf-8'))
+        return encoded.decode('ascii').rstrip('=')
+
+    def get_ordering(self):
+        """
+        Determines the fields the ``objects`` are ordered on, adding the
+        primary key so the ordering is unique.
+        """
+        query = self.objects.query
+        model_meta = query.get_meta()
+
+        if query.order_by:
+            ordering = list(query.order_by)
+        elif query.default_ordering:
+            ordering = list(model_meta.ordering)
+        else:
+            ordering = []
+
+        if '?' in ordering:
+            raise BadRequest("Random ordering can not be used with cursor pagination.")
+
+        pk_names = ('pk', model_meta.pk.name, model_meta.pk.attname)
+
+        if not [field for field in ordering if field.lstrip('-') in pk_names]:
+            ordering.append('pk')
+
+        return ordering
+
+    def get_cursor_filter(self, ordering, values, reverse=False):
+        """
+        Builds the ``Q`` object selecting everything after ``values`` in the
+        given ordering (or before, if ``reverse``).
+        """
+        cursor_filter = Q()
+
+        for i, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            clause = Q(**{'%s__%s' % (field.lstrip('-'), lookup): values[i]})
+
+            for previous_field, previous_value in zip(ordering[:i], values[:i]):
+                clause &= Q(**{previous_field.lstrip('-'): previous_value})
+
+            cursor_filter |= clause
+
+        return cursor_filter
+
+    def get_cursor_uri(self, limit, cursor):
+        """
+        Generates a URL to request the page starting at ``cursor``. If no
+        cursor is given, this returns ``None``.
+        """
+        if cursor is None:
+            return None
+
+        return self._generate_uri_with_params({'limit': limit, self.cursor_param: cursor})
+
+    def _get_ordering_value(self, obj, field):
+        value = obj
+
+        for bit in field.lstrip('-').split(LOOKUP_SEP):
+            value = getattr(value, bit, None)
+
+            if value is None:
+                break
+
+        if isinstance(value, Model):
+            value = value.pk
+
+        return value
+
+    def _prepare_cursor_value(self, value):
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+
+        if isinstance(value, decimal.Decimal):
+            return six.text_type(value)
+
+        if value is None or isinstance(value, (bool, float) + six.integer_types + six.string_types):
+            return value
+
+        return six.text_type(value)
+
+    def page(self):
+        """
+        Generates all pertinent data about the requested page.
+
+        Handles getting the correct ``limit`` & ``cursor``, then fetches the
+        page of results (plus one, to see if there's a next page) and returns
+        all pertinent metadata.
+        """
+        if not hasattr(self.objects, 'query'):
+            return super(CursorPaginator, self).page()
+
+        limit = self.get_limit()
+        cursor = self.get_cursor()
+        ordering = self.get_ordering()
+        objects = self.objects.order_by(*ordering)
+        reverse = False
+
+        if cursor is not None:
+            reverse, values = cursor
+
+            if len(values) != len(ordering):
+                raise BadRequest("The cursor provided doesn't match the current ordering.")
+
+            if reverse:
+                objects = objects.reverse()
+
+            objects = objects.filter(self.get_cursor_filter(ordering, values, reverse=reverse))
+
+        if limit:
+            page = list(objects[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            page = list(objects)
+            has_more = False
+
+        if reverse:
+            page.reverse()
+
+        meta = {
+            'limit': limit,
+        }
+
+        if limit:
+            next_cursor = None
+            previous_cursor = None
+
+            if page and (has_more or reverse):
+                next_cursor = self.encode_cursor(page[-1], ordering)
+
+            if page and (has_more if reverse else cursor is not None):
+                previous_cursor = self.encode_cursor(page[0], ordering, reverse=True)
+
+            meta['previous'] = self.get_cursor_uri(limit, previous_cursor)
+            meta['next'] = self.get_cursor_uri(limit, next_cursor)
+
+        return {
+            self.collection_name: page,
+            'meta': meta,
+        }
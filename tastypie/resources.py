@@ -1,7 +1,10 @@
 from __future__ import unicode_literals
 from __future__ import with_statement
 from copy import deepcopy
+import hashlib
+import itertools
 import logging
+import time
 import warnings
 
 from django.conf import settings
@@ -10,16 +13,22 @@ from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned,
 from django.core.urlresolvers import NoReverseMatch, reverse, resolve, Resolver404, get_script_prefix
 from django.core.signals import got_request_exception
 from django.db import transaction
+from django.db.models import OneToOneField
 from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.query import QuerySet, prefetch_related_objects
 from django.db.models.sql.constants import QUERY_TERMS
-from django.http import HttpResponse, HttpResponseNotFound, Http404
+from django.http import HttpResponse, HttpResponseNotFound, Http404, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.encoding import force_bytes
+from django.utils.http import http_date, parse_http_date_safe, urlencode
 from django.utils import six
 
 from tastypie.authentication import Authentication
 from tastypie.authorization import ReadOnlyAuthorization
 from tastypie.bundle import Bundle
-from tastypie.cache import NoCache
+from tastypie.cache import NoCache, model_generation_key, watch_model
 from tastypie.constants import ALL, ALL_WITH_RELATIONS
 from tastypie.exceptions import NotFound, BadRequest, InvalidFilterError, HydrationError, InvalidSortError, ImmediateHttpResponse, Unauthorized
 from tastypie import fields
@@ -79,6 +88,13 @@ class ResourceOptions(object):
     always_return_data = False
     collection_name = 'objects'
     detail_uri_name = 'pk'
+    auto_related_lookups = True
+    streaming_list = False
+    streaming_chunk_size = 100
+    cache_responses = False
+    cache_dehydrated = False
+    select_related = []
+    prefetch_related = []
 
     def __new__(cls, meta=None):
         overrides = {}
@@ -136,6 +152,9 @@ class DeclarativeMetaclass(type):
         new_class = super(DeclarativeMetaclass, cls).__new__(cls, name, bases, attrs)
         opts = getattr(new_class, 'Meta', None)
         new_class._meta = ResourceOptions(opts)
+        # Compiled ``full_dehydrate`` plans, shared by all instances of this
+        # exact class (see ``Resource._get_dehydration_plan``).
+        new_class._dehydration_plans = {}
 
         if not getattr(new_class._meta, 'resource_name', None):
             # No ``resource_name`` provided. Attempt to auto-name the resource.
@@ -455,19 +474,145 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         # All clear. Process the request.
         request = convert_post_to_put(request)
-        response = method(request, **kwargs)
+        owns_identity_maps = not hasattr(request, '_tastypie_identity_maps')
+
+        if owns_identity_maps:
+            request._tastypie_identity_maps = {}
+
+        try:
+            if request_method == 'get' and self._meta.cache_responses:
+                response = self.get_cached_response(request, request_type, method, **kwargs)
+            else:
+                response = method(request, **kwargs)
+        finally:
+            if owns_identity_maps:
+                del request._tastypie_identity_maps
+
+        if request_method != 'get':
+            # Covers writes no signal reports (like ``Resource`` subclasses
+            # or M2M changes) & anything cached again before they committed.
+            self.invalidate_cache()
 
         # Add the throttled request.
         self.log_throttled_access(request)
 
-        # If what comes back isn't a ``HttpResponse``, assume that the
-        # request was accepted and that some action occurred. This also
-        # prevents Django from freaking out.
-        if not isinstance(response, HttpResponse):
+        # If what comes back isn't a ``HttpResponse`` (or a streamed one),
+        # assume that the request was accepted and that some action occurred.
+        # This also prevents Django from freaking out.
+        if not isinstance(response, HttpResponseBase):
             return http.HttpNoContent()
 
         return response
 
+    def generate_response_cache_key(self, request, request_type, **kwargs):
+        """
+        Creates the cache key a whole response is stored under.
+
+        Covers the URL kwargs, the query string, the negotiated format & the
+        identity of the requestor, so nobody is served someone else's data.
+        Also covers the cache generations of any ``full=True`` related
+        resources, so changes to those aren't served stale.
+        """
+        if hasattr(request.GET, 'lists'):
+            query = [(key, value) for key, values in request.GET.lists() for value in values]
+        else:
+            query = list(request.GET.items())
+
+        varies = [
+            self.determine_format(request),
+            self.get_requestor_cache_identity(request),
+            urlencode(sorted(query)),
+            '.'.join('%s' % generation for generation in self.get_dehydrated_generations(request)),
+        ]
+        varies.extend("%s=%s" % (key, value) for key, value in sorted(kwargs.items()))
+        # Hashed to keep it short & free of anything a cache backend might
+        # reject in a key.
+        digest = hashlib.md5(force_bytes('\n'.join(varies))).hexdigest()
+        return self.generate_versioned_cache_key('response', request_type, digest)
+
+    def get_requestor_cache_identity(self, request):
+        """
+        Identifies the requestor for ``generate_response_cache_key``.
+
+        Uses the ``pk`` of the authenticated user, as the authentication
+        class' ``get_identifier`` is meant for throttling & needn't be unique
+        per user (``BasicAuthentication`` relies on ``REMOTE_USER``, for
+        instance). Only anonymous requests fall back to ``get_identifier``.
+        """
+        user = getattr(request, 'user', None)
+
+        if user is not None and user.is_authenticated():
+            return 'user:%s' % user.pk
+
+        return 'anonymous:%s' % self._meta.authentication.get_identifier(request)
+
+    def get_cached_response(self, request, request_type, method, **kwargs):
+        """
+        Serves a ``GET`` from a whole cached response (stored in
+        ``Meta.cache``), only calling ``method`` to build it when there isn't
+        one.
+
+        Responses carry an ``ETag`` & ``Last-Modified``. Requests whose
+        ``If-None-Match``/``If-Modified-Since`` still match get a
+        ``304 Not Modified`` instead.
+
+        The status code & headers set by ``method`` are stored too, but not
+        any cookies.
+        """
+        cache_key = self.generate_response_cache_key(request, request_type, **kwargs)
+        cached = self._meta.cache.get(cache_key)
+
+        if cached is None:
+            response = method(request, **kwargs)
+
+            # Don't cache errors, streamed responses or anything the cache
+            # class objects to.
+            if not isinstance(response, HttpResponse) or not self._meta.cache.cacheable(request, response):
+                return response
+
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'status': response.status_code,
+                'headers': [(header, value) for header, value in response.items() if header.lower() not in ('content-type', 'content-length')],
+                'etag': '"%s"' % hashlib.md5(response.content).hexdigest(),
+                'last_modified': int(time.time()),
+            }
+            self._meta.cache.set(cache_key, cached)
+        else:
+            response = HttpResponse(content=cached['content'], content_type=cached['content_type'], status=cached.get('status', 200))
+
+            for header, value in cached.get('headers', ()):
+                response[header] = value
+
+        if self.is_not_modified(request, cached['etag'], cached['last_modified']):
+            response = http.HttpNotModified()
+
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(cached['last_modified'])
+        return response
+
+    def is_not_modified(self, request, etag, last_modified):
+        """
+        Checks the request's conditional headers against the ``etag`` &
+        ``last_modified`` (a timestamp) of what would be sent back.
+
+        ``If-None-Match`` takes precedence over ``If-Modified-Since``.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+
+        if if_none_match is not None:
+            etags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in etags or etag in etags or 'W/%s' % etag in etags
+
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+
+        if if_modified_since is None:
+            return False
+
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        return if_modified_since is not None and last_modified <= if_modified_since
+
     def remove_api_resource_names(self, url_dict):
         """
         Given a dictionary of regex matches from a URLconf, removes
@@ -568,12 +713,33 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
     def unauthorized_result(self, exception):
         raise ImmediateHttpResponse(response=http.HttpUnauthorized())
 
+    def apply_authorization_filter(self, action, object_list, bundle):
+        """
+        Narrows a ``QuerySet`` within the database query, using the ``Q``
+        object from the authorization's ``<action>_list_filter`` (if any).
+
+        Anything else is returned as-is, for the authorization's ``*_list``
+        methods to filter.
+        """
+        get_filter = getattr(self._meta.authorization, '%s_list_filter' % action, None)
+
+        if get_filter is None or not isinstance(object_list, QuerySet):
+            return object_list
+
+        authorization_filter = get_filter(bundle)
+
+        if authorization_filter is None:
+            return object_list
+
+        return object_list.filter(authorization_filter)
+
     def authorized_read_list(self, object_list, bundle):
         """
         Handles checking of permissions to see if the user has authorization
         to GET this resource.
         """
         try:
+            object_list = self.apply_authorization_filter('read', object_list, bundle)
             auth_result = self._meta.authorization.read_list(object_list, bundle)
         except Unauthorized as e:
             self.unauthorized_result(e)
@@ -626,6 +792,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         to PUT this resource.
         """
         try:
+            object_list = self.apply_authorization_filter('update', object_list, bundle)
             auth_result = self._meta.authorization.update_list(object_list, bundle)
         except Unauthorized as e:
             self.unauthorized_result(e)
@@ -652,6 +819,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         to DELETE this resource.
         """
         try:
+            object_list = self.apply_authorization_filter('delete', object_list, bundle)
             auth_result = self._meta.authorization.delete_list(object_list, bundle)
         except Unauthorized as e:
             self.unauthorized_result(e)
@@ -713,6 +881,21 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         return obj_list
 
+    def apply_related_lookups(self, obj_list, for_list=False, bundle=None):
+        """
+        Allows for fetching the related data the resource will dehydrate up
+        front, rather than once per object.
+
+        If a ``bundle`` is given (for a single object), fields whose callable
+        ``use_in`` excludes them for that bundle can be skipped.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        return obj_list
+
     def get_bundle_detail_data(self, bundle):
         """
         Convenience method to return the ``detail_uri_name`` attribute off
@@ -806,40 +989,203 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
     # Data preparation.
 
-    def full_dehydrate(self, bundle, for_list=False):
+    def _get_dehydration_plan(self, for_list=False):
         """
-        Given a bundle with an object instance, extract the information from it
-        to populate the resource.
+        Returns the compiled dehydration plan for either list or detail mode.
+
+        The plan is an ordered tuple of ``(field_name, use_in, method_name,
+        is_related)`` entries, where fields excluded from the mode by a
+        string ``use_in`` have already been dropped, ``use_in`` is the
+        remaining callable (or ``None``) and ``method_name`` is the name of
+        the ``dehydrate_<field_name>`` hook (or ``None`` if there isn't one).
+
+        Plans are compiled once & cached on the class, keyed on the mode and
+        the field names in use, so resources that alter ``self.fields`` get
+        a plan of their own.
         """
-        use_in = ['all', 'list' if for_list else 'detail']
+        field_names = tuple(self.fields)
+        plan_key = (bool(for_list), field_names)
 
-        # Dehydrate each field.
-        for field_name, field_object in self.fields.items():
-            # If it's not for use in this mode, skip
+        try:
+            return self._dehydration_plans[plan_key]
+        except KeyError:
+            pass
+
+        use_in_modes = ['all', 'list' if for_list else 'detail']
+        plan = []
+
+        for field_name in field_names:
+            field_object = self.fields[field_name]
             field_use_in = getattr(field_object, 'use_in', 'all')
-            if callable(field_use_in):
-                if not field_use_in(bundle):
-                    continue
-            else:
-                if field_use_in not in use_in:
+
+            if not callable(field_use_in):
+                # If it's not for use in this mode, skip it entirely.
+                if field_use_in not in use_in_modes:
                     continue
 
-            # A touch leaky but it makes URI resolution work.
-            if getattr(field_object, 'dehydrated_type', None) == 'related':
+                field_use_in = None
+
+            method_name = "dehydrate_%s" % field_name
+
+            if getattr(self, method_name, None) is None:
+                method_name = None
+
+            is_related = getattr(field_object, 'dehydrated_type', None) == 'related'
+            plan.append((field_name, field_use_in, method_name, is_related))
+
+        plan = tuple(plan)
+        self._dehydration_plans[plan_key] = plan
+        return plan
+
+    def _stamp_related_fields(self, plan):
+        """
+        Copies the resource's ``api_name`` & ``resource_name`` onto the
+        related fields in the plan. A touch leaky but it makes URI resolution
+        work.
+
+        This happens once per plan for each instance, rather than for every
+        object dehydrated. It's redone if either name changes or a related
+        field is replaced (say, by assigning to ``self.fields``).
+        """
+        stamp = (self._meta.api_name, self._meta.resource_name)
+        stamped = self.__dict__.setdefault('_stamped_dehydration_plans', {})
+        previous = stamped.get(id(plan))
+
+        if previous is not None and previous[0] == stamp:
+            if all(self.fields.get(field_name) is field_object for field_name, field_object in previous[1]):
+                return
+
+        related_fields = []
+
+        for field_name, use_in, method_name, is_related in plan:
+            if is_related:
+                field_object = self.fields[field_name]
                 field_object.api_name = self._meta.api_name
                 field_object.resource_name = self._meta.resource_name
+                related_fields.append((field_name, field_object))
 
-            bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
+        stamped[id(plan)] = (stamp, tuple(related_fields))
 
-            # Check for an optional method to do further dehydration.
-            method = getattr(self, "dehydrate_%s" % field_name, None)
+    def full_dehydrate(self, bundle, for_list=False):
+        """
+        Given a bundle with an object instance, extract the information from it
+        to populate the resource.
 
-            if method:
-                bundle.data[field_name] = method(bundle)
+        With ``cache_dehydrated`` enabled, the resulting data is stored in
+        ``Meta.cache`` & reused for the same object (in the same mode) until
+        the cache is invalidated.
+        """
+        cache_key = None
+
+        if self._meta.cache_dehydrated:
+            cache_key = self.generate_dehydrated_cache_key(bundle, for_list=for_list)
+
+            if cache_key is not None:
+                cached_data = self._meta.cache.get(cache_key)
+
+                if cached_data is not None:
+                    bundle.data.update(cached_data)
+                    return bundle
+
+        data = bundle.data
+        plan = self._get_dehydration_plan(for_list)
+        self._stamp_related_fields(plan)
+
+        # Dehydrate each field.
+        for field_name, use_in, method_name, is_related in plan:
+            if use_in is not None and not use_in(bundle):
+                continue
+
+            field_object = self.fields[field_name]
+            data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
+
+            # Run the optional method to do further dehydration.
+            if method_name is not None:
+                data[field_name] = getattr(self, method_name)(bundle)
 
         bundle = self.dehydrate(bundle)
+
+        if cache_key is not None:
+            self._meta.cache.set(cache_key, detach_bundles(bundle.data))
+
         return bundle
 
+    def generate_dehydrated_cache_key(self, bundle, for_list=False):
+        """
+        Creates the cache key the dehydrated data for the bundle's object is
+        stored under, or returns ``None`` if it shouldn't be cached (as with
+        objects that haven't been saved).
+
+        Covers the object's identity, the mode & the cache generations of the
+        resource & any it includes in full.
+        """
+        if bundle.obj is None:
+            return None
+
+        try:
+            identity = self.detail_uri_kwargs(bundle)
+        except NotImplementedError:
+            return None
+
+        if any(value is None for value in identity.values()):
+            return None
+
+        generations = '.'.join('%s' % generation for generation in self.get_dehydrated_generations(bundle.request))
+        return self.generate_cache_key('dehydrated', 'list' if for_list else 'detail', generations, **identity)
+
+    def get_dehydrated_generations(self, request=None):
+        """
+        Returns the cache generations the resource's dehydrated data depends
+        on: its own, plus those of every resource it includes with
+        ``full=True`` (all the way down).
+
+        These are only looked up once per ``GET`` request.
+        """
+        memo = None
+
+        if request is not None and request.method == 'GET':
+            memo = request.__dict__.setdefault('_tastypie_dehydrated_generations', {})
+
+            if self.__class__ in memo:
+                return memo[self.__class__]
+
+        generations = []
+        seen = set()
+        pending = [self]
+
+        while pending:
+            resource = pending.pop(0)
+
+            if resource.__class__ in seen:
+                continue
+
+            seen.add(resource.__class__)
+            generations.append(resource.get_cache_generation())
+            pending.extend(resource._get_full_related_resources())
+
+        if memo is not None:
+            memo[self.__class__] = generations
+
+        return generations
+
+    def _get_full_related_resources(self):
+        """
+        Returns (memoized) instances of the resources this one includes with
+        ``full=True``.
+        """
+        related_resources = getattr(self, '_full_related_resources', None)
+
+        if related_resources is None:
+            related_resources = []
+
+            for field_object in self.fields.values():
+                if getattr(field_object, 'dehydrated_type', None) == 'related' and field_object.full:
+                    related_resources.append(field_object.get_related_resource(None))
+
+            self._full_related_resources = related_resources
+
+        return related_resources
+
     def dehydrate(self, bundle):
         """
         A hook to allow a final manipulation of data once all fields/methods
@@ -1009,6 +1355,45 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         # Use a list plus a ``.join()`` because it's faster than concatenation.
         return "%s:%s:%s:%s" % (self._meta.api_name, self._meta.resource_name, ':'.join(args), ':'.join(sorted(smooshed)))
 
+    def generate_versioned_cache_key(self, *args, **kwargs):
+        """
+        A version of ``generate_cache_key`` that includes the resource's
+        current cache generation, so ``invalidate_cache`` can retire
+        everything stored under it at once.
+        """
+        generation = self.get_cache_generation()
+
+        if generation is not None:
+            args += ('generation=%s' % generation,)
+
+        return self.generate_cache_key(*args, **kwargs)
+
+    def get_cache_generation_key(self):
+        """
+        Returns the cache key the resource's cache generation is stored under.
+
+        ``ModelResource`` shares one generation between all the resources for
+        the same ``Model``.
+        """
+        return self.generate_cache_key('generation')
+
+    def get_cache_generation(self):
+        """
+        Returns the resource's current cache generation (or ``None`` if the
+        ``cache`` doesn't keep one).
+        """
+        return self._meta.cache.get_generation(self.get_cache_generation_key())
+
+    def invalidate_cache(self):
+        """
+        Moves the resource onto a new cache generation, so nothing cached so
+        far (objects, lists or responses) is served again.
+
+        Called by ``dispatch`` after anything but a ``GET``. ``ModelResource``
+        is also invalidated by saves & deletes of its ``Model``.
+        """
+        self._meta.cache.bump_generation(self.get_cache_generation_key())
+
     # Data access methods.
 
     def get_object_list(self, request):
@@ -1079,15 +1464,12 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         A version of ``obj_get_list`` that uses the cache as a means to get
         commonly-accessed data faster.
-        """
-        cache_key = self.generate_cache_key('list', **kwargs)
-        obj_list = self._meta.cache.get(cache_key)
-
-        if obj_list is None:
-            obj_list = self.obj_get_list(bundle=bundle, **kwargs)
-            self._meta.cache.set(cache_key, obj_list)
 
-        return obj_list
+        Goes through the cache's ``get_or_compute``, so a cache with a
+        ``grace`` won't have every request rebuild an expired entry at once.
+        """
+        cache_key = self.generate_versioned_cache_key('list', **kwargs)
+        return self._meta.cache.get_or_compute(cache_key, lambda: self.obj_get_list(bundle=bundle, **kwargs))
 
     def obj_get(self, bundle, **kwargs):
         """
@@ -1101,19 +1483,58 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         raise NotImplementedError()
 
+    def get_identity_map(self, request):
+        """
+        Returns the identity map ``obj_get`` uses for this resource during
+        the given request.
+
+        This is a dictionary set up on the request by ``dispatch`` (and
+        discarded once the response is built), so repeated lookups of the
+        same object (for instance, when ``obj_update`` fetches the object
+        being updated) can be served from memory. Returns ``None`` outside
+        of ``dispatch``, or override it to return ``None`` to always hit the
+        data source.
+        """
+        identity_maps = getattr(request, '_tastypie_identity_maps', None)
+
+        if identity_maps is None:
+            return None
+
+        return identity_maps.setdefault(self.__class__, {})
+
+    def obj_get_multiple(self, bundle, identifiers):
+        """
+        Fetches the objects matching a list of identifiers.
+
+        Returns a tuple of the found objects (in the order requested) & the
+        identifiers which couldn't be found.
+
+        By default, this calls ``obj_get`` once per identifier.
+
+        ``ModelResource`` includes a version specific to Django's ``Models``
+        which fetches all the objects in a single query.
+        """
+        objects = []
+        not_found = []
+
+        for identifier in identifiers:
+            try:
+                objects.append(self.obj_get(bundle=bundle, **{self._meta.detail_uri_name: identifier}))
+            except (ObjectDoesNotExist, Unauthorized):
+                not_found.append(identifier)
+
+        return objects, not_found
+
     def cached_obj_get(self, bundle, **kwargs):
         """
         A version of ``obj_get`` that uses the cache as a means to get
         commonly-accessed data faster.
-        """
-        cache_key = self.generate_cache_key('detail', **kwargs)
-        cached_bundle = self._meta.cache.get(cache_key)
-
-        if cached_bundle is None:
-            cached_bundle = self.obj_get(bundle=bundle, **kwargs)
-            self._meta.cache.set(cache_key, cached_bundle)
 
-        return cached_bundle
+        Goes through the cache's ``get_or_compute``, so a cache with a
+        ``grace`` won't have every request rebuild an expired entry at once.
+        """
+        cache_key = self.generate_versioned_cache_key('detail', **kwargs)
+        return self._meta.cache.get_or_compute(cache_key, lambda: self.obj_get(bundle=bundle, **kwargs))
 
     def obj_create(self, bundle, **kwargs):
         """
@@ -1181,6 +1602,63 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         serialized = self.serialize(request, data, desired_format)
         return response_class(content=serialized, content_type=build_content_type(desired_format), **response_kwargs)
 
+    def create_streaming_response(self, request, data, response_class=StreamingHttpResponse, **response_kwargs):
+        """
+        Like ``create_response``, but serializes the ``collection_name`` list
+        in ``data`` to JSON one object at a time as the response is sent.
+
+        Used by ``get_list`` when ``Meta.streaming_list`` is enabled.
+        """
+        desired_format = self.determine_format(request)
+        streamed = self._meta.serializer.to_json_iter(data, collection_name=self._meta.collection_name)
+        return response_class(streamed, content_type=build_content_type(desired_format), **response_kwargs)
+
+    def _can_stream_list(self, request):
+        """
+        Whether ``get_list`` should stream its response.
+
+        Only JSON is streamed & only when neither ``Resource.serialize`` nor
+        the serializer's ``to_json`` has been overridden, as streaming goes
+        straight to ``Serializer.to_json_iter`` & would skip them.
+        """
+        if not self._meta.streaming_list:
+            return False
+
+        if self.determine_format(request) != 'application/json':
+            return False
+
+        if six.get_method_function(self.serialize) is not six.get_unbound_function(Resource.serialize):
+            return False
+
+        return six.get_method_function(self._meta.serializer.to_json) is six.get_unbound_function(Serializer.to_json)
+
+    def iter_list_bundles(self, request, objects):
+        """
+        Lazily builds & dehydrates a bundle for each of the ``objects``.
+
+        A ``QuerySet`` is read with ``iterator`` (bypassing its result cache)
+        and handed to ``apply_related_lookups`` in chunks of
+        ``Meta.streaming_chunk_size``, so only a chunk of objects is held in
+        memory at once.
+        """
+        if hasattr(objects, 'iterator'):
+            objects = objects.iterator()
+
+        objects = iter(objects)
+        chunk_size = self._meta.streaming_chunk_size or 1
+
+        while True:
+            chunk = list(itertools.islice(objects, chunk_size))
+
+            if not chunk:
+                break
+
+            chunk = self.apply_related_lookups(chunk, for_list=True)
+
+            for obj in chunk:
+                bundle = self.build_bundle(obj=obj, request=request)
+                yield self.full_dehydrate(bundle, for_list=True)
+
     def error_response(self, request, errors, response_class=None):
         """
         Extracts the common "which-format/serialize/return-error-response"
@@ -1260,14 +1738,22 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         Should return a HttpResponse (200 OK).
         """
-        # TODO: Uncached for now. Invalidation that works for everyone may be
-        #       impossible.
+        # Not cached at the object level, as caching the whole (unpaginated)
+        # list is rarely a win. ``cache_responses`` covers lists instead.
         base_bundle = self.build_bundle(request=request)
         objects = self.obj_get_list(bundle=base_bundle, **self.remove_api_resource_names(kwargs))
         sorted_objects = self.apply_sorting(objects, options=request.GET)
 
         paginator = self._meta.paginator_class(request.GET, sorted_objects, resource_uri=self.get_resource_uri(), limit=self._meta.limit, max_limit=self._meta.max_limit, collection_name=self._meta.collection_name)
         to_be_serialized = paginator.page()
+        # Only fetch the related data for the page being sent.
+        to_be_serialized[self._meta.collection_name] = self.apply_related_lookups(to_be_serialized[self._meta.collection_name], for_list=True)
+
+        if self._can_stream_list(request):
+            # Dehydrate & serialize the bundles as they're sent.
+            to_be_serialized[self._meta.collection_name] = self.iter_list_bundles(request, to_be_serialized[self._meta.collection_name])
+            to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
+            return self.create_streaming_response(request, to_be_serialized)
 
         # Dehydrate the bundles in preparation for serialization.
         bundles = []
@@ -1299,6 +1785,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
             return http.HttpMultipleChoices("More than one resource is found at this URI.")
 
         bundle = self.build_bundle(obj=obj, request=request)
+        self.apply_related_lookups([obj], for_list=False, bundle=bundle)
         bundle = self.full_dehydrate(bundle)
         bundle = self.alter_detail_data_to_serialize(request, bundle)
         return self.create_response(request, bundle)
@@ -1647,8 +2134,8 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Returns a serialized list of resources based on the identifiers
         from the URL.
 
-        Calls ``obj_get`` to fetch only the objects requested. This method
-        only responds to HTTP GET.
+        Calls ``obj_get_multiple`` to fetch only the objects requested. This
+        method only responds to HTTP GET.
 
         Should return a HttpResponse (200 OK).
         """
@@ -1656,21 +2143,14 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         self.is_authenticated(request)
         self.throttle_check(request)
 
-        # Rip apart the list then iterate.
+        # Rip apart the list then fetch.
         kwarg_name = '%s_list' % self._meta.detail_uri_name
         obj_identifiers = kwargs.get(kwarg_name, '').split(';')
-        objects = []
-        not_found = []
         base_bundle = self.build_bundle(request=request)
+        objects, not_found = self.obj_get_multiple(bundle=base_bundle, identifiers=obj_identifiers)
 
-        for identifier in obj_identifiers:
-            try:
-                obj = self.obj_get(bundle=base_bundle, **{self._meta.detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
-                not_found.append(identifier)
+        objects = self.apply_related_lookups(objects, for_list=True)
+        objects = [self.full_dehydrate(self.build_bundle(obj=obj, request=request), for_list=True) for obj in objects]
 
         object_list = {
             self._meta.collection_name: objects,
@@ -1714,6 +2194,9 @@ class ModelDeclarativeMetaclass(DeclarativeMetaclass):
         elif 'absolute_url' in new_class.base_fields and not 'absolute_url' in attrs:
             del(new_class.base_fields['absolute_url'])
 
+        if new_class._meta.object_class is not None:
+            watch_model(new_class._meta.object_class, new_class._meta.cache)
+
         return new_class
 
 
@@ -2026,6 +2509,165 @@ class BaseModelResource(Resource):
         """
         return self._meta.queryset._clone()
 
+    def get_cache_generation_key(self):
+        """
+        An ORM-specific implementation of ``get_cache_generation_key``.
+
+        Keyed on the ``Model``, matching what its saves & deletes invalidate.
+        """
+        if self._meta.object_class is None:
+            return super(BaseModelResource, self).get_cache_generation_key()
+
+        return model_generation_key(self._meta.object_class)
+
+    def _get_relation(self, model, name):
+        """
+        Given a model & an attribute name, returns a tuple of the related
+        model & whether the relation is many-valued, or ``None`` if the
+        attribute isn't a relation the ORM can fetch ahead of time.
+        """
+        try:
+            field, field_model, direct, m2m = model._meta.get_field_by_name(name)
+        except FieldDoesNotExist:
+            # Reverse relations are looked up by query name above, but
+            # are accessed on instances by their accessor name (``foo_set``).
+            for related in model._meta.get_all_related_objects() + model._meta.get_all_related_many_to_many_objects():
+                if related.get_accessor_name() == name:
+                    return related.model, True
+
+            return None
+
+        if direct:
+            if not getattr(field, 'rel', None):
+                return None
+
+            return field.rel.to, m2m
+
+        # A ``RelatedObject`` for the reverse side of a relation.
+        return field.model, m2m or not isinstance(field.field, OneToOneField)
+
+    def _collect_related_lookups(self, resource_class, model, for_list, prefix, many, seen, select_related, prefetch_related, skip_fields=()):
+        use_in_modes = ['all', 'list' if for_list else 'detail']
+
+        for field_name, field_object in resource_class.base_fields.items():
+            if not getattr(field_object, 'is_related', False):
+                continue
+
+            if not isinstance(field_object.attribute, six.string_types):
+                continue
+
+            if not callable(field_object.use_in) and field_object.use_in not in use_in_modes:
+                continue
+
+            if field_name in skip_fields:
+                continue
+
+            related_model = model
+            path_is_many = many
+
+            for bit in field_object.attribute.split(LOOKUP_SEP):
+                relation = self._get_relation(related_model, bit)
+
+                if relation is None:
+                    break
+
+                related_model, is_many = relation
+                path_is_many = path_is_many or is_many
+            else:
+                lookup = prefix + field_object.attribute
+
+                # Anything reached through a many-valued relation can't be
+                # joined in, so it has to be prefetched.
+                if path_is_many:
+                    prefetch_related.append(lookup)
+                else:
+                    select_related.append(lookup)
+
+                full = field_object.full_list if for_list else field_object.full_detail
+
+                if not field_object.full or not full:
+                    continue
+
+                related_class = field_object.to_class
+
+                if not isinstance(related_class, type) or not issubclass(related_class, BaseModelResource):
+                    continue
+
+                if related_class in seen:
+                    continue
+
+                # Nested resources are always dehydrated in detail mode.
+                self._collect_related_lookups(related_class, related_model, False, lookup + LOOKUP_SEP, path_is_many, seen + [related_class], select_related, prefetch_related)
+
+    def build_related_lookups(self, for_list=False, skip_fields=()):
+        """
+        Works out which relations will be traversed when dehydrating the
+        resource, including those of nested ``full=True`` resources.
+
+        Returns a tuple of ``select_related`` & ``prefetch_related`` lookups,
+        including any provided by ``Meta.select_related`` &
+        ``Meta.prefetch_related``. If ``Meta.auto_related_lookups`` is
+        ``False``, only those provided lookups are used.
+
+        The resource's own fields named in ``skip_fields`` (those that won't
+        be dehydrated) are left out.
+        """
+        select_related = []
+        prefetch_related = []
+
+        if self._meta.auto_related_lookups and self._meta.object_class is not None:
+            self._collect_related_lookups(self.__class__, self._meta.object_class, for_list, '', False, [self.__class__], select_related, prefetch_related, skip_fields=skip_fields)
+
+        for lookup in self._meta.select_related:
+            if not lookup in select_related:
+                select_related.append(lookup)
+
+        for lookup in self._meta.prefetch_related:
+            if not lookup in prefetch_related:
+                prefetch_related.append(lookup)
+
+        return select_related, prefetch_related
+
+    def apply_related_lookups(self, obj_list, for_list=False, bundle=None):
+        """
+        An ORM-specific implementation of ``apply_related_lookups``.
+
+        Applies the lookups from ``build_related_lookups`` using
+        ``select_related`` & ``prefetch_related`` if given a ``QuerySet``, or
+        prefetches them onto the instances if given a list of objects, so the
+        related data is fetched in a fixed number of queries.
+
+        With a ``bundle``, related fields whose callable ``use_in`` excludes
+        them for it are skipped.
+        """
+        skip_fields = ()
+
+        if bundle is not None:
+            skip_fields = tuple(sorted(
+                field_name for field_name, field_object in self.fields.items()
+                if getattr(field_object, 'is_related', False) and callable(field_object.use_in) and not field_object.use_in(bundle)
+            ))
+
+        cache_key = (bool(for_list), skip_fields)
+        lookup_cache = self.__dict__.setdefault('_related_lookups', {})
+
+        if not cache_key in lookup_cache:
+            lookup_cache[cache_key] = self.build_related_lookups(for_list=for_list, skip_fields=skip_fields)
+
+        select_related, prefetch_related = lookup_cache[cache_key]
+
+        if hasattr(obj_list, 'select_related') and hasattr(obj_list, 'prefetch_related'):
+            if select_related:
+                obj_list = obj_list.select_related(*select_related)
+
+            if prefetch_related:
+                obj_list = obj_list.prefetch_related(*prefetch_related)
+        elif isinstance(obj_list, list) and len(obj_list):
+            if select_related or prefetch_related:
+                prefetch_related_objects(obj_list, select_related + prefetch_related)
+
+        return obj_list
+
     def obj_get_list(self, bundle, **kwargs):
         """
         A ORM-specific implementation of ``obj_get_list``.
@@ -2049,27 +2691,163 @@ class BaseModelResource(Resource):
         except ValueError:
             raise BadRequest("Invalid resource lookup data provided (mismatched type).")
 
+    def get_unique_lookup(self, **kwargs):
+        """
+        Checks whether the provided ``kwargs`` identify at most one object.
+
+        Returns a ``(field_name, value)`` tuple for lookups on the primary key
+        or a ``unique`` field, otherwise ``None``.
+        """
+        if len(kwargs) != 1:
+            return None
+
+        lookup, value = list(kwargs.items())[0]
+
+        if lookup.endswith('__exact'):
+            lookup = lookup[:-len('__exact')]
+
+        model_meta = self._meta.object_class._meta
+
+        if lookup == 'pk':
+            field = model_meta.pk
+        else:
+            try:
+                field = model_meta.get_field(lookup)
+            except FieldDoesNotExist:
+                return None
+
+        if not (field.primary_key or field.unique) or field.rel:
+            return None
+
+        try:
+            return (field.name, field.to_python(value))
+        except ValidationError:
+            return None
+
+    def _forget_identities(self, request, model, pk=None, keep=None):
+        """
+        Drops instances of ``model`` (only those matching ``pk``, if given)
+        from every identity map on the request, other than ``keep``.
+
+        Keeps other resources on the same model from serving a stale copy
+        once an object has been saved or deleted.
+        """
+        identity_maps = getattr(request, '_tastypie_identity_maps', None)
+
+        if not identity_maps:
+            return
+
+        for identity_map in identity_maps.values():
+            for key, obj in list(identity_map.items()):
+                if obj is keep or not isinstance(obj, model):
+                    continue
+
+                if pk is None or obj.pk == pk:
+                    del identity_map[key]
+
     def obj_get(self, bundle, **kwargs):
         """
         A ORM-specific implementation of ``obj_get``.
 
         Takes optional ``kwargs``, which are used to narrow the query to find
         the instance.
+
+        Lookups on a unique key are stored in the identity map for the
+        request, so fetching the same object again doesn't hit the database.
         """
+        identity_map = self.get_identity_map(bundle.request)
+        unique_lookup = None
+
+        if identity_map is not None:
+            unique_lookup = self.get_unique_lookup(**kwargs)
+
+            if unique_lookup in identity_map:
+                bundle.obj = identity_map[unique_lookup]
+                self.authorized_read_detail(self.get_object_list(bundle.request), bundle)
+                return bundle.obj
+
         try:
             object_list = self.get_object_list(bundle.request).filter(**kwargs)
+            matches = list(object_list[:2])
+        except ValueError:
+            raise NotFound("Invalid resource lookup data provided (mismatched type).")
+
+        if len(matches) != 1:
             stringified_kwargs = ', '.join(["%s=%s" % (k, v) for k, v in kwargs.items()])
 
-            if len(object_list) <= 0:
+            if not matches:
                 raise self._meta.object_class.DoesNotExist("Couldn't find an instance of '%s' which matched '%s'." % (self._meta.object_class.__name__, stringified_kwargs))
-            elif len(object_list) > 1:
-                raise MultipleObjectsReturned("More than '%s' matched '%s'." % (self._meta.object_class.__name__, stringified_kwargs))
 
-            bundle.obj = object_list[0]
-            self.authorized_read_detail(object_list, bundle)
-            return bundle.obj
+            raise MultipleObjectsReturned("More than '%s' matched '%s'." % (self._meta.object_class.__name__, stringified_kwargs))
+
+        bundle.obj = matches[0]
+        self.authorized_read_detail(object_list, bundle)
+
+        if unique_lookup is not None:
+            identity_map[unique_lookup] = bundle.obj
+
+        return bundle.obj
+
+    def obj_get_multiple(self, bundle, identifiers):
+        """
+        A ORM-specific implementation of ``obj_get_multiple``.
+
+        Fetches all of the identifiers with a single ``__in`` query, narrowed
+        by ``authorized_read_list`` (rather than ``authorized_read_detail``
+        per object).
+
+        If ``obj_get`` has been overridden, or the ``detail_uri_name`` isn't
+        a field of the model (say, a lookup like ``user__username``), falls
+        back to calling ``obj_get`` once per identifier.
+        """
+        if six.get_method_function(self.obj_get) is not six.get_unbound_function(BaseModelResource.obj_get):
+            return super(BaseModelResource, self).obj_get_multiple(bundle, identifiers)
+
+        detail_uri_name = self._meta.detail_uri_name
+        model_meta = self._meta.object_class._meta
+
+        if detail_uri_name == 'pk':
+            field = model_meta.pk
+        else:
+            try:
+                field = model_meta.get_field(detail_uri_name)
+            except FieldDoesNotExist:
+                field = None
+
+        if field is None or getattr(field.rel, 'multiple', False):
+            # Can't be read back off the objects to match them up.
+            return super(BaseModelResource, self).obj_get_multiple(bundle, identifiers)
+
+        # Relations (like a parent link ``pk``) are matched on their raw id.
+        target = field.rel.get_related_field() if field.rel is not None else field
+
+        try:
+            values = [target.to_python(identifier) for identifier in identifiers]
+        except ValidationError:
+            raise NotFound("Invalid resource lookup data provided (mismatched type).")
+
+        try:
+            object_list = self.get_object_list(bundle.request).filter(**{'%s__in' % detail_uri_name: values})
+            object_list = self.authorized_read_list(object_list, bundle)
+            found = {}
+
+            for obj in object_list:
+                found[getattr(obj, field.attname)] = obj
         except ValueError:
             raise NotFound("Invalid resource lookup data provided (mismatched type).")
+        except Unauthorized:
+            found = {}
+
+        objects = []
+        not_found = []
+
+        for identifier, value in zip(identifiers, values):
+            if value in found:
+                objects.append(found[value])
+            else:
+                not_found.append(identifier)
+
+        return objects, not_found
 
     def obj_create(self, bundle, **kwargs):
         """
@@ -2149,6 +2927,7 @@ class BaseModelResource(Resource):
         """
         objects_to_delete = self.obj_get_list(bundle=bundle, **kwargs)
         deletable_objects = self.authorized_delete_list(objects_to_delete, bundle)
+        self._forget_identities(bundle.request, self._meta.object_class)
 
         if hasattr(deletable_objects, 'delete'):
             # It's likely a ``QuerySet``. Call ``.delete()`` for efficiency.
@@ -2163,6 +2942,7 @@ class BaseModelResource(Resource):
         """
         objects_to_delete = self.obj_get_list(bundle=bundle, **kwargs)
         deletable_objects = self.authorized_update_list(objects_to_delete, bundle)
+        self._forget_identities(bundle.request, self._meta.object_class)
 
         if hasattr(deletable_objects, 'delete'):
             # It's likely a ``QuerySet``. Call ``.delete()`` for efficiency.
@@ -2185,6 +2965,7 @@ class BaseModelResource(Resource):
                 raise NotFound("A model instance matching the provided arguments could not be found.")
 
         self.authorized_delete_detail(self.get_object_list(bundle.request), bundle)
+        self._forget_identities(bundle.request, bundle.obj.__class__, pk=bundle.obj.pk)
         bundle.obj.delete()
 
     @transaction.commit_on_success()
@@ -2229,6 +3010,7 @@ class BaseModelResource(Resource):
         # Save the main object.
         bundle.obj.save()
         bundle.objects_saved.add(self.create_identifier(bundle.obj))
+        self._forget_identities(bundle.request, bundle.obj.__class__, pk=bundle.obj.pk, keep=bundle.obj)
 
         # Now pick up the M2M bits.
         m2m_bundle = self.hydrate_m2m(bundle)
@@ -2419,6 +3201,24 @@ def convert_post_to_VERB(request, verb):
     return request
 
 
+def detach_bundles(data):
+    """
+    Copies dehydrated data, swapping any nested ``Bundle`` objects for ones
+    carrying just their data, so it can be cached without the objects &
+    requests they refer to.
+    """
+    if isinstance(data, Bundle):
+        return Bundle(data=detach_bundles(data.data))
+
+    if isinstance(data, dict):
+        return dict((key, detach_bundles(value)) for key, value in data.items())
+
+    if isinstance(data, (list, tuple)):
+        return [detach_bundles(value) for value in data]
+
+    return data
+
+
 def convert_post_to_put(request):
     return convert_post_to_VERB(request, verb='PUT')
 
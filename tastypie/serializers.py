@@ -6,7 +6,6 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.utils import six
 from django.utils.encoding import force_text, smart_bytes
-from django.core.serializers import json as djangojson
 
 from tastypie.bundle import Bundle
 from tastypie.exceptions import BadRequest, UnsupportedFormat
@@ -85,6 +84,11 @@ class Serializer(object):
 
     formats = ['json', 'xml', 'yaml', 'html', 'plist']
 
+    # The module used to encode JSON. Anything with a ``json``-compatible
+    # ``dumps`` (accepting ``default``) will do, such as ``simplejson``.
+    json_module = json
+    json_sort_keys = True
+
     content_types = {'json': 'application/json',
                      'jsonp': 'text/javascript',
                      'xml': 'application/xml',
@@ -120,6 +124,18 @@ class Serializer(object):
             except KeyError:
                 raise ImproperlyConfigured("Content type for specified type '%s' not found. Please provide it at either the class level or via the arguments." % format)
 
+        # Map each content type to the methods handling it up front, rather
+        # than hunting for them on every call.
+        self._serializers = {}
+        self._deserializers = {}
+
+        for short_format, long_format in self.content_types.items():
+            if long_format not in self._serializers and hasattr(self, "to_%s" % short_format):
+                self._serializers[long_format] = getattr(self, "to_%s" % short_format)
+
+            if long_format not in self._deserializers and hasattr(self, "from_%s" % short_format):
+                self._deserializers[long_format] = getattr(self, "from_%s" % short_format)
+
     def get_mime_for_format(self, format):
         """
         Given a format, attempts to determine the correct MIME type.
@@ -186,18 +202,12 @@ class Serializer(object):
         Given some data and a format, calls the correct method to serialize
         the data and returns the result.
         """
-        desired_format = None
-
-        for short_format, long_format in self.content_types.items():
-            if format == long_format:
-                if hasattr(self, "to_%s" % short_format):
-                    desired_format = short_format
-                    break
-
-        if desired_format is None:
+        try:
+            serializer = self._serializers[format]
+        except KeyError:
             raise UnsupportedFormat("The format indicated '%s' had no available serialization method. Please check your ``formats`` and ``content_types`` on your Serializer." % format)
 
-        serialized = getattr(self, "to_%s" % desired_format)(bundle, options)
+        serialized = serializer(bundle, options)
         return serialized
 
     def deserialize(self, content, format='application/json'):
@@ -205,23 +215,17 @@ class Serializer(object):
         Given some data and a format, calls the correct method to deserialize
         the data and returns the result.
         """
-        desired_format = None
-
         format = format.split(';')[0]
 
-        for short_format, long_format in self.content_types.items():
-            if format == long_format:
-                if hasattr(self, "from_%s" % short_format):
-                    desired_format = short_format
-                    break
-
-        if desired_format is None:
+        try:
+            deserializer = self._deserializers[format]
+        except KeyError:
             raise UnsupportedFormat("The format indicated '%s' had no available deserialization method. Please check your ``formats`` and ``content_types`` on your Serializer." % format)
 
         if isinstance(content, six.binary_type):
             content = force_text(content)
 
-        deserialized = getattr(self, "from_%s" % desired_format)(content)
+        deserialized = deserializer(content)
         return deserialized
 
     def to_simple(self, data, options):
@@ -266,6 +270,54 @@ class Serializer(object):
         else:
             return force_text(data)
 
+    def to_json_native(self, data, options):
+        """
+        Used as the ``default`` when encoding JSON, converts a single piece of
+        data JSON can't handle natively to something it can.
+
+        Unlike ``to_simple``, this only converts the top level, leaving any
+        containers within to the encoder. Bundles and related data are never
+        copied.
+        """
+        if isinstance(data, Bundle):
+            return data.data
+        elif hasattr(data, 'dehydrated_type'):
+            if getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == False:
+                if data.full:
+                    return data.fk_resource
+                else:
+                    return data.value
+            elif getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == True:
+                if data.full:
+                    return data.m2m_bundles
+                else:
+                    return data.value
+            else:
+                return data.value
+        elif isinstance(data, datetime.datetime):
+            return self.format_datetime(data)
+        elif isinstance(data, datetime.date):
+            return self.format_date(data)
+        elif isinstance(data, datetime.time):
+            return self.format_time(data)
+        else:
+            return force_text(data)
+
+    def json_dumps(self, data, options=None):
+        """
+        Encodes the data to JSON in a single pass, using ``to_json_native``
+        for anything the encoder doesn't understand.
+
+        If ``to_simple`` has been overridden, the data is run through it
+        first (as it was before), so customizations still apply.
+        """
+        options = options or {}
+
+        if six.get_method_function(self.to_simple) is not six.get_unbound_function(Serializer.to_simple):
+            data = self.to_simple(data, options)
+
+        return self.json_module.dumps(data, default=lambda obj: self.to_json_native(obj, options), sort_keys=self.json_sort_keys, ensure_ascii=False)
+
     def to_etree(self, data, options=None, name=None, depth=0):
         """
         Given some data, converts that data to an ``etree.Element`` suitable
@@ -367,9 +419,51 @@ class Serializer(object):
         Given some Python data, produces JSON output.
         """
         options = options or {}
-        data = self.to_simple(data, options)
+        return self.json_dumps(data, options)
+
+    def to_json_iter(self, data, collection_name='objects', options=None):
+        """
+        Given some Python data, produces the same JSON output as ``to_json``
+        in chunks.
+
+        The ``collection_name`` key of ``data`` may be any iterable (such as a
+        generator), whose items are converted & encoded one at a time, so
+        they never need to be held in memory together.
+        """
+        options = options or {}
+
+        def dumps(value):
+            return self.json_dumps(value, options)
+
+        keys = list(data.keys())
+
+        if self.json_sort_keys:
+            keys = sorted(keys)
+
+        pending = '{'
+
+        for i, key in enumerate(keys):
+            if i:
+                pending += ', '
+
+            pending += '%s: ' % dumps(six.text_type(key))
+
+            if key != collection_name:
+                pending += dumps(data[key])
+                continue
+
+            pending += '['
+
+            for j, item in enumerate(data[key]):
+                if j:
+                    pending += ', '
+
+                yield pending + dumps(item)
+                pending = ''
+
+            pending += ']'
 
-        return djangojson.json.dumps(data, cls=djangojson.DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+        yield pending + '}'
 
     def from_json(self, content):
         """
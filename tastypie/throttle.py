@@ -1,6 +1,14 @@
 from __future__ import unicode_literals
+import atexit
+import logging
+import threading
 import time
 from django.core.cache import cache
+from django.db import connection
+from tastypie.compat import OrderedDict
+
+
+log = logging.getLogger('django.request.tastypie')
 
 
 class BaseThrottle(object):
@@ -103,6 +111,350 @@ class CacheThrottle(BaseThrottle):
         cache.set(key, times_accessed, self.expiration)
 
 
+class CacheBucketThrottle(BaseThrottle):
+    """
+    A throttling mechanism that uses counters in the cache.
+
+    Rather than keeping a list of access times, each user gets a counter per
+    ``timeframe`` which is bumped with the cache's atomic ``incr``, so every
+    check is a fixed amount of work & concurrent processes don't lose counts.
+
+    By default (``sliding=True``), the count is estimated over a sliding
+    window, weighting the previous timeframe's counter by how much of it
+    still falls within the window. With ``sliding=False``, counts reset at
+    the start of each timeframe.
+
+    The ``expiration`` is unused, as counters only need to live for two
+    timeframes.
+    """
+    def __init__(self, throttle_at=150, timeframe=3600, expiration=None, sliding=True):
+        super(CacheBucketThrottle, self).__init__(throttle_at=throttle_at, timeframe=timeframe, expiration=expiration)
+        self.sliding = sliding
+
+    def get_bucket_key(self, identifier, bucket):
+        """
+        Generates the cache key for the user's counter in the given bucket.
+        """
+        return "%s_%d" % (self.convert_identifier_to_key(identifier), bucket)
+
+    def get_access_count(self, identifier, now=None):
+        """
+        Returns the (possibly estimated) number of times the user has accessed
+        the api within the timeframe.
+        """
+        if now is None:
+            now = time.time()
+
+        timeframe = int(self.timeframe)
+        bucket = int(now // timeframe)
+        current_key = self.get_bucket_key(identifier, bucket)
+
+        if not self.sliding:
+            return cache.get(current_key, 0)
+
+        previous_key = self.get_bucket_key(identifier, bucket - 1)
+        counts = cache.get_many([current_key, previous_key])
+        elapsed = (now % timeframe) / float(timeframe)
+        return counts.get(current_key, 0) + counts.get(previous_key, 0) * (1 - elapsed)
+
+    def should_be_throttled(self, identifier, **kwargs):
+        """
+        Returns whether or not the user has exceeded their throttle limit.
+
+        Returns ``False`` if the user should NOT be throttled or ``True`` if
+        the user should be throttled.
+        """
+        return self.get_access_count(identifier) >= int(self.throttle_at)
+
+    def record_accesses(self, identifier, count=1, now=None):
+        """
+        Adds ``count`` accesses to the user's counter for the current bucket.
+        """
+        if now is None:
+            now = time.time()
+
+        timeframe = int(self.timeframe)
+        key = self.get_bucket_key(identifier, int(now // timeframe))
+        # Long enough to still be around as the previous bucket.
+        timeout = timeframe * 2
+
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # No counter yet. If another process beats us to creating it,
+            # fall back to incrementing theirs.
+            if not cache.add(key, count, timeout):
+                cache.incr(key, count)
+
+    def accessed(self, identifier, **kwargs):
+        """
+        Handles recording the user's access.
+
+        Increments the user's counter for the current bucket.
+        """
+        self.record_accesses(identifier)
+
+
+class TokenBucketThrottle(CacheBucketThrottle):
+    """
+    A token bucket throttle which mostly works in-process, only talking to
+    the cache now & then.
+
+    Each process keeps an approximate bucket of tokens per user, refilled at
+    ``throttle_at`` tokens per ``timeframe``, which requests are checked
+    against & drawn from locally. The bucket is synchronized with the shared
+    counters of ``CacheBucketThrottle`` (pushing the accesses seen locally &
+    refilling from the global count) when any of these are true:
+
+        * ``sync_every`` requests have been seen since the last sync.
+        * ``sync_interval`` seconds have passed since the last sync.
+        * Fewer than ``error_bound`` (a fraction of ``throttle_at``) tokens
+          remain, so checks near the limit are always accurate.
+
+    Between syncs, each process can let through at most ``sync_every``
+    requests the other processes don't yet know about. Local state is kept
+    for up to ``max_identifiers`` users, least recently seen first out (any
+    accesses they still had to report are pushed to the cache as they go).
+    """
+    def __init__(self, throttle_at=150, timeframe=3600, expiration=None, sliding=True, sync_every=10, sync_interval=1.0, error_bound=0.1, max_identifiers=10000):
+        super(TokenBucketThrottle, self).__init__(throttle_at=throttle_at, timeframe=timeframe, expiration=expiration, sliding=sliding)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.error_bound = error_bound
+        self.max_identifiers = max_identifiers
+        self._buckets = OrderedDict()
+        self._unreported = []
+        self._lock = threading.Lock()
+
+    def _get_local_bucket(self, identifier, now):
+        # Must be called with the lock held.
+        bucket = self._buckets.pop(identifier, None)
+
+        if bucket is not None:
+            # Most recently used goes last.
+            self._buckets[identifier] = bucket
+            # Top it up for the time passed.
+            rate = int(self.throttle_at) / float(self.timeframe)
+            bucket['tokens'] = min(float(self.throttle_at), bucket['tokens'] + (now - bucket['updated_at']) * rate)
+            bucket['updated_at'] = now
+            return bucket
+
+        while self._buckets and len(self._buckets) >= self.max_identifiers:
+            # Forget the least recently used, keeping hold of any accesses it
+            # had yet to report (see ``report_evicted``).
+            evicted_identifier = next(iter(self._buckets))
+            evicted = self._buckets.pop(evicted_identifier)
+
+            if evicted['pending']:
+                self._unreported.append((evicted_identifier, evicted['pending']))
+                evicted['pending'] = 0
+
+        bucket = self._buckets[identifier] = {
+            'tokens': 0.0,
+            'pending': 0,
+            'synced_at': None,
+            'updated_at': now,
+        }
+        return bucket
+
+    def report_evicted(self, now=None):
+        """
+        Pushes the accesses of users evicted from the local state to the
+        cache, so they still count towards the global limit.
+        """
+        with self._lock:
+            unreported, self._unreported = self._unreported, []
+
+        for identifier, pending in unreported:
+            self.record_accesses(identifier, pending, now=now)
+
+    def needs_sync(self, bucket, now):
+        """
+        Determines whether the local bucket should be synchronized with the
+        cache before it's used.
+        """
+        if bucket['synced_at'] is None:
+            return True
+
+        if bucket['pending'] >= self.sync_every:
+            return True
+
+        if now - bucket['synced_at'] >= self.sync_interval:
+            return True
+
+        return bucket['tokens'] < max(1, int(self.throttle_at) * self.error_bound)
+
+    def sync(self, identifier, now=None):
+        """
+        Pushes the accesses seen locally to the cache, then refills the local
+        bucket from the global count.
+        """
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            bucket = self._get_local_bucket(identifier, now)
+            pending = bucket['pending']
+            bucket['pending'] = 0
+
+        if pending:
+            self.record_accesses(identifier, pending, now=now)
+
+        self.report_evicted(now=now)
+        count = self.get_access_count(identifier, now=now)
+
+        with self._lock:
+            # Look it up again, in case it was evicted in the meantime.
+            bucket = self._get_local_bucket(identifier, now)
+            # Anything accessed since we started is still to be reported.
+            bucket['tokens'] = max(0.0, int(self.throttle_at) - count - bucket['pending'])
+            bucket['synced_at'] = now
+
+    def should_be_throttled(self, identifier, **kwargs):
+        """
+        Returns whether or not the user has exceeded their throttle limit.
+
+        Returns ``False`` if the user should NOT be throttled or ``True`` if
+        the user should be throttled.
+        """
+        now = time.time()
+
+        with self._lock:
+            bucket = self._get_local_bucket(identifier, now)
+            sync = self.needs_sync(bucket, now)
+
+        if sync:
+            self.sync(identifier, now=now)
+        else:
+            self.report_evicted(now=now)
+
+        with self._lock:
+            return self._get_local_bucket(identifier, now)['tokens'] < 1
+
+    def accessed(self, identifier, **kwargs):
+        """
+        Handles recording the user's access.
+
+        Takes a token from the local bucket. The access is reported to the
+        cache on the next sync.
+        """
+        now = time.time()
+
+        with self._lock:
+            bucket = self._get_local_bucket(identifier, now)
+            bucket['tokens'] = max(0.0, bucket['tokens'] - 1)
+            bucket['pending'] += 1
+
+        self.report_evicted(now=now)
+
+
+class ApiAccessBuffer(object):
+    """
+    Collects ``ApiAccess`` rows in memory & writes them to the database in
+    batches with ``bulk_create``, from a background thread.
+
+    The rows are flushed once ``flush_size`` have been collected or every
+    ``flush_interval`` seconds, whichever comes first, as well as when the
+    process exits.
+
+    Batches which fail to be written are kept for the next flush. At most
+    ``max_pending`` rows are held (the oldest are dropped past that), so a
+    database outage can't use up all the memory.
+    """
+    def __init__(self, flush_size=100, flush_interval=5.0, max_pending=10000):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._exit_registered = False
+
+    def add(self, identifier, url='', request_method=''):
+        """
+        Queues an access to be written out.
+        """
+        # Do the import here, instead of top-level, so that the model is
+        # only required when using this throttling mechanism.
+        from tastypie.models import ApiAccess
+
+        # Timestamp it now, not when it's written.
+        access = ApiAccess(identifier=identifier, url=url, request_method=request_method, accessed=int(time.time()))
+
+        with self._lock:
+            self._pending.append(access)
+            self._trim()
+            pending = len(self._pending)
+
+        self.start()
+
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Writes out all the queued accesses. Returns how many were written.
+        """
+        from tastypie.models import ApiAccess
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        if pending:
+            try:
+                ApiAccess.objects.bulk_create(pending)
+            except Exception:
+                # Put the batch back in front of anything queued since, to be
+                # retried on the next flush.
+                with self._lock:
+                    self._pending[:0] = pending
+                    self._trim()
+
+                raise
+
+        return len(pending)
+
+    def _trim(self):
+        # Expects ``_lock`` to be held.
+        excess = len(self._pending) - self.max_pending
+
+        if excess > 0:
+            log.warning("Dropping %d unwritten API accesses.", excess)
+            del self._pending[:excess]
+
+    def start(self):
+        """
+        Starts the background thread, if it isn't already running (say,
+        because the process has been forked since).
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            if not self._exit_registered:
+                atexit.register(self.flush)
+                self._exit_registered = True
+
+            self._thread = threading.Thread(target=self.run, name='tastypie-apiaccess-writer')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Failed to write out API accesses.")
+            finally:
+                # Don't hold a connection open (or let a broken one linger)
+                # between flushes.
+                connection.close()
+
+
 class CacheDBThrottle(CacheThrottle):
     """
     A throttling mechanism that uses the cache for actual throttling but
@@ -110,7 +462,18 @@ class CacheDBThrottle(CacheThrottle):
 
     This is useful for tracking/aggregating usage through time, to possibly
     build a statistics interface or a billing mechanism.
+
+    With ``write_behind=True``, accesses are written out in batches by an
+    ``ApiAccessBuffer`` (configured by ``flush_size``, ``flush_interval`` &
+    ``max_pending``) rather than within the request.
     """
+    def __init__(self, throttle_at=150, timeframe=3600, expiration=None, write_behind=False, flush_size=100, flush_interval=5.0, max_pending=10000):
+        super(CacheDBThrottle, self).__init__(throttle_at=throttle_at, timeframe=timeframe, expiration=expiration)
+        self.access_buffer = None
+
+        if write_behind:
+            self.access_buffer = ApiAccessBuffer(flush_size=flush_size, flush_interval=flush_interval, max_pending=max_pending)
+
     def accessed(self, identifier, **kwargs):
         """
         Handles recording the user's access.
@@ -122,6 +485,15 @@ class CacheDBThrottle(CacheThrottle):
         # only required when using this throttling mechanism.
         from tastypie.models import ApiAccess
         super(CacheDBThrottle, self).accessed(identifier, **kwargs)
+
+        if self.access_buffer is not None:
+            self.access_buffer.add(
+                identifier=identifier,
+                url=kwargs.get('url', ''),
+                request_method=kwargs.get('request_method', '')
+            )
+            return
+
         # Write out the access to the DB for logging purposes.
         ApiAccess.objects.create(
             identifier=identifier,
@@ -1,10 +1,53 @@
 from __future__ import unicode_literals
 
+import threading
+
 import mimeparse
 
+from tastypie.compat import OrderedDict
 from tastypie.exceptions import BadRequest
 
 
+# How many ``(formats, Accept header)`` pairs ``best_match`` remembers.
+BEST_MATCH_CACHE_SIZE = 256
+
+_best_match_cache = OrderedDict()
+_best_match_lock = threading.Lock()
+
+
+def best_match(formats, header):
+    """
+    Finds the best match for the ``Accept`` header among the ``formats``,
+    which should be in order of preference.
+
+    Clients tend to send the same handful of headers, so the results are kept
+    in a least-recently-used cache of ``BEST_MATCH_CACHE_SIZE`` entries.
+
+    Raises ``ValueError`` if the header is malformed.
+    """
+    key = (tuple(formats), header)
+
+    with _best_match_lock:
+        if key in _best_match_cache:
+            # Move it to the most recently used end.
+            result = _best_match_cache.pop(key)
+            _best_match_cache[key] = result
+            return result
+
+    # Reverse the list, because mimeparse is weird like that. See also
+    # https://github.com/toastdriven/django-tastypie/issues#issue/12 for
+    # more information.
+    result = mimeparse.best_match(list(reversed(key[0])), header)
+
+    with _best_match_lock:
+        _best_match_cache[key] = result
+
+        while len(_best_match_cache) > BEST_MATCH_CACHE_SIZE:
+            _best_match_cache.pop(next(iter(_best_match_cache)))
+
+    return result
+
+
 def determine_format(request, serializer, default_format='application/json'):
     """
     Tries to "smartly" determine which output format is desired.
@@ -32,14 +75,8 @@ def determine_format(request, serializer, default_format='application/json'):
 
     # Try to fallback on the Accepts header.
     if request.META.get('HTTP_ACCEPT', '*/*') != '*/*':
-        formats = list(serializer.supported_formats) or []
-        # Reverse the list, because mimeparse is weird like that. See also
-        # https://github.com/toastdriven/django-tastypie/issues#issue/12 for
-        # more information.
-        formats.reverse()
-
         try:
-            best_format = mimeparse.best_match(formats, request.META['HTTP_ACCEPT'])
+            best_format = best_match(serializer.supported_formats or [], request.META['HTTP_ACCEPT'])
         except ValueError:
             raise BadRequest('Invalid Accept header')
 
@@ -3,12 +3,14 @@ import os
 import time
 import unittest
 import warnings
+import mock
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.test import TestCase
 from django.test.testcases import skipIf
-from tastypie.authentication import Authentication, BasicAuthentication, ApiKeyAuthentication, SessionAuthentication, DigestAuthentication, OAuthAuthentication, MultiAuthentication
+from tastypie.authentication import CredentialCache, DigestNonceStore, Authentication, BasicAuthentication, ApiKeyAuthentication, SessionAuthentication, DigestAuthentication, OAuthAuthentication, MultiAuthentication
 from tastypie.http import HttpUnauthorized
 from tastypie.models import ApiKey, create_api_key
 
@@ -134,6 +136,61 @@ class BasicAuthenticationTestCase(TestCase):
         request.META['HTTP_AUTHORIZATION'] = 'Basic %s' % base64.b64encode('bobdoe:pass'.encode('utf-8')).decode('utf-8')
         self.assertTrue(auth.is_authenticated(request))
 
+    def test_memoized(self):
+        auth = BasicAuthentication()
+        john_doe = User.objects.get(username='johndoe')
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'Basic %s' % base64.b64encode('johndoe:pass'.encode('utf-8')).decode('utf-8')
+
+        with mock.patch('tastypie.authentication.authenticate', return_value=john_doe) as mocked_authenticate:
+            self.assertEqual(auth.is_authenticated(request), True)
+            self.assertEqual(auth.is_authenticated(request), True)
+            # Through ``MultiAuthentication`` too.
+            self.assertEqual(MultiAuthentication(auth).is_authenticated(request), True)
+            self.assertEqual(mocked_authenticate.call_count, 1)
+
+            # A new request starts over.
+            request_2 = HttpRequest()
+            request_2.META['HTTP_AUTHORIZATION'] = request.META['HTTP_AUTHORIZATION']
+            self.assertEqual(auth.is_authenticated(request_2), True)
+            self.assertEqual(mocked_authenticate.call_count, 2)
+
+        self.assertEqual(request.user, john_doe)
+
+    def test_credential_cache(self):
+        auth = BasicAuthentication(credential_cache=CredentialCache())
+        john_doe = User.objects.get(username='johndoe')
+        john_doe.set_password('pass')
+        john_doe.save()
+        header = 'Basic %s' % base64.b64encode('johndoe:pass'.encode('utf-8')).decode('utf-8')
+
+        def make_request(header):
+            request = HttpRequest()
+            request.META['HTTP_AUTHORIZATION'] = header
+            return request
+
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.verify', return_value=True) as mocked_verify:
+            self.assertEqual(auth.is_authenticated(make_request(header)), True)
+            self.assertEqual(mocked_verify.call_count, 1)
+
+            # No hashing the second time around.
+            request = make_request(header)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(auth.is_authenticated(request), True)
+
+            self.assertEqual(mocked_verify.call_count, 1)
+            self.assertEqual(request.user.pk, john_doe.pk)
+
+        # Failures aren't cached.
+        bad_header = 'Basic %s' % base64.b64encode('johndoe:wrong'.encode('utf-8')).decode('utf-8')
+        self.assertTrue(isinstance(auth.is_authenticated(make_request(bad_header)), HttpUnauthorized))
+
+        # Changing the password invalidates the old one.
+        john_doe.set_password('new')
+        john_doe.save()
+        self.assertTrue(isinstance(auth.is_authenticated(make_request(header)), HttpUnauthorized))
+
 
 class ApiKeyAuthenticationTestCase(TestCase):
     fixtures = ['note_testdata.json']
@@ -224,6 +281,204 @@ class ApiKeyAuthenticationTestCase(TestCase):
         request.META['HTTP_AUTHORIZATION'] = 'ApiKey bobdoe:%s' % bob_doe.api_key.key
         self.assertTrue(auth.is_authenticated(request))
 
+    def test_single_query(self):
+        auth = ApiKeyAuthentication()
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % john_doe.api_key.key
+
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.is_authenticated(request), True)
+
+        self.assertEqual(request.user.pk, john_doe.pk)
+
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:wrong'
+
+        with self.assertNumQueries(1):
+            self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+
+    def test_custom_get_key(self):
+        class CustomApiKeyAuthentication(ApiKeyAuthentication):
+            def get_key(self, user, api_key):
+                if api_key == 'letmein':
+                    return True
+
+                return self._unauthorized()
+
+        auth = CustomApiKeyAuthentication(credential_cache=CredentialCache())
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:letmein'
+
+        self.assertEqual(auth.is_authenticated(request), True)
+        self.assertEqual(request.user.username, 'johndoe')
+
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:nope'
+        self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+
+        # Verified ones are cached, even with a custom check.
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:letmein'
+
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.is_authenticated(request), True)
+
+    def test_credential_cache(self):
+        auth = ApiKeyAuthentication(credential_cache=CredentialCache())
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+        key = john_doe.api_key.key
+
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % key
+
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.is_authenticated(request), True)
+
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % key
+
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.is_authenticated(request), True)
+
+        self.assertEqual(request.user.pk, john_doe.pk)
+
+        # Failures aren't cached.
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:wrong'
+
+        with self.assertNumQueries(1):
+            self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+
+        # Changing the user invalidates their credentials.
+        john_doe.is_active = False
+        john_doe.save()
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % key
+
+        with self.assertNumQueries(1):
+            self.assertFalse(auth.is_authenticated(request))
+
+        # As does changing their key.
+        john_doe.is_active = True
+        john_doe.save()
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % key
+        self.assertEqual(auth.is_authenticated(request), True)
+        john_doe.api_key.key = 'new'
+        john_doe.api_key.save()
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % key
+        self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+
+    def test_memoized(self):
+        auth = ApiKeyAuthentication()
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:%s' % john_doe.api_key.key
+
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.is_authenticated(request), True)
+            self.assertEqual(auth.is_authenticated(request), True)
+            self.assertEqual(auth.get_identifier(request), 'johndoe')
+
+        with mock.patch.object(auth, 'extract_credentials') as mocked_extract:
+            self.assertEqual(auth.get_identifier(request), 'johndoe')
+            self.assertFalse(mocked_extract.called)
+
+        # Different credentials are checked afresh.
+        request.META['HTTP_AUTHORIZATION'] = 'ApiKey johndoe:wrong'
+
+        with self.assertNumQueries(1):
+            self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+
+        # Instances don't share.
+        with self.assertNumQueries(1):
+            self.assertTrue(isinstance(ApiKeyAuthentication().is_authenticated(request), HttpUnauthorized))
+
+
+class CredentialCacheTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+
+    def tearDown(self):
+        cache.clear()
+        super(CredentialCacheTestCase, self).tearDown()
+
+    def test_local(self):
+        credential_cache = CredentialCache(timeout=60, max_entries=2)
+        john_doe = User.objects.get(username='johndoe')
+        jane_doe = User.objects.get(username='janedoe')
+        self.assertEqual(credential_cache.get('johndoe', 'secret'), None)
+
+        with mock.patch('tastypie.authentication.time.time', return_value=1000):
+            credential_cache.set('johndoe', 'secret', john_doe)
+            credential_cache.set('janedoe', 'secret', jane_doe)
+            cached = credential_cache.get('johndoe', 'secret')
+            self.assertEqual(cached.pk, john_doe.pk)
+            # Each request gets its own copy.
+            self.assertFalse(cached is credential_cache.get('johndoe', 'secret'))
+            self.assertEqual(credential_cache.get('johndoe', 'wrong'), None)
+
+            # The least recently used goes first.
+            credential_cache.set('bobdoe', 'secret', john_doe)
+            self.assertEqual(credential_cache.get('janedoe', 'secret'), None)
+            self.assertEqual(credential_cache.get('johndoe', 'secret').pk, john_doe.pk)
+
+        with mock.patch('tastypie.authentication.time.time', return_value=1061):
+            self.assertEqual(credential_cache.get('johndoe', 'secret'), None)
+
+        # Only hashes are used as keys.
+        key = credential_cache.make_key('johndoe', 'secret')
+        self.assertTrue(key.startswith('tastypie_credentials_'))
+        self.assertFalse('secret' in key)
+        self.assertNotEqual(key, credential_cache.make_key('johndoe', 'other'))
+
+    def test_shared(self):
+        credential_cache_1 = CredentialCache(cache_name='default')
+        credential_cache_2 = CredentialCache(cache_name='default')
+        john_doe = User.objects.get(username='johndoe')
+
+        with mock.patch('tastypie.authentication.time.time', return_value=1000):
+            credential_cache_1.set('johndoe', 'secret', john_doe)
+
+        # Another process picks it up.
+        with mock.patch('tastypie.authentication.time.time', return_value=1001):
+            self.assertEqual(credential_cache_2.get('johndoe', 'secret').pk, john_doe.pk)
+
+            # Invalidating reaches the shared cache too.
+            credential_cache_2.clear()
+            credential_cache_1.invalidate(john_doe.pk)
+            self.assertEqual(credential_cache_1.get('johndoe', 'secret'), None)
+            self.assertEqual(credential_cache_2.get('johndoe', 'secret'), None)
+
+        with mock.patch('tastypie.authentication.time.time', return_value=1002):
+            credential_cache_1.set('johndoe', 'secret', john_doe)
+            credential_cache_2.clear()
+            self.assertEqual(credential_cache_2.get('johndoe', 'secret').pk, john_doe.pk)
+
+    def test_signals(self):
+        credential_cache = CredentialCache(cache_name='default')
+        john_doe = User.objects.get(username='johndoe')
+        jane_doe = User.objects.get(username='janedoe')
+        credential_cache.set('johndoe', 'secret', john_doe)
+        # What the client typed needn't be the username (say, with an email
+        # or case-insensitive backend).
+        credential_cache.set('JohnDoe@example.com', 'secret', john_doe)
+        credential_cache.set('janedoe', 'secret', jane_doe)
+
+        john_doe.save()
+        self.assertEqual(credential_cache.get('johndoe', 'secret'), None)
+        self.assertEqual(credential_cache.get('JohnDoe@example.com', 'secret'), None)
+        self.assertNotEqual(credential_cache.get('janedoe', 'secret'), None)
+
+        # Nor do other processes pick it back up from the shared cache.
+        credential_cache.clear()
+        self.assertEqual(credential_cache.get('JohnDoe@example.com', 'secret'), None)
+        self.assertNotEqual(credential_cache.get('janedoe', 'secret'), None)
+
 
 class SessionAuthenticationTestCase(TestCase):
     fixtures = ['note_testdata.json']
@@ -363,6 +618,100 @@ class DigestAuthenticationTestCase(TestCase):
         auth_request = auth.is_authenticated(request)
         self.assertFalse(auth_request)
 
+    def make_digest_request(self, challenge, user, nonce_count=1):
+        request = HttpRequest()
+        request.META['HTTP_AUTHORIZATION'] = python_digest.build_authorization_request(
+            username=user.username,
+            method=request.method,
+            uri='/',
+            nonce_count=nonce_count,
+            digest_challenge=python_digest.parse_digest_challenge(challenge['WWW-Authenticate']),
+            password=user.api_key.key
+        )
+        return request
+
+    def test_nonce_store(self):
+        auth = DigestAuthentication(nonce_store=DigestNonceStore(timeout=300))
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+
+        with mock.patch('tastypie.authentication.time.time', return_value=1000):
+            challenge = auth.is_authenticated(HttpRequest())
+            self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe)), True)
+
+            # Replaying the same nonce count fails...
+            self.assertTrue(isinstance(auth.is_authenticated(self.make_digest_request(challenge, john_doe)), HttpUnauthorized))
+            # ...but the next one's fine.
+            self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe, nonce_count=2)), True)
+
+        # Once the nonce is too old, the client's told to get a new one.
+        with mock.patch('tastypie.authentication.time.time', return_value=1301):
+            auth_request = auth.is_authenticated(self.make_digest_request(challenge, john_doe, nonce_count=3))
+            self.assertTrue(isinstance(auth_request, HttpUnauthorized))
+            self.assertTrue('stale="true"' in auth_request['WWW-Authenticate'].lower())
+
+        # Garbage doesn't use up nonce counts.
+        auth = DigestAuthentication(nonce_store=DigestNonceStore(timeout=300))
+        challenge = auth.is_authenticated(HttpRequest())
+        request = self.make_digest_request(challenge, john_doe)
+        request.META['HTTP_AUTHORIZATION'] = request.META['HTTP_AUTHORIZATION'].replace('username="johndoe"', 'username="janedoe"')
+        self.assertTrue(isinstance(auth.is_authenticated(request), HttpUnauthorized))
+        self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe)), True)
+
+    def test_credential_cache(self):
+        auth = DigestAuthentication(credential_cache=CredentialCache())
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+        challenge = auth.is_authenticated(HttpRequest())
+
+        self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe)), True)
+
+        request = self.make_digest_request(challenge, john_doe, nonce_count=2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.is_authenticated(request), True)
+
+        self.assertEqual(request.user.pk, john_doe.pk)
+
+        # Changing the key invalidates the cached digest.
+        old_key = john_doe.api_key.key
+        john_doe.api_key.key = 'new'
+        john_doe.api_key.save()
+        request = self.make_digest_request(challenge, john_doe, nonce_count=3)
+        self.assertEqual(auth.is_authenticated(request), True)
+        john_doe.api_key.key = old_key
+        self.assertTrue(isinstance(auth.is_authenticated(self.make_digest_request(challenge, john_doe, nonce_count=4)), HttpUnauthorized))
+
+    def test_nonce_store_without_qop(self):
+        nonce_store = DigestNonceStore(timeout=300)
+
+        # No ``qop`` means no nonce count to track, so only expiry applies.
+        self.assertTrue(nonce_store.use('abc', None))
+        self.assertTrue(nonce_store.use('abc', None))
+
+        self.assertTrue(nonce_store.use('abc', '00000001'))
+        self.assertFalse(nonce_store.use('abc', '00000001'))
+        cache.clear()
+
+    def test_credential_cache_not_shared(self):
+        credential_cache = CredentialCache(cache_name='default')
+        auth = DigestAuthentication(credential_cache=credential_cache)
+        john_doe = User.objects.get(username='johndoe')
+        create_api_key(User, instance=john_doe, created=True)
+        challenge = auth.is_authenticated(HttpRequest())
+
+        try:
+            self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe)), True)
+
+            # The partial digest stays in-process.
+            self.assertEqual(cache.get(credential_cache.make_key('johndoe', auth.realm)), None)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(auth.is_authenticated(self.make_digest_request(challenge, john_doe, nonce_count=2)), True)
+        finally:
+            credential_cache.clear()
+            cache.clear()
+
     def test_check_active_false(self):
         auth = DigestAuthentication(require_active=False)
         request = HttpRequest()
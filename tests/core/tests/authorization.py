@@ -1,3 +1,5 @@
+import mock
+from django.core.cache import cache
 from django.test import TestCase
 from django.http import HttpRequest
 from django.contrib.auth.models import User, Permission
@@ -238,3 +240,77 @@ class DjangoAuthorizationTestCase(TestCase):
         bundle.request.method = 'DELETE'
         self.assertEqual(len(auth.delete_list(resource.get_object_list(bundle.request), bundle)), 4)
         self.assertTrue(auth.delete_detail(resource.get_object_list(bundle.request)[0], bundle))
+
+    def test_permissions_checked_once(self):
+        self.user.user_permissions.add(self.add)
+        user = User.objects.get(pk=self.user.pk)
+        request = HttpRequest()
+        request.user = user
+
+        resource = DjangoNoteResource()
+        auth = resource._meta.authorization
+        bundle = resource.build_bundle(request=request)
+        object_list = resource.get_object_list(bundle.request)
+        notes = list(object_list)
+
+        with mock.patch.object(User, 'has_perm', return_value=True) as mocked_has_perm:
+            self.assertEqual(len(auth.create_list(object_list, bundle)), 4)
+
+            for note in notes:
+                self.assertTrue(auth.create_detail(note, bundle))
+
+            self.assertEqual(mocked_has_perm.call_count, 1)
+
+            self.assertTrue(auth.update_detail(notes[0], bundle))
+            self.assertEqual(mocked_has_perm.call_count, 2)
+
+            # A new request asks again.
+            request = HttpRequest()
+            request.user = user
+            self.assertTrue(auth.create_detail(notes[0], resource.build_bundle(request=request)))
+            self.assertEqual(mocked_has_perm.call_count, 3)
+
+    def test_permissions_cached(self):
+        self.user.user_permissions.add(self.add)
+        auth = DjangoAuthorization(cache_name='default', timeout=60)
+        resource = DjangoNoteResource()
+        note = resource.get_object_list(HttpRequest())[0]
+
+        def make_bundle():
+            request = HttpRequest()
+            request.user = User.objects.get(pk=self.user.pk)
+            return resource.build_bundle(obj=note, request=request)
+
+        try:
+            self.assertTrue(auth.create_detail(note, make_bundle()))
+            self.assertRaises(Unauthorized, auth.delete_detail, note, make_bundle())
+
+            # Later requests don't need the database.
+            bundle = make_bundle()
+
+            with self.assertNumQueries(0):
+                self.assertTrue(auth.create_detail(note, bundle))
+                self.assertRaises(Unauthorized, auth.delete_detail, note, bundle)
+
+            # Deactivating the user takes effect straight away.
+            self.user.is_active = False
+            self.user.save()
+            self.assertRaises(Unauthorized, auth.create_detail, note, make_bundle())
+        finally:
+            cache.clear()
+
+    def test_subclass_without_super_init(self):
+        class CustomDjangoAuthorization(DjangoAuthorization):
+            def __init__(self, label):
+                self.label = label
+
+        self.user.user_permissions.add(self.add)
+        auth = CustomDjangoAuthorization('custom')
+        resource = DjangoNoteResource()
+        request = HttpRequest()
+        request.user = self.user
+        bundle = resource.build_bundle(request=request)
+        note = resource.get_object_list(request)[0]
+
+        self.assertTrue(auth.create_detail(note, bundle))
+        self.assertRaises(Unauthorized, auth.delete_detail, note, bundle)
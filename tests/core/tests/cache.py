@@ -1,7 +1,11 @@
 import time
+import mock
 from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.test import TestCase
-from tastypie.cache import NoCache, SimpleCache
+from tastypie import cache as tastypie_cache
+from tastypie.cache import NoCache, SimpleCache, TieredCache, model_generation_key, watch_model
+from core.models import Counter
 
 
 class NoCacheTestCase(TestCase):
@@ -28,6 +32,25 @@ class NoCacheTestCase(TestCase):
         self.assertEqual(cache.get('foo'), None)
         self.assertEqual(cache.get('moof'), None)
 
+    def test_watch_model(self):
+        # Nothing to invalidate, so no receivers to stop fast deletes.
+        watch_model(Counter, NoCache())
+        self.assertFalse(Counter in tastypie_cache._watched_models)
+        self.assertFalse(post_save.has_listeners(Counter))
+        self.assertFalse(post_delete.has_listeners(Counter))
+
+        simple_cache = SimpleCache()
+
+        try:
+            watch_model(Counter, simple_cache)
+            self.assertEqual(tastypie_cache._watched_models[Counter], [simple_cache])
+            self.assertTrue(post_delete.has_listeners(Counter))
+        finally:
+            dispatch_uid = 'tastypie.cache.invalidate_model:%s' % model_generation_key(Counter)
+            post_save.disconnect(sender=Counter, dispatch_uid=dispatch_uid)
+            post_delete.disconnect(sender=Counter, dispatch_uid=dispatch_uid)
+            tastypie_cache._watched_models.pop(Counter, None)
+
 
 class SimpleCacheTestCase(TestCase):
     def tearDown(self):
@@ -57,3 +80,216 @@ class SimpleCacheTestCase(TestCase):
         time.sleep(2)
         self.assertEqual(cache.get('moof'), None)
         self.assertEqual(cache.get('foo'), 'bar')
+
+    def test_generations(self):
+        simple_cache = SimpleCache()
+
+        try:
+            generation = simple_cache.get_generation('gen')
+            self.assertTrue(generation > 0)
+            self.assertEqual(simple_cache.get_generation('gen'), generation)
+
+            self.assertEqual(simple_cache.bump_generation('gen'), generation + 1)
+            self.assertEqual(simple_cache.get_generation('gen'), generation + 1)
+
+            # Evicted generations start again ahead of the old ones.
+            cache.delete('gen')
+
+            with mock.patch('tastypie.cache.time.time', return_value=time.time() + 1):
+                self.assertTrue(simple_cache.bump_generation('gen') > generation + 1)
+
+            no_cache = NoCache()
+            self.assertEqual(no_cache.get_generation('gen'), None)
+            self.assertEqual(no_cache.bump_generation('gen'), None)
+        finally:
+            cache.delete('gen')
+
+    def test_add_delete(self):
+        simple_cache = SimpleCache()
+
+        try:
+            self.assertTrue(simple_cache.add('foo', 'bar'))
+            self.assertFalse(simple_cache.add('foo', 'baz'))
+            self.assertEqual(cache.get('foo'), 'bar')
+
+            simple_cache.delete('foo')
+            self.assertEqual(cache.get('foo'), None)
+
+            no_cache = NoCache()
+            self.assertTrue(no_cache.add('foo', 'bar'))
+            self.assertTrue(no_cache.add('foo', 'bar'))
+        finally:
+            cache.delete('foo')
+
+    def test_get_or_compute(self):
+        compute = mock.Mock(return_value='bar')
+        simple_cache = SimpleCache(timeout=60)
+
+        try:
+            self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+            self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(cache.get('foo'), 'bar')
+
+            self.assertEqual(NoCache().get_or_compute('foo', compute), 'bar')
+            self.assertEqual(compute.call_count, 2)
+        finally:
+            cache.delete('foo')
+
+    def test_get_or_compute_grace(self):
+        simple_cache = SimpleCache(timeout=60, grace=30)
+        compute = mock.Mock(return_value='bar')
+        now = time.time()
+
+        try:
+            self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+            self.assertEqual(cache.get('foo:lock'), None)
+
+            # Fresh.
+            compute.return_value = 'baz'
+            self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+            self.assertEqual(compute.call_count, 1)
+
+            with mock.patch('tastypie.cache.time.time', return_value=now + 70):
+                # Stale & someone else is refreshing it, so serve it stale.
+                cache.add('foo:lock', 1)
+                self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+                self.assertEqual(compute.call_count, 1)
+
+                # Stale & nobody is, so refresh it.
+                cache.delete('foo:lock')
+                self.assertEqual(simple_cache.get_or_compute('foo', compute), 'baz')
+                self.assertEqual(compute.call_count, 2)
+                self.assertEqual(cache.get('foo:lock'), None)
+
+            # Nothing to serve while someone else is computing it: wait for
+            # them, then give up & compute it anyway.
+            cache.delete('foo')
+            cache.add('foo:lock', 1)
+
+            with mock.patch('tastypie.cache.time.sleep') as mocked_sleep:
+                self.assertEqual(simple_cache.get_or_compute('foo', compute), 'baz')
+                self.assertEqual(mocked_sleep.call_count, 20)
+                self.assertEqual(compute.call_count, 3)
+
+            # ...without releasing the other worker's lock.
+            self.assertEqual(cache.get('foo:lock'), 1)
+
+            # Values cached before ``grace`` was turned on count as misses.
+            cache.delete('foo:lock')
+            cache.set('foo', 'old')
+            self.assertEqual(simple_cache.get_or_compute('foo', compute), 'baz')
+            self.assertEqual(compute.call_count, 4)
+
+            # Errors release the lock.
+            cache.delete('foo')
+            compute.side_effect = ValueError
+
+            self.assertRaises(ValueError, simple_cache.get_or_compute, 'foo', compute)
+            self.assertEqual(cache.get('foo:lock'), None)
+        finally:
+            cache.delete('foo')
+            cache.delete('foo:lock')
+
+    def test_early_refresh(self):
+        simple_cache = SimpleCache(timeout=60, grace=30, early_refresh=1)
+        compute = mock.Mock(return_value='baz')
+
+        try:
+            # Took 10 seconds to compute, with 5 seconds to go.
+            cache.set('foo', ('bar', time.time() + 5, 10))
+
+            with mock.patch('tastypie.cache.random.random', return_value=0):
+                self.assertEqual(simple_cache.get_or_compute('foo', compute), 'bar')
+
+            with mock.patch('tastypie.cache.random.random', return_value=0.9):
+                self.assertEqual(simple_cache.get_or_compute('foo', compute), 'baz')
+
+            self.assertEqual(compute.call_count, 1)
+        finally:
+            cache.delete('foo')
+
+
+class TieredCacheTestCase(TestCase):
+    def tearDown(self):
+        cache.clear()
+        super(TieredCacheTestCase, self).tearDown()
+
+    def test_get_set(self):
+        tiered_cache = TieredCache(timeout=60)
+        self.assertEqual(tiered_cache.get('foo'), None)
+
+        tiered_cache.set('foo', {'bar': 1})
+        self.assertEqual(cache.get('foo'), {'bar': 1})
+
+        # Served locally, as a copy.
+        with mock.patch.object(tiered_cache.cache, 'get') as mocked_get:
+            value = tiered_cache.get('foo')
+            self.assertEqual(value, {'bar': 1})
+            value['bar'] = 2
+            self.assertEqual(tiered_cache.get('foo'), {'bar': 1})
+            # (The version was checked within the last second too.)
+            self.assertEqual(mocked_get.call_count, 0)
+
+        stats = tiered_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 1, 1))
+
+        # Found in the cache, then locally.
+        cache.set('moof', 'baz')
+        self.assertEqual(tiered_cache.get('moof'), 'baz')
+        cache.delete('moof')
+        self.assertEqual(tiered_cache.get('moof'), 'baz')
+
+        # Until it expires locally.
+        with mock.patch('tastypie.cache.time.time', return_value=time.time() + 6):
+            self.assertEqual(tiered_cache.get('moof'), None)
+
+    def test_limits(self):
+        tiered_cache = TieredCache(max_entries=2)
+        tiered_cache.set('a', 1)
+        tiered_cache.set('b', 2)
+        tiered_cache.get('a')
+        tiered_cache.set('c', 3)
+        cache.clear()
+
+        # ``b`` was least recently used.
+        self.assertEqual(tiered_cache.get('a'), 1)
+        self.assertEqual(tiered_cache.get('b'), None)
+        self.assertEqual(tiered_cache.get('c'), 3)
+
+        tiered_cache = TieredCache(max_size=100)
+        tiered_cache.set('small', 'x')
+        tiered_cache.set('big', 'x' * 200)
+        self.assertEqual(tiered_cache.stats()['entries'], 1)
+        self.assertTrue(tiered_cache.stats()['size'] <= 100)
+
+    def test_generations(self):
+        tiered_cache = TieredCache()
+        generation = tiered_cache.get_generation('gen')
+        self.assertEqual(tiered_cache.get_generation('gen'), generation)
+        self.assertEqual(tiered_cache.bump_generation('gen'), generation + 1)
+        self.assertEqual(tiered_cache.get_generation('gen'), generation + 1)
+
+        # Bumping an evicted generation starts a fresh one, even when it's
+        # still known locally.
+        cache.delete('gen')
+
+        with mock.patch('tastypie.cache.time.time', return_value=time.time() + 1):
+            self.assertTrue(tiered_cache.bump_generation('gen') > generation + 1)
+
+    def test_invalidate(self):
+        tiered_cache = TieredCache()
+        other_cache = TieredCache()
+        tiered_cache.set('foo', 'bar')
+        self.assertEqual(other_cache.get('foo'), 'bar')
+        cache.delete('foo')
+
+        tiered_cache.invalidate()
+        self.assertEqual(tiered_cache.get('foo'), None)
+
+        # Other processes notice once they next check the version.
+        self.assertEqual(other_cache.get('foo'), 'bar')
+
+        with mock.patch('tastypie.cache.time.time', return_value=time.time() + 2):
+            self.assertEqual(other_cache.get('foo'), None)
+
@@ -1,8 +1,9 @@
+import mock
 from django.contrib.auth.models import User
 from django.core.management import call_command
 from django.db import models
 from django.test import TestCase
-from tastypie.models import ApiKey, create_api_key
+from tastypie.models import ApiAccess, ApiAccessRollup, ApiKey, create_api_key
 
 
 class BackfillApiKeysTestCase(TestCase):
@@ -38,3 +39,82 @@ class BackfillApiKeysTestCase(TestCase):
             api_key = ApiKey.objects.get(user=new_user)
         except ApiKey.DoesNotExist:
             self.fail("No key means the command didn't work.")
+
+
+# 2013-01-01 00:00:00 UTC.
+DAY_1 = 1356998400
+HOUR = 60 * 60
+
+
+class RollupApiAccessTestCase(TestCase):
+    def setUp(self):
+        super(RollupApiAccessTestCase, self).setUp()
+        # ``bulk_create`` skips ``ApiAccess.save``, which would stamp them
+        # with the current time.
+        ApiAccess.objects.bulk_create([
+            ApiAccess(identifier='daniel', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + 10),
+            ApiAccess(identifier='daniel', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + 20),
+            ApiAccess(identifier='daniel', url='/api/v1/notes/', request_method='POST', accessed=DAY_1 + 30),
+            ApiAccess(identifier='cody', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + HOUR + 5),
+            ApiAccess(identifier='daniel', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + 2 * HOUR + 5),
+            ApiAccess(identifier='daniel', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + 30 * HOUR),
+        ])
+
+    def test_roll_up(self):
+        self.assertEqual(ApiAccessRollup.objects.roll_up(DAY_1, DAY_1 + 2 * HOUR + 30), 2)
+
+        hourly = ApiAccessRollup.objects.filter(period='hour').order_by('period_start', 'identifier', 'request_method')
+        self.assertEqual([(r.identifier, r.request_method, r.period_start, r.count) for r in hourly], [
+            ('daniel', 'GET', DAY_1, 2),
+            ('daniel', 'POST', DAY_1, 1),
+            ('cody', 'GET', DAY_1 + HOUR, 1),
+        ])
+        daily = ApiAccessRollup.objects.filter(period='day').order_by('identifier', 'request_method')
+        self.assertEqual([(r.identifier, r.request_method, r.period_start, r.count) for r in daily], [
+            ('cody', 'GET', DAY_1, 1),
+            ('daniel', 'GET', DAY_1, 2),
+            ('daniel', 'POST', DAY_1, 1),
+        ])
+
+        # Re-running replaces rather than adds.
+        self.assertEqual(ApiAccessRollup.objects.roll_up(DAY_1, DAY_1 + 3 * HOUR), 3)
+        self.assertEqual(ApiAccessRollup.objects.filter(period='hour').count(), 4)
+        self.assertEqual(ApiAccessRollup.objects.get(period='day', identifier='daniel', request_method='GET').count, 3)
+
+    def test_usage(self):
+        ApiAccessRollup.objects.roll_up(DAY_1, DAY_1 + 2 * 24 * HOUR)
+
+        self.assertEqual(list(ApiAccessRollup.objects.usage()), [
+            {'identifier': 'cody', 'accesses': 1},
+            {'identifier': 'daniel', 'accesses': 5},
+        ])
+        self.assertEqual(list(ApiAccessRollup.objects.usage(identifier='daniel', group_by=('period_start',))), [
+            {'period_start': DAY_1, 'accesses': 4},
+            {'period_start': DAY_1 + 24 * HOUR, 'accesses': 1},
+        ])
+        self.assertEqual(list(ApiAccessRollup.objects.usage(identifier='daniel', start=DAY_1, end=DAY_1 + HOUR, period='hour', group_by=('request_method',))), [
+            {'request_method': 'GET', 'accesses': 2},
+            {'request_method': 'POST', 'accesses': 1},
+        ])
+
+    def test_command(self):
+        # Two days & a bit later, with a day of retention.
+        with mock.patch('tastypie.management.commands.rollup_api_access.time.time', return_value=DAY_1 + 49 * HOUR + 600):
+            call_command('rollup_api_access', verbosity=0, retention_days=1, chunk_size=2)
+
+        self.assertEqual(ApiAccessRollup.objects.filter(period='hour').count(), 5)
+        self.assertEqual(ApiAccessRollup.objects.get(period='day', identifier='daniel', request_method='GET', period_start=DAY_1).count, 3)
+        # Only the accesses from the last day are kept.
+        self.assertEqual(list(ApiAccess.objects.values_list('accessed', flat=True)), [DAY_1 + 30 * HOUR])
+
+        # Carries on from where it left off.
+        ApiAccess.objects.bulk_create([
+            ApiAccess(identifier='cody', url='/api/v1/notes/', request_method='GET', accessed=DAY_1 + 49 * HOUR + 5),
+        ])
+
+        with mock.patch('tastypie.management.commands.rollup_api_access.time.time', return_value=DAY_1 + 50 * HOUR + 600):
+            call_command('rollup_api_access', verbosity=0, prune=False)
+
+        self.assertEqual(ApiAccessRollup.objects.filter(period='hour').count(), 6)
+        self.assertEqual(ApiAccessRollup.objects.get(period='day', identifier='daniel', period_start=DAY_1 + 24 * HOUR).count, 1)
+        self.assertEqual(ApiAccess.objects.count(), 2)
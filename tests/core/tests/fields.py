@@ -1,3 +1,4 @@
+import copy
 import datetime
 from dateutil.tz import *
 from django.db import models
@@ -93,6 +94,54 @@ class ApiFieldTestCase(TestCase):
         field_6 = ApiField(attribute='what_time_is_it', default=True)
         self.assertEqual(field_6.dehydrate(bundle), aware_datetime(2010, 4, 1, 0, 48))
 
+    def test_dehydrate_attribute_path(self):
+        note = Note.objects.get(pk=1)
+        bundle = Bundle(obj=note)
+
+        # Relations are followed.
+        field_1 = ApiField(attribute='author__username')
+        self.assertEqual(field_1._attribute_bits, ('author', 'username'))
+        self.assertEqual(field_1.dehydrate(bundle), u'johndoe')
+
+        # An empty step falls back to the default or null.
+        field_2 = ApiField(attribute='author__foo__bar', default='nope')
+        self.assertEqual(field_2.dehydrate(bundle), 'nope')
+
+        field_3 = ApiField(attribute='author__foo__bar', null=True)
+        self.assertEqual(field_3.dehydrate(bundle), None)
+
+        field_4 = ApiField(attribute='author__foo__bar')
+        self.assertRaises(ApiFieldError, field_4.dehydrate, bundle)
+
+        # Changing the attribute recompiles the accessor.
+        field_1.attribute = 'title'
+        self.assertEqual(field_1._attribute_bits, ('title',))
+        self.assertEqual(field_1.dehydrate(bundle), u'First Post!')
+
+        # Fields still need to survive the copying done by ``Resource``.
+        field_5 = copy.deepcopy(field_1)
+        self.assertEqual(field_5.dehydrate(bundle), u'First Post!')
+
+    def test_dehydrate_empty_attribute_walked_once(self):
+        class Counting(object):
+            reads = 0
+
+            @property
+            def empty(self):
+                Counting.reads += 1
+                return None
+
+        bundle = Bundle(obj=Counting())
+
+        self.assertEqual(ApiField(attribute='empty', null=True).dehydrate(bundle), None)
+        self.assertEqual(ApiField(attribute='empty', default='nope').dehydrate(bundle), 'nope')
+        self.assertEqual(ToOneField(UserResource, 'empty', null=True).dehydrate(bundle), None)
+        self.assertEqual(Counting.reads, 3)
+
+        # Only errors walk the path again, to say what was empty.
+        self.assertRaises(ApiFieldError, ApiField(attribute='empty').dehydrate, bundle)
+        self.assertRaises(ApiFieldError, ToOneField(UserResource, 'empty').dehydrate, bundle)
+
     def test_convert(self):
         field_1 = ApiField()
         self.assertEqual(field_1.convert('foo'), 'foo')
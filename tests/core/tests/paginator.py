@@ -2,12 +2,17 @@
 from django.conf import settings
 from django.test import TestCase
 from tastypie.exceptions import BadRequest
-from tastypie.paginator import Paginator
+from tastypie.paginator import Paginator, CursorPaginator
 from core.models import Note
 from core.tests.resources import NoteResource
 from django.db import reset_queries
 from django.http import QueryDict
 
+try:
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from urlparse import parse_qs, urlparse
+
 
 class PaginatorTestCase(TestCase):
     fixtures = ['note_testdata.json']
@@ -281,3 +286,209 @@ class PaginatorTestCase(TestCase):
         meta = paginator.page()['meta']
         self.assertEqual(meta['limit'], 0)
 
+
+    def test_count_mode_none(self):
+        class NoCountPaginator(Paginator):
+            count_mode = 'none'
+
+        reset_queries()
+        paginator = NoCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=2)
+        page = paginator.page()
+        # No ``COUNT`` query, just the (one larger) slice.
+        self.assertEqual(len(self._get_query_count()), 1)
+        self.assertEqual([note.pk for note in page['objects']], [3, 4])
+        self.assertEqual(page['meta']['total_count'], None)
+        self.assertTrue('offset=0' in page['meta']['previous'])
+        self.assertTrue('offset=4' in page['meta']['next'])
+
+        paginator = NoCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=4)
+        page = paginator.page()
+        self.assertEqual([note.pk for note in page['objects']], [5, 6])
+        self.assertEqual(page['meta']['next'], None)
+
+        paginator = NoCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=3, offset=4)
+        self.assertEqual(paginator.page()['meta']['next'], None)
+
+        paginator = NoCountPaginator({'limit': 0}, self.data_set, resource_uri='/api/v1/notes/', max_limit=None)
+        page = paginator.page()
+        self.assertEqual(len(page['objects']), 6)
+        self.assertEqual(page['meta']['total_count'], None)
+
+    def test_count_mode_cached(self):
+        class CachedCountPaginator(Paginator):
+            count_mode = 'cached'
+            count_cache_timeout = 30
+
+        from django.core.cache import cache
+        cache.clear()
+
+        paginator = CachedCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=0)
+        self.assertEqual(paginator.get_count(), 6)
+        self.assertEqual(cache.get(paginator.get_count_cache_key()), 6)
+
+        reset_queries()
+        paginator = CachedCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=2)
+        self.assertEqual(paginator.get_count(), 6)
+        self.assertEqual(len(self._get_query_count()), 0)
+
+        # Different filters are counted separately.
+        active = self.data_set.filter(is_active=True)
+        paginator = CachedCountPaginator({}, active, resource_uri='/api/v1/notes/', limit=2, offset=0)
+        self.assertNotEqual(paginator.get_count_cache_key(), CachedCountPaginator({}, self.data_set).get_count_cache_key())
+        self.assertEqual(paginator.get_count(), active.count())
+
+        # A stale count doesn't decide the ``next`` page.
+        cache.set(paginator.get_count_cache_key(), 1000)
+        paginator = CachedCountPaginator({}, active, resource_uri='/api/v1/notes/', limit=active.count(), offset=0)
+        page = paginator.page()
+        self.assertEqual(page['meta']['total_count'], 1000)
+        self.assertEqual(page['meta']['next'], None)
+
+        cache.set(paginator.get_count_cache_key(), 1)
+        paginator = CachedCountPaginator({}, active, resource_uri='/api/v1/notes/', limit=1, offset=0)
+        page = paginator.page()
+        self.assertEqual(len(page['objects']), 1)
+        self.assertTrue('offset=1' in page['meta']['next'])
+
+        # Not a ``QuerySet``? Just count it.
+        paginator = CachedCountPaginator({}, ['foo', 'bar', 'baz'], limit=2, offset=0)
+        self.assertEqual(paginator.get_count_cache_key(), None)
+        self.assertEqual(paginator.get_count(), 3)
+
+    def test_count_mode_estimated(self):
+        class EstimatedCountPaginator(Paginator):
+            count_mode = 'estimated'
+            estimated_count_threshold = 1000
+
+        paginator = EstimatedCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=0)
+
+        # No estimates here, so it's an exact count.
+        if paginator.get_database_estimate() is None:
+            self.assertEqual(paginator.get_count(), 6)
+
+        paginator.get_database_estimate = lambda: 50000
+        self.assertEqual(paginator.get_count(), 50000)
+        self.assertTrue('offset=2' in paginator.page()['meta']['next'])
+
+        # The estimate is only the ``total_count``, not whether there's more.
+        paginator = EstimatedCountPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=2, offset=4)
+        paginator.get_database_estimate = lambda: 50000
+        page = paginator.page()
+        self.assertEqual(page['meta']['total_count'], 50000)
+        self.assertEqual([note.pk for note in page['objects']], [5, 6])
+        self.assertEqual(page['meta']['next'], None)
+
+        # Small estimates get the real count.
+        paginator.get_database_estimate = lambda: 12
+        self.assertEqual(paginator.get_count(), 6)
+
+
+class CursorPaginatorTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+
+    def setUp(self):
+        super(CursorPaginatorTestCase, self).setUp()
+        self.data_set = Note.objects.all()
+        self.old_debug = settings.DEBUG
+        settings.DEBUG = True
+
+    def tearDown(self):
+        settings.DEBUG = self.old_debug
+        super(CursorPaginatorTestCase, self).tearDown()
+
+    def _get_queries(self):
+        from django.db import connection
+        return connection.queries
+
+    def _params(self, uri):
+        return dict((key, value[0]) for key, value in parse_qs(urlparse(uri).query).items())
+
+    def test_walk_forward_and_back(self):
+        paginator = CursorPaginator({}, self.data_set.order_by('pk'), resource_uri='/api/v1/notes/', limit=2)
+        page = paginator.page()
+        self.assertEqual([note.pk for note in page['objects']], [1, 2])
+        self.assertEqual(page['meta']['previous'], None)
+        self.assertFalse('total_count' in page['meta'])
+        self.assertFalse('offset' in page['meta'])
+
+        seen = [note.pk for note in page['objects']]
+        next_uri = page['meta']['next']
+        reset_queries()
+
+        while next_uri:
+            params = self._params(next_uri)
+            self.assertEqual(params['limit'], '2')
+            paginator = CursorPaginator(params, self.data_set.order_by('pk'), resource_uri='/api/v1/notes/', limit=2)
+            page = paginator.page()
+            seen.extend([note.pk for note in page['objects']])
+            previous_uri = page['meta']['previous']
+            next_uri = page['meta']['next']
+
+        self.assertEqual(seen, [1, 2, 3, 4, 5, 6])
+        # One query per page & no ``OFFSET``.
+        self.assertEqual(len(self._get_queries()), 2)
+        self.assertFalse([query for query in self._get_queries() if 'OFFSET' in query['sql']])
+
+        paginator = CursorPaginator(self._params(previous_uri), self.data_set.order_by('pk'), resource_uri='/api/v1/notes/', limit=2)
+        page = paginator.page()
+        self.assertEqual([note.pk for note in page['objects']], [3, 4])
+        self.assertTrue(page['meta']['next'])
+
+        paginator = CursorPaginator(self._params(page['meta']['previous']), self.data_set.order_by('pk'), resource_uri='/api/v1/notes/', limit=2)
+        page = paginator.page()
+        self.assertEqual([note.pk for note in page['objects']], [1, 2])
+        self.assertEqual(page['meta']['previous'], None)
+
+        paginator = CursorPaginator(self._params(page['meta']['next']), self.data_set.order_by('pk'), resource_uri='/api/v1/notes/', limit=2)
+        self.assertEqual([note.pk for note in paginator.page()['objects']], [3, 4])
+
+    def test_multiple_ordering_fields(self):
+        Note.objects.filter(pk__in=[2, 3]).update(is_active=False)
+        data_set = self.data_set.order_by('is_active', '-created')
+        expected = [note.pk for note in data_set]
+
+        seen = []
+        request_data = {'format': 'json'}
+
+        while True:
+            page = CursorPaginator(request_data, data_set, resource_uri='/api/v1/notes/', limit=4).page()
+            seen.extend([note.pk for note in page['objects']])
+
+            if not page['meta']['next']:
+                break
+
+            request_data = self._params(page['meta']['next'])
+            self.assertEqual(request_data['format'], 'json')
+
+        self.assertEqual(seen, expected)
+
+    def test_default_ordering(self):
+        # No explicit ordering falls back to the primary key.
+        paginator = CursorPaginator({}, self.data_set, resource_uri='/api/v1/notes/', limit=4)
+        self.assertEqual(paginator.get_ordering(), ['pk'])
+        self.assertEqual([note.pk for note in paginator.page()['objects']], [1, 2, 3, 4])
+
+        paginator = CursorPaginator({}, self.data_set.order_by('-id'), resource_uri='/api/v1/notes/', limit=4)
+        self.assertEqual(paginator.get_ordering(), ['-id'])
+
+    def test_no_limit(self):
+        paginator = CursorPaginator({'limit': 0}, self.data_set, resource_uri='/api/v1/notes/', max_limit=None)
+        page = paginator.page()
+        self.assertEqual(len(page['objects']), 6)
+        self.assertEqual(page['meta'], {'limit': 0})
+
+    def test_bad_cursors(self):
+        paginator = CursorPaginator({'cursor': 'not-a-cursor'}, self.data_set, resource_uri='/api/v1/notes/', limit=2)
+        self.assertRaises(BadRequest, paginator.page)
+
+        # A cursor from a different ordering.
+        page = CursorPaginator({}, self.data_set.order_by('-created'), resource_uri='/api/v1/notes/', limit=2).page()
+        paginator = CursorPaginator(self._params(page['meta']['next']), self.data_set, resource_uri='/api/v1/notes/', limit=2)
+        self.assertRaises(BadRequest, paginator.page)
+
+        paginator = CursorPaginator({}, self.data_set.order_by('?'), resource_uri='/api/v1/notes/', limit=2)
+        self.assertRaises(BadRequest, paginator.page)
+
+    def test_nonqueryset(self):
+        paginator = CursorPaginator({}, ['foo', 'bar', 'baz'], limit=2, offset=0)
+        self.assertEqual(paginator.page()['objects'], ['foo', 'bar'])
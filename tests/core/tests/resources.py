@@ -3,6 +3,7 @@ import copy
 import datetime
 from decimal import Decimal
 import django
+import hashlib
 import json
 from mock import patch
 
@@ -12,8 +13,10 @@ from django.core.cache import cache
 from django.core.exceptions import FieldError, MultipleObjectsReturned
 from django.core import mail
 from django.core.urlresolvers import reverse
+from django.db.models import Q
+from django.db.models.query import QuerySet
 from django import forms
-from django.http import HttpRequest, QueryDict, Http404
+from django.http import HttpRequest, QueryDict, Http404, StreamingHttpResponse
 from django.test import TestCase
 from django.utils.encoding import force_text
 from django.utils import six
@@ -21,6 +24,7 @@ from django.utils import six
 from tastypie.authentication import BasicAuthentication
 from tastypie.authorization import Authorization
 from tastypie.bundle import Bundle
+from tastypie.cache import SimpleCache
 from tastypie.exceptions import InvalidFilterError, InvalidSortError, ImmediateHttpResponse, BadRequest, NotFound
 from tastypie import fields
 from tastypie.paginator import Paginator
@@ -387,6 +391,37 @@ class ResourceTestCase(TestCase):
         self.assertEqual(bundle_2.data['view_count'], 12)
         self.assertEqual(bundle_2.data.get('date_joined'), None)
 
+    def test_dehydration_plan(self):
+        basic = BasicResourceWithDifferentListAndDetailFields()
+        detail_plan = basic._get_dehydration_plan(for_list=False)
+        list_plan = basic._get_dehydration_plan(for_list=True)
+
+        self.assertEqual(sorted([entry[0] for entry in detail_plan]), ['name', 'resource_uri', 'view_count'])
+        self.assertEqual(sorted([entry[0] for entry in list_plan]), ['date_joined', 'name', 'resource_uri'])
+        self.assertEqual(dict((entry[0], entry[2]) for entry in list_plan)['date_joined'], 'dehydrate_date_joined')
+        self.assertEqual(dict((entry[0], entry[2]) for entry in list_plan)['name'], None)
+
+        # Compiled once per class & mode.
+        another = BasicResourceWithDifferentListAndDetailFields()
+        self.assertTrue(another._get_dehydration_plan(for_list=True) is list_plan)
+
+        # Callable ``use_in`` is kept for per-bundle evaluation.
+        callable_plan = BasicResourceWithDifferentListAndDetailFieldsCallable()._get_dehydration_plan(for_list=True)
+        self.assertTrue(callable(dict((entry[0], entry[1]) for entry in callable_plan)['view_count']))
+
+        # Altering the fields on an instance produces a separate plan.
+        another.fields['extra'] = fields.CharField(attribute='name', use_in='list')
+        altered_plan = another._get_dehydration_plan(for_list=True)
+        self.assertTrue('extra' in [entry[0] for entry in altered_plan])
+        self.assertTrue(basic._get_dehydration_plan(for_list=True) is list_plan)
+
+        test_object_1 = TestObject()
+        test_object_1.name = 'Daniel'
+        test_object_1.view_count = 12
+        test_object_1.date_joined = aware_datetime(2010, 3, 30, 9, 0, 0)
+        bundle = another.full_dehydrate(another.build_bundle(obj=test_object_1), for_list=True)
+        self.assertEqual(bundle.data['extra'], 'Daniel')
+
     def test_full_dehydrate(self):
         test_object_1 = TestObject()
         test_object_1.name = 'Daniel'
@@ -1229,6 +1264,84 @@ class PerObjectNoteResource(NoteResource):
 # End per object authorization bits.
 
 
+class ResponseCachedNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        cache = SimpleCache(timeout=60)
+        cache_responses = True
+
+
+class BasicAuthResponseCachedNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authentication = BasicAuthentication()
+        authorization = PerUserAuthorization()
+        cache = SimpleCache(timeout=60)
+        cache_responses = True
+
+    def get_list(self, request, **kwargs):
+        response = super(BasicAuthResponseCachedNoteResource, self).get_list(request, **kwargs)
+        response['X-Owner'] = request.user.username
+        return response
+
+
+class DehydratedCachedUserResource(UserResource):
+    class Meta:
+        queryset = User.objects.all()
+        authorization = Authorization()
+        cache = SimpleCache(timeout=60)
+        cache_dehydrated = True
+
+
+class DehydratedCachedNoteResource(NoteResource):
+    author = fields.ForeignKey(DehydratedCachedUserResource, 'author', full=True)
+
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        cache = SimpleCache(timeout=60)
+        cache_dehydrated = True
+
+
+class ResponseCachedFullNoteResource(NoteResource):
+    author = fields.ForeignKey(DehydratedCachedUserResource, 'author', full=True)
+
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        cache = SimpleCache(timeout=60)
+        cache_responses = True
+
+
+# Pushed-down authorization bits.
+class PushdownAuthorization(Authorization):
+    def read_list_filter(self, bundle):
+        return Q(title__icontains='post')
+
+    def read_list(self, object_list, bundle):
+        # ``QuerySets`` have already been narrowed by ``read_list_filter``.
+        if isinstance(object_list, QuerySet):
+            return object_list
+
+        return [obj for obj in object_list if 'post' in obj.title.lower()]
+
+    def delete_list_filter(self, bundle):
+        return Q(pk__in=[2, 3])
+
+
+class PushdownNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'pushdownnotes'
+        queryset = Note.objects.all()
+        authorization = PushdownAuthorization()
+# End pushed-down authorization bits.
+
+
 class CounterResource(ModelResource):
     count = fields.IntegerField('count', default=0, null=True)
 
@@ -1349,6 +1462,19 @@ class ModelResourceTestCase(TestCase):
         resource_6 = CustomPageNoteResource()
         self.assertEqual(resource_6._meta.paginator_class, CustomPaginator)
 
+    def test_related_fields_stamped(self):
+        resource = DetailedNoteResource()
+        resource.fields['user'].api_name = 'unset'
+        resource.full_dehydrate(resource.build_bundle(obj=self.note_1))
+        self.assertEqual(resource.fields['user'].api_name, resource._meta.api_name)
+        self.assertEqual(resource.fields['user'].resource_name, 'detailednotes')
+
+        # A replacement field is stamped too.
+        resource.fields['user'] = fields.ForeignKey(UserResource, 'author')
+        resource.full_dehydrate(resource.build_bundle(obj=self.note_1))
+        self.assertEqual(resource.fields['user'].api_name, resource._meta.api_name)
+        self.assertEqual(resource.fields['user'].resource_name, 'detailednotes')
+
     def test_can_create(self):
         resource_1 = NoteResource()
         self.assertEqual(resource_1.can_create(), True)
@@ -2973,6 +3099,89 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(related_obj.title, u'First Post!')
         self.assertEqual(list(related_obj.subjects.values_list('id', flat=True)), [1, 2])
 
+    def test_obj_get_single_query(self):
+        resource = NoteResource()
+        base_bundle = Bundle()
+
+        with self.assertNumQueries(1):
+            obj = resource.obj_get(base_bundle, pk=1)
+
+        self.assertEqual(obj.title, u'First Post!')
+
+        # Outside of ``dispatch``, there's no identity map.
+        self.assertEqual(resource.get_identity_map(base_bundle.request), None)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(resource.obj_get(base_bundle, pk=1).pk, 1)
+
+        self.assertRaises(Note.DoesNotExist, resource.obj_get, base_bundle, pk=1000)
+        self.assertRaises(MultipleObjectsReturned, resource.obj_get, base_bundle, is_active=True)
+
+    def test_get_unique_lookup(self):
+        resource = NoteResource()
+        self.assertEqual(resource.get_unique_lookup(pk='1'), ('id', 1))
+        self.assertEqual(resource.get_unique_lookup(id=1), ('id', 1))
+        self.assertEqual(resource.get_unique_lookup(id__exact=1), ('id', 1))
+        self.assertEqual(resource.get_unique_lookup(slug='first-post'), None)
+        self.assertEqual(resource.get_unique_lookup(pk=1, slug='first-post'), None)
+        self.assertEqual(resource.get_unique_lookup(author=1), None)
+        self.assertEqual(resource.get_unique_lookup(pk='abc'), None)
+        self.assertEqual(resource.get_unique_lookup(not_a_field=1), None)
+
+    def test_obj_get_identity_map(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request._tastypie_identity_maps = {}
+        base_bundle = Bundle(request=request)
+
+        with self.assertNumQueries(1):
+            obj = resource.obj_get(base_bundle, pk=1)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(resource.obj_get(base_bundle, pk='1') is obj)
+            self.assertTrue(resource.obj_get(base_bundle, id=1) is obj)
+
+        # Non-unique lookups always hit the database.
+        with self.assertNumQueries(1):
+            resource.obj_get(base_bundle, slug='first-post')
+
+        # Each resource gets its own map.
+        related = RelatedNoteResource()
+
+        with self.assertNumQueries(1):
+            related_obj = related.obj_get(base_bundle, pk=1)
+
+        self.assertFalse(related_obj is obj)
+
+        # Saving through one resource drops stale copies held by the others.
+        note_bundle = resource.build_bundle(obj=obj, request=request)
+        note_bundle = resource.full_dehydrate(note_bundle)
+        note_bundle.data['title'] = 'Updated!'
+        resource.obj_update(note_bundle, pk=1)
+        self.assertEqual(related.obj_get(base_bundle, pk=1).title, u'Updated!')
+
+        # Deleting drops it too.
+        resource.obj_delete(base_bundle, pk=1)
+        self.assertRaises(Note.DoesNotExist, resource.obj_get, base_bundle, pk=1)
+
+    def test_dispatch_identity_map(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+        seen = []
+        old_get_detail = resource.get_detail
+
+        def get_detail(request, **kwargs):
+            seen.append(resource.get_identity_map(request))
+            return old_get_detail(request, **kwargs)
+
+        resource.get_detail = get_detail
+        resp = resource.dispatch('detail', request, pk=1)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(seen[0]), 1)
+        self.assertFalse(hasattr(request, '_tastypie_identity_maps'))
+
     def test_uri_fields(self):
         with_abs_url = WithAbsoluteURLNoteResource()
         base_bundle = Bundle()
@@ -3115,6 +3324,69 @@ class ModelResourceTestCase(TestCase):
         resource.fields['created']._default = old_created
         resource.fields['updated']._default = old_updated
 
+    def test_get_list_streaming(self):
+        class StreamingNoteResource(NoteResource):
+            class Meta:
+                queryset = Note.objects.filter(is_active=True)
+                resource_name = 'notes'
+                authorization = Authorization()
+                streaming_list = True
+                streaming_chunk_size = 2
+
+        resource = StreamingNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        resp = resource.get_list(request)
+        self.assertTrue(isinstance(resp, StreamingHttpResponse))
+        self.assertEqual(resp['Content-Type'], 'application/json')
+        content = b''.join(resp.streaming_content).decode('utf-8')
+        self.assertEqual(content, NoteResource().get_list(request).content.decode('utf-8'))
+
+        # Nothing is dehydrated until the response is read.
+        with patch.object(StreamingNoteResource, 'full_dehydrate') as mocked:
+            resp = resource.get_list(request)
+            self.assertEqual(mocked.call_count, 0)
+
+        # Other formats don't stream.
+        request.GET = {'format': 'xml'}
+        resp = resource.get_list(request)
+        self.assertFalse(isinstance(resp, StreamingHttpResponse))
+
+        # A custom ``to_json`` isn't bypassed.
+        class UpperSerializer(Serializer):
+            def to_json(self, data, options=None):
+                return super(UpperSerializer, self).to_json(data, options).upper()
+
+        resource._meta.serializer = UpperSerializer()
+
+        try:
+            request.GET = {'format': 'json'}
+            resp = resource.get_list(request)
+            self.assertFalse(isinstance(resp, StreamingHttpResponse))
+            self.assertTrue('"OBJECTS"' in resp.content.decode('utf-8'))
+        finally:
+            resource._meta.serializer = Serializer()
+
+    def test_dispatch_list_streaming(self):
+        class StreamingNoteResource(NoteResource):
+            class Meta:
+                queryset = Note.objects.filter(is_active=True)
+                resource_name = 'notes'
+                authorization = Authorization()
+                streaming_list = True
+
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        resp = StreamingNoteResource().wrap_view('dispatch_list')(request)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(isinstance(resp, StreamingHttpResponse))
+        content = json.loads(b''.join(resp.streaming_content).decode('utf-8'))
+        self.assertEqual([note['id'] for note in content['objects']], [1, 2, 4, 6])
+
     def test_get_multiple(self):
         resource = NoteResource()
         request = HttpRequest()
@@ -3137,6 +3409,61 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.content.decode('utf-8'), '{"objects": [{"content": "This is my very first post using my shiny new API. Pretty sweet, huh?", "created": "2010-03-30T20:05:00", "id": 1, "is_active": true, "resource_uri": "/api/v1/notes/1/", "slug": "first-post", "title": "First Post!", "updated": "2010-03-30T20:05:00"}, {"content": "The dog ate my cat today. He looks seriously uncomfortable.", "created": "2010-03-31T20:05:00", "id": 2, "is_active": true, "resource_uri": "/api/v1/notes/2/", "slug": "another-post", "title": "Another Post", "updated": "2010-03-31T20:05:00"}, {"content": "My neighborhood\'s been kinda weird lately, especially after the lava flow took out the corner store. Granny can hardly outrun the magma with her walker.", "created": "2010-04-01T20:05:00", "id": 4, "is_active": true, "resource_uri": "/api/v1/notes/4/", "slug": "recent-volcanic-activity", "title": "Recent Volcanic Activity.", "updated": "2010-04-01T20:05:00"}, {"content": "Man, the second eruption came on fast. Granny didn\'t have a chance. On the upshot, I was able to save her walker and I got a cool shawl out of the deal!", "created": "2010-04-02T10:05:00", "id": 6, "is_active": true, "resource_uri": "/api/v1/notes/6/", "slug": "grannys-gone", "title": "Granny\'s Gone", "updated": "2010-04-02T10:05:00"}]}')
 
+    def test_get_multiple_single_query(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        with self.assertNumQueries(1):
+            resp = resource.get_multiple(request, pk_list='6;3;1;2;1')
+
+        self.assertEqual(resp.status_code, 200)
+        content = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual([note['id'] for note in content['objects']], [6, 1, 2, 1])
+        self.assertEqual(content['not_found'], ['3'])
+
+        self.assertRaises(NotFound, resource.get_multiple, request, pk_list='1;abc')
+
+        bundle = resource.build_bundle(request=request)
+        objects, not_found = resource.obj_get_multiple(bundle=bundle, identifiers=['2', '4', '99'])
+        self.assertEqual([obj.pk for obj in objects], [2, 4])
+        self.assertEqual(not_found, ['99'])
+
+    def test_get_multiple_overridden_obj_get(self):
+        class OnlyFirstNoteResource(NoteResource):
+            def obj_get(self, bundle, **kwargs):
+                if kwargs.get('pk') != '1':
+                    raise Note.DoesNotExist()
+
+                return super(OnlyFirstNoteResource, self).obj_get(bundle, **kwargs)
+
+        resource = OnlyFirstNoteResource()
+        request = HttpRequest()
+        request.method = 'GET'
+        bundle = resource.build_bundle(request=request)
+        objects, not_found = resource.obj_get_multiple(bundle=bundle, identifiers=['1', '2'])
+        self.assertEqual([obj.pk for obj in objects], [1])
+        self.assertEqual(not_found, ['2'])
+
+    def test_get_multiple_lookup_detail_uri_name(self):
+        class SlugLookupNoteResource(NoteResource):
+            class Meta:
+                queryset = Note.objects.all()
+                detail_uri_name = 'slug__iexact'
+
+        resource = SlugLookupNoteResource()
+        request = HttpRequest()
+        request.method = 'GET'
+        bundle = resource.build_bundle(request=request)
+
+        # Not a field, so each is looked up with ``obj_get``.
+        with self.assertNumQueries(3):
+            objects, not_found = resource.obj_get_multiple(bundle=bundle, identifiers=['First-Post', 'nope', 'another-post'])
+
+        self.assertEqual([obj.pk for obj in objects], [1, 2])
+        self.assertEqual(not_found, ['nope'])
+
     def test_get_multiple_use_in(self):
         resource = AlwaysDataNoteResourceUseIn()
         request = HttpRequest()
@@ -3865,6 +4192,32 @@ class ModelResourceTestCase(TestCase):
         # a (hopefully much smaller) subset.
         self.assertEqual(ponr._post_limits, 4)
 
+    def test_authorization_pushdown(self):
+        resource = PushdownNoteResource()
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = {'format': 'json'}
+        bundle = resource.build_bundle(request=request)
+
+        # Filtered by the database, not in Python.
+        with self.assertNumQueries(1):
+            self.assertEqual([note.pk for note in resource.obj_get_list(bundle)], [1, 2])
+
+        with self.assertNumQueries(1):
+            objects, not_found = resource.obj_get_multiple(bundle=bundle, identifiers=['1', '3', '2'])
+
+        self.assertEqual([note.pk for note in objects], [1, 2])
+        self.assertEqual(not_found, ['3'])
+
+        # Lists that aren't ``QuerySets`` fall back to ``read_list``.
+        notes = list(Note.objects.all())
+        self.assertEqual([note.pk for note in resource.authorized_read_list(notes, bundle)], [1, 2])
+
+        # Deleting narrows by both.
+        request.method = 'DELETE'
+        resource.obj_delete_list(bundle)
+        self.assertEqual(list(Note.objects.values_list('pk', flat=True).order_by('pk')), [1, 3, 4, 5, 6])
+
     def regression_test_per_object_detail(self):
         ponr = PerObjectNoteResource()
         empty_request = type('MockRequest', (object,), {'GET': {}})
@@ -3911,6 +4264,225 @@ class ModelResourceTestCase(TestCase):
         self.assertTrue(resp.has_header('cache-control'))
         self.assertEqual(resp._headers['cache-control'], ('Cache-Control', 'no-cache'))
 
+    def test_response_cache(self):
+        resource = ResponseCachedNoteResource()
+        detail = resource.wrap_view('dispatch_detail')
+
+        def make_request(**meta):
+            request = MockRequest()
+            request.GET = {'format': 'json'}
+            request.META.update(meta)
+            return request
+
+        try:
+            resp = detail(make_request(), pk=1)
+            self.assertEqual(resp.status_code, 200)
+            content = resp.content
+            etag = resp['ETag']
+            self.assertEqual(etag, '"%s"' % hashlib.md5(content).hexdigest())
+            self.assertTrue(resp.has_header('Last-Modified'))
+            self.assertTrue(resp.has_header('Cache-Control'))
+
+            # Served from the cache.
+            with self.assertNumQueries(0):
+                resp = detail(make_request(), pk=1)
+
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.content, content)
+            self.assertEqual(resp['ETag'], etag)
+            self.assertTrue(resp['Content-Type'].startswith('application/json'))
+
+            # Conditional requests.
+            with self.assertNumQueries(0):
+                resp = detail(make_request(HTTP_IF_NONE_MATCH=etag), pk=1)
+
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp.content, b'')
+            self.assertEqual(resp['ETag'], etag)
+
+            self.assertEqual(detail(make_request(HTTP_IF_NONE_MATCH='"nope", %s' % etag), pk=1).status_code, 304)
+            self.assertEqual(detail(make_request(HTTP_IF_NONE_MATCH='"nope"'), pk=1).status_code, 200)
+            self.assertEqual(detail(make_request(HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']), pk=1).status_code, 304)
+            self.assertEqual(detail(make_request(HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT'), pk=1).status_code, 200)
+
+            # Other objects, query strings & requestors get their own.
+            with self.assertNumQueries(1):
+                self.assertNotEqual(detail(make_request(), pk=2).content, content)
+
+            # (The object itself is cached by ``cached_obj_get``, so count
+            # the dehydrations.)
+            request = make_request()
+            request.GET['fields'] = 'title'
+
+            with patch.object(resource, 'full_dehydrate', wraps=resource.full_dehydrate) as mocked_dehydrate:
+                detail(request, pk=1)
+                detail(make_request(REMOTE_ADDR='10.0.0.1'), pk=1)
+                self.assertEqual(mocked_dehydrate.call_count, 2)
+                detail(make_request(REMOTE_ADDR='10.0.0.1'), pk=1)
+                self.assertEqual(mocked_dehydrate.call_count, 2)
+
+            # Errors aren't cached.
+            self.assertEqual(detail(make_request(), pk=1000).status_code, 404)
+
+            with self.assertNumQueries(1):
+                self.assertEqual(detail(make_request(), pk=1000).status_code, 404)
+        finally:
+            cache.clear()
+
+    def test_response_cache_per_user(self):
+        resource = BasicAuthResponseCachedNoteResource()
+        list_view = resource.wrap_view('dispatch_list')
+
+        for user in User.objects.filter(username__in=['johndoe', 'janedoe']):
+            user.set_password('pass')
+            user.save()
+
+        def make_request(username):
+            request = HttpRequest()
+            request.method = 'GET'
+            request.GET = {'format': 'json'}
+            request.META['HTTP_AUTHORIZATION'] = 'Basic %s' % base64.b64encode(('%s:pass' % username).encode('utf-8')).decode('utf-8')
+            return request
+
+        def note_ids(resp):
+            return sorted(note['id'] for note in json.loads(resp.content.decode('utf-8'))['objects'])
+
+        try:
+            for username in ('johndoe', 'janedoe', 'johndoe', 'janedoe'):
+                # Both share the same ``get_identifier`` ('nouser').
+                resp = list_view(make_request(username))
+                self.assertEqual(resp.status_code, 200)
+                expected = list(Note.objects.filter(is_active=True, author__username=username).order_by('pk').values_list('pk', flat=True))
+                self.assertEqual(note_ids(resp), expected)
+                # Headers set by the view survive the cache.
+                self.assertEqual(resp['X-Owner'], username)
+
+            # The second time around was served from the cache.
+            with patch.object(resource, 'obj_get_list') as mocked:
+                list_view(make_request('janedoe'))
+                self.assertEqual(mocked.call_count, 0)
+        finally:
+            cache.clear()
+
+    def test_cache_invalidation(self):
+        resource = ResponseCachedNoteResource()
+        detail = resource.wrap_view('dispatch_detail')
+
+        def make_request(method='GET'):
+            request = MockRequest()
+            request.method = method
+            request.GET = {'format': 'json'}
+            return request
+
+        try:
+            generation = resource.get_cache_generation()
+            self.assertNotEqual(generation, None)
+            self.assertEqual(resource.get_cache_generation_key(), 'tastypie:generation:core.note')
+            self.assertTrue('generation=%s' % generation in resource.generate_versioned_cache_key('detail', pk=1))
+
+            content = detail(make_request(), pk=1).content
+            self.assertEqual(detail(make_request(), pk=1).content, content)
+            self.assertEqual(resource.cached_obj_get(Bundle(), pk=1).title, 'First Post!')
+
+            # Saving the model moves the generation on, retiring responses &
+            # objects alike.
+            note = Note.objects.get(pk=1)
+            note.title = 'Edited'
+            note.save()
+            self.assertTrue(resource.get_cache_generation() > generation)
+
+            with self.assertNumQueries(1):
+                self.assertTrue(b'Edited' in detail(make_request(), pk=1).content)
+
+            self.assertEqual(resource.cached_obj_get(Bundle(), pk=1).title, 'Edited')
+
+            # As do deletes (& any other write through the API).
+            self.assertEqual(detail(make_request(), pk=2).status_code, 200)
+
+            with patch.object(resource, 'invalidate_cache', wraps=resource.invalidate_cache) as mocked_invalidate:
+                self.assertEqual(detail(make_request('DELETE'), pk=2).status_code, 204)
+                self.assertEqual(mocked_invalidate.call_count, 1)
+
+            self.assertEqual(detail(make_request(), pk=2).status_code, 404)
+
+            # Resources with no cache have no generation.
+            self.assertEqual(NoteResource().get_cache_generation(), None)
+        finally:
+            cache.clear()
+
+    def test_response_cache_full_related_invalidation(self):
+        resource = ResponseCachedFullNoteResource()
+        detail = resource.wrap_view('dispatch_detail')
+
+        def author_username():
+            request = MockRequest()
+            request.GET = {'format': 'json'}
+            return json.loads(detail(request, pk=1).content.decode('utf-8'))['author']['username']
+
+        try:
+            user = Note.objects.get(pk=1).author
+            self.assertEqual(author_username(), user.username)
+
+            # Saving the related object retires the cached response.
+            user.username = 'renamed'
+            user.save()
+            self.assertEqual(author_username(), 'renamed')
+        finally:
+            cache.clear()
+
+    def test_dehydrated_cache(self):
+        resource = DehydratedCachedNoteResource()
+
+        def dehydrate(pk, for_list=False, request=None):
+            if request is None:
+                request = MockRequest()
+
+            return resource.full_dehydrate(resource.build_bundle(obj=Note.objects.get(pk=pk), request=request), for_list=for_list)
+
+        try:
+            data = dehydrate(1).data
+            self.assertEqual(data['title'], 'First Post!')
+            self.assertEqual(data['author'].data['username'], 'johndoe')
+
+            # Served from the cache (the related user included).
+            with patch.object(resource.fields['title'], 'dehydrate', wraps=resource.fields['title'].dehydrate) as mocked_dehydrate:
+                with self.assertNumQueries(1):
+                    cached_data = dehydrate(1).data
+
+                self.assertEqual(mocked_dehydrate.call_count, 0)
+                self.assertEqual(dehydrate(1, for_list=True).data['title'], 'First Post!')
+                self.assertEqual(mocked_dehydrate.call_count, 1)
+
+            self.assertEqual(cached_data['title'], data['title'])
+            self.assertEqual(cached_data['author'].data, data['author'].data)
+            self.assertEqual(cached_data['author'].obj, None)
+
+            # Unsaved objects aren't cached.
+            self.assertEqual(resource.generate_dehydrated_cache_key(resource.build_bundle(obj=Note())), None)
+
+            # Changing the note or its author retires the cached data.
+            note = Note.objects.get(pk=1)
+            note.title = 'Edited'
+            note.save()
+            self.assertEqual(dehydrate(1).data['title'], 'Edited')
+
+            author = User.objects.get(username='johndoe')
+            author.username = 'renamed'
+            author.save()
+            self.assertEqual(dehydrate(1).data['author'].data['username'], 'renamed')
+
+            # Generations are looked up once per ``GET``.
+            request = MockRequest()
+
+            with patch.object(SimpleCache, 'get_generation', return_value=1) as mocked_generation:
+                dehydrate(1, request=request)
+                dehydrate(2, request=request)
+                # The note's & user's for the note, then the user's for the
+                # nested user's own key.
+                self.assertEqual(mocked_generation.call_count, 3)
+        finally:
+            cache.clear()
+
     def test_custom_paginator(self):
         mock_request = MockRequest()
         customs = CustomPageNoteResource().get_list(mock_request)
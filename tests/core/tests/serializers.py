@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
 import datetime
+import json
 import yaml
 from decimal import Decimal
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.utils import six
 from django.test import TestCase
 from tastypie.bundle import Bundle
 from tastypie import fields
-from tastypie.exceptions import BadRequest
+from tastypie.exceptions import BadRequest, UnsupportedFormat
 from tastypie.serializers import Serializer
 from tastypie.resources import ModelResource
 from core.models import Note
@@ -260,6 +263,42 @@ class SerializerTestCase(TestCase):
         sample_1 = self.get_sample1()
         self.assertEqual(serializer.to_json(sample_1), u'{"age": 27, "date_joined": "2010-03-27", "name": "Daniel", "snowman": "☃"}')
 
+    def test_format_dispatch(self):
+        class CSVSerializer(Serializer):
+            formats = ['json', 'csv']
+            content_types = {
+                'json': 'application/json',
+                'csv': 'text/csv',
+            }
+
+            def to_csv(self, data, options=None):
+                return ','.join(sorted(data.keys()))
+
+        serializer = CSVSerializer()
+        self.assertEqual(serializer.serialize({'b': 1, 'a': 2}, format='text/csv'), 'a,b')
+        self.assertEqual(serializer.serialize({'a': 1}, format='application/json'), '{"a": 1}')
+        self.assertEqual(serializer.deserialize('{"a": 1}', format='application/json; charset=UTF-8'), {'a': 1})
+        # No ``from_csv``, so it can't be deserialized.
+        self.assertRaises(UnsupportedFormat, serializer.deserialize, 'a,b', format='text/csv')
+        self.assertRaises(UnsupportedFormat, serializer.serialize, {'a': 1}, format='application/xml')
+
+    def test_to_json_iter(self):
+        serializer = Serializer()
+
+        sample_1 = self.get_sample1()
+        self.assertEqual(u''.join(serializer.to_json_iter(sample_1)), serializer.to_json(sample_1))
+
+        data = {
+            'meta': {'limit': 20, 'next': None},
+            'objects': [sample_1, {'name': 'Jane'}],
+        }
+        self.assertEqual(u''.join(serializer.to_json_iter(data)), serializer.to_json(data))
+
+        # The collection can be any iterable & is encoded an item at a time.
+        chunks = list(serializer.to_json_iter({'meta': {}, 'objects': (item for item in [1, 2, 3])}))
+        self.assertEqual(chunks, [u'{"meta": {}, "objects": [1', u', 2', u', 3', u']}'])
+        self.assertEqual(list(serializer.to_json_iter({'objects': []})), [u'{"objects": []}'])
+
     def test_from_json(self):
         serializer = Serializer()
 
@@ -424,6 +463,51 @@ class ResourceSerializationTestCase(TestCase):
         }
         self.assertEqual(serializer.to_json(data), '{"stuff": {"foo": "bar", "object": {"content": "This is my very first post using my shiny new API. Pretty sweet, huh?", "created": "2010-03-30T20:05:00", "id": 1, "is_active": true, "resource_uri": "", "slug": "first-post", "title": "First Post!", "updated": "2010-03-30T20:05:00"}}}')
 
+    def test_to_json_matches_to_simple(self):
+        serializer = Serializer()
+        data = {
+            'objects': self.another_obj_list,
+            'meta': {'limit': 20, 'when': datetime.datetime(2010, 12, 16, 2, 31, 33), 'cost': Decimal('1.50')},
+        }
+        expected = json.dumps(serializer.to_simple(data, {}), sort_keys=True, ensure_ascii=False)
+        self.assertEqual(serializer.to_json(data), expected)
+
+    def test_to_json_custom_to_simple(self):
+        class ShoutingSerializer(Serializer):
+            def to_simple(self, data, options):
+                simple = super(ShoutingSerializer, self).to_simple(data, options)
+
+                if isinstance(simple, six.string_types):
+                    return simple.upper()
+
+                return simple
+
+        serializer = ShoutingSerializer()
+        self.assertTrue('"title": "FIRST POST!"' in serializer.to_json(self.obj_list[0]))
+
+    def test_to_json_options(self):
+        class UnsortedSerializer(Serializer):
+            json_sort_keys = False
+
+        data = OrderedDict([('b', 1), ('a', 2)])
+        self.assertEqual(Serializer().to_json(data), '{"a": 2, "b": 1}')
+        self.assertEqual(UnsortedSerializer().to_json(data), '{"b": 1, "a": 2}')
+        self.assertEqual(u''.join(UnsortedSerializer().to_json_iter(data)), '{"b": 1, "a": 2}')
+
+        calls = []
+
+        class FakeJSON(object):
+            def dumps(self, data, **kwargs):
+                calls.append(kwargs)
+                return json.dumps(data, **kwargs)
+
+        class PluggableSerializer(Serializer):
+            json_module = FakeJSON()
+
+        self.assertEqual(PluggableSerializer().to_json(self.obj_list[0]), Serializer().to_json(self.obj_list[0]))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(calls[0]['sort_keys'])
+
 
 class StubbedSerializer(Serializer):
     def __init__(self, *args, **kwargs):
@@ -1,11 +1,14 @@
 import time
 
+import mock
+
 from django.core.cache import cache
+from django.db import DatabaseError
 from django.test import TestCase
 from django.utils.encoding import force_text
 
 from tastypie.models import ApiAccess
-from tastypie.throttle import BaseThrottle, CacheThrottle, CacheDBThrottle
+from tastypie.throttle import BaseThrottle, CacheThrottle, CacheBucketThrottle, TokenBucketThrottle, ApiAccessBuffer, CacheDBThrottle
 
 
 class NoThrottleTestCase(TestCase):
@@ -78,6 +81,161 @@ class CacheThrottleTestCase(TestCase):
         self.assertEqual(len(cache.get('daniel_accesses')), 0)
 
 
+class CacheBucketThrottleTestCase(TestCase):
+    def setUp(self):
+        super(CacheBucketThrottleTestCase, self).setUp()
+        cache.clear()
+        # The start of a timeframe.
+        self.start = (int(time.time()) // 60 + 1) * 60
+
+    def tearDown(self):
+        cache.clear()
+        super(CacheBucketThrottleTestCase, self).tearDown()
+
+    def access(self, throttle, identifier, times, now):
+        with mock.patch('tastypie.throttle.time.time', return_value=now):
+            for i in range(times):
+                throttle.accessed(identifier)
+
+    def is_throttled(self, throttle, identifier, now):
+        with mock.patch('tastypie.throttle.time.time', return_value=now):
+            return throttle.should_be_throttled(identifier)
+
+    def test_fixed_window(self):
+        throttle = CacheBucketThrottle(throttle_at=3, timeframe=60, sliding=False)
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start), False)
+
+        self.access(throttle, 'daniel', 2, self.start + 1)
+        self.access(throttle, 'cody', 1, self.start + 1)
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 2), False)
+        self.assertEqual(cache.get(throttle.get_bucket_key('daniel', self.start // 60)), 2)
+
+        # THROTTLE'D!
+        self.access(throttle, 'daniel', 1, self.start + 2)
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 3), True)
+        self.assertEqual(self.is_throttled(throttle, 'cody', self.start + 3), False)
+
+        # A new timeframe starts from scratch.
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 60), False)
+
+    def test_sliding_window(self):
+        throttle = CacheBucketThrottle(throttle_at=10, timeframe=60)
+        self.access(throttle, 'daniel', 10, self.start + 30)
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 59), True)
+
+        # A quarter of the way into the next timeframe, three quarters of the
+        # previous one still counts.
+        with mock.patch('tastypie.throttle.time.time', return_value=self.start + 75):
+            self.assertEqual(throttle.get_access_count('daniel'), 7.5)
+
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 75), False)
+        self.access(throttle, 'daniel', 3, self.start + 75)
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 75), True)
+
+        # Two timeframes later, it's all gone.
+        self.assertEqual(self.is_throttled(throttle, 'daniel', self.start + 180), False)
+
+    def test_accessed_counts_atomically(self):
+        throttle = CacheBucketThrottle(throttle_at=10, timeframe=60)
+        key = throttle.get_bucket_key('daniel', self.start // 60)
+
+        # Another process created the counter between our ``incr`` & ``add``.
+        with mock.patch('tastypie.throttle.cache') as mocked_cache:
+            mocked_cache.incr.side_effect = [ValueError, 2]
+            mocked_cache.add.return_value = False
+            self.access(throttle, 'daniel', 1, self.start)
+
+        self.assertEqual(mocked_cache.incr.call_count, 2)
+        mocked_cache.add.assert_called_once_with(key, 1, 120)
+
+
+class TokenBucketThrottleTestCase(TestCase):
+    def setUp(self):
+        super(TokenBucketThrottleTestCase, self).setUp()
+        cache.clear()
+        self.start = (int(time.time()) // 60 + 1) * 60
+
+    def tearDown(self):
+        cache.clear()
+        super(TokenBucketThrottleTestCase, self).tearDown()
+
+    def hit(self, throttle, identifier, now, times=1):
+        throttled = []
+
+        with mock.patch('tastypie.throttle.time.time', return_value=now):
+            for i in range(times):
+                throttled.append(throttle.should_be_throttled(identifier))
+
+                if not throttled[-1]:
+                    throttle.accessed(identifier)
+
+        return throttled
+
+    def global_count(self, throttle, identifier, now):
+        return cache.get(throttle.get_bucket_key(identifier, int(now // 60)))
+
+    def test_batches_cache_writes(self):
+        throttle = TokenBucketThrottle(throttle_at=100, timeframe=60, sync_every=5, sync_interval=10)
+        self.assertEqual(self.hit(throttle, 'daniel', self.start, times=5), [False] * 5)
+        # Nothing reported yet.
+        self.assertEqual(self.global_count(throttle, 'daniel', self.start), None)
+
+        with mock.patch('tastypie.throttle.cache', wraps=cache) as mocked_cache:
+            self.hit(throttle, 'daniel', self.start, times=4)
+            # The fifth pending access triggered a sync, the rest were local.
+            self.assertEqual(mocked_cache.incr.call_count, 1)
+            self.assertEqual(mocked_cache.get_many.call_count, 1)
+
+        self.assertEqual(self.global_count(throttle, 'daniel', self.start), 5)
+
+        # Enough time passing also causes a sync.
+        self.hit(throttle, 'daniel', self.start + 10)
+        self.assertEqual(self.global_count(throttle, 'daniel', self.start), 9)
+
+    def test_enforces_global_limit(self):
+        throttle_1 = TokenBucketThrottle(throttle_at=20, timeframe=60, sync_every=5, error_bound=0.25)
+        throttle_2 = TokenBucketThrottle(throttle_at=20, timeframe=60, sync_every=5, error_bound=0.25)
+
+        self.assertEqual(self.hit(throttle_1, 'daniel', self.start, times=10), [False] * 10)
+        self.assertEqual(self.hit(throttle_2, 'daniel', self.start + 1, times=10), [False] * 10)
+
+        # The second process hasn't reported its last five yet, so the first
+        # lets one more through.
+        self.assertEqual(self.hit(throttle_1, 'daniel', self.start + 2), [False])
+        self.assertEqual(self.global_count(throttle_1, 'daniel', self.start), 15)
+
+        # Both are near the limit, so they check with the cache every time.
+        self.assertEqual(self.hit(throttle_2, 'daniel', self.start + 2), [True])
+        self.assertEqual(self.hit(throttle_1, 'daniel', self.start + 2), [True])
+        self.assertEqual(self.global_count(throttle_1, 'daniel', self.start), 21)
+
+        # Other users are unaffected.
+        self.assertEqual(self.hit(throttle_1, 'cody', self.start + 2), [False])
+
+    def test_refills(self):
+        throttle = TokenBucketThrottle(throttle_at=10, timeframe=60, sliding=False, sync_every=100, sync_interval=1000)
+        self.assertEqual(self.hit(throttle, 'daniel', self.start, times=11), [False] * 10 + [True])
+
+        # The next timeframe starts afresh.
+        self.assertEqual(self.hit(throttle, 'daniel', self.start + 60), [False])
+
+    def test_max_identifiers(self):
+        throttle = TokenBucketThrottle(throttle_at=10, timeframe=60, max_identifiers=2)
+        self.hit(throttle, 'daniel', self.start)
+        self.hit(throttle, 'cody', self.start)
+        throttle.sync('cody', now=self.start)
+        self.hit(throttle, 'jane', self.start)
+        # The least recently used goes first.
+        self.assertEqual(list(throttle._buckets.keys()), ['cody', 'jane'])
+        # ...but its pending accesses are still reported.
+        self.assertEqual(self.global_count(throttle, 'daniel', self.start), 1)
+
+        self.hit(throttle, 'cody', self.start)
+        self.hit(throttle, 'daniel', self.start)
+        self.assertEqual(list(throttle._buckets.keys()), ['cody', 'daniel'])
+        self.assertEqual(self.global_count(throttle, 'jane', self.start), 1)
+
+
 class CacheDBThrottleTestCase(TestCase):
     def tearDown(self):
         cache.delete('daniel_accesses')
@@ -133,6 +291,73 @@ class CacheDBThrottleTestCase(TestCase):
         self.assertEqual(ApiAccess.objects.count(), 7)
         self.assertEqual(ApiAccess.objects.filter(identifier='daniel').count(), 4)
 
+    # The in-memory test database isn't visible from other threads, so the
+    # writer thread is kept from starting & flushes happen here.
+    @mock.patch.object(ApiAccessBuffer, 'start')
+    def test_write_behind(self, mocked_start):
+        throttle_1 = CacheDBThrottle(throttle_at=2, timeframe=5, expiration=2, write_behind=True, flush_size=3)
+        buffer = throttle_1.access_buffer
+        self.assertTrue(isinstance(buffer, ApiAccessBuffer))
+        self.assertEqual(buffer.flush_size, 3)
+        self.assertEqual(buffer.flush_interval, 5.0)
+
+        with mock.patch('tastypie.throttle.time.time', return_value=1000):
+            self.assertEqual(throttle_1.accessed('daniel', url='/api/v1/note/', request_method='GET'), None)
+            self.assertEqual(throttle_1.accessed('daniel'), None)
+
+        # The writes are held back.
+        self.assertEqual(ApiAccess.objects.count(), 0)
+        self.assertEqual(mocked_start.call_count, 2)
+        self.assertFalse(buffer._wakeup.is_set())
+
+        # Reaching ``flush_size`` wakes up the writer.
+        self.assertEqual(throttle_1.accessed('cody'), None)
+        self.assertTrue(buffer._wakeup.is_set())
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(ApiAccess.objects.count(), 3)
+        self.assertEqual(ApiAccess.objects.filter(identifier='daniel').count(), 2)
+        access = ApiAccess.objects.get(identifier='daniel', url='/api/v1/note/')
+        self.assertEqual(access.request_method, 'GET')
+        self.assertEqual(access.accessed, 1000)
+
+        # Nothing left to write.
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(ApiAccess.objects.count(), 3)
+
+    @mock.patch.object(ApiAccessBuffer, 'start')
+    def test_write_behind_failed_flush(self, mocked_start):
+        buffer = ApiAccessBuffer(max_pending=3)
+        buffer.add('daniel')
+        buffer.add('cody')
+
+        with mock.patch.object(ApiAccess.objects, 'bulk_create', side_effect=DatabaseError):
+            self.assertRaises(DatabaseError, buffer.flush)
+
+        self.assertEqual(ApiAccess.objects.count(), 0)
+        self.assertEqual([access.identifier for access in buffer._pending], ['daniel', 'cody'])
+
+        # Retried ahead of newer accesses, with the oldest dropped past
+        # ``max_pending``.
+        buffer.add('alice')
+        buffer.add('bob')
+        self.assertEqual([access.identifier for access in buffer._pending], ['cody', 'alice', 'bob'])
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(sorted(ApiAccess.objects.values_list('identifier', flat=True)), ['alice', 'bob', 'cody'])
+
+    def test_write_behind_run(self):
+        buffer = ApiAccessBuffer(flush_interval=0)
+        buffer._pending.append(ApiAccess(identifier='daniel', accessed=0))
+
+        # Stop the loop after a single pass.
+        with mock.patch.object(buffer, 'flush', side_effect=[1, SystemExit]) as mocked_flush:
+            with mock.patch('tastypie.throttle.connection') as mocked_connection:
+                self.assertRaises(SystemExit, buffer.run)
+
+        self.assertEqual(mocked_flush.call_count, 2)
+        self.assertEqual(mocked_connection.close.call_count, 2)
+
 
 class ModelTestCase(TestCase):
     def test_unicode(self):
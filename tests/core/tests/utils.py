@@ -6,7 +6,8 @@ from django.test import TestCase
 
 from tastypie.exceptions import BadRequest
 from tastypie.serializers import Serializer
-from tastypie.utils.mime import determine_format, build_content_type
+from tastypie.utils import mime
+from tastypie.utils.mime import best_match, determine_format, build_content_type
 from tastypie.utils.timezone import now
 
 try:
@@ -100,6 +101,36 @@ class MimeTestCase(TestCase):
         request.META = {'HTTP_ACCEPT': 'bogon'}
         self.assertRaises(BadRequest, determine_format, request, serializer)
 
+    def test_best_match_cache(self):
+        formats = ['application/json', 'application/xml']
+        header = 'text/plain,application/xml,application/json;q=0.9,*/*;q=0.8'
+
+        with mock.patch('tastypie.utils.mime.mimeparse.best_match', return_value='application/xml') as mocked:
+            self.assertEqual(best_match(formats, header), 'application/xml')
+            self.assertEqual(best_match(formats, header), 'application/xml')
+            self.assertEqual(mocked.call_count, 1)
+            # Reversed, because mimeparse prefers the last match.
+            self.assertEqual(mocked.call_args[0], (['application/xml', 'application/json'], header))
+
+            # Different formats are matched separately.
+            best_match(['application/json'], header)
+            self.assertEqual(mocked.call_count, 2)
+
+        # Bad headers aren't cached.
+        self.assertRaises(ValueError, best_match, formats, 'bogon')
+        self.assertFalse((tuple(formats), 'bogon') in mime._best_match_cache)
+
+        # The cache is bounded, dropping the least recently used first.
+        with mock.patch.object(mime, 'BEST_MATCH_CACHE_SIZE', 2):
+            best_match(formats, 'application/json')
+            best_match(formats, 'application/xml')
+            best_match(formats, 'application/json')
+            best_match(formats, 'text/yaml')
+            self.assertEqual(list(mime._best_match_cache.keys()), [
+                (tuple(formats), 'application/json'),
+                (tuple(formats), 'text/yaml'),
+            ])
+
 
 if TZ_AVAILABLE:
     from pytz.reference import Pacific
@@ -13,6 +13,8 @@ from related_resource.api.urls import api
 from related_resource.models import Category, Tag, Taggable, TaggableTag, ExtraData, Company, Person, Dog, DogHouse, Bone, Product, Address, Job, Payment
 from related_resource.models import Label
 from django.db.models.signals import pre_save
+from mock import patch
+from tastypie.resources import prefetch_related_objects
 from datetime import datetime, tzinfo, timedelta
 
 
@@ -634,3 +636,135 @@ class RelatedSaveCallsTest(TestCase):
         tag = Tag.objects.all()[0]
         taggable_tag = tag.taggabletags.all()[0]
         self.assertEqual(taggable_tag.extra, 1234)
+
+
+class RelatedLookupsTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def create_people(self, count):
+        for i in range(count):
+            address = Address.objects.create(line='%s Main Street' % i)
+            company = Company.objects.create(name='Company %s' % i, address=address)
+            Product.objects.create(name='Widget %s' % i, producer=company)
+            person = Person.objects.create(name='Person %s' % i, company=company)
+            house = DogHouse.objects.create(color='Red')
+            dog = Dog.objects.create(name='Dog %s' % i, owner=person, house=house)
+            Bone.objects.create(dog=dog, color='White')
+
+    def test_build_related_lookups(self):
+        pr = api.canonical_resource_for('person')
+        select_related, prefetch_related = pr.build_related_lookups(for_list=True)
+        self.assertEqual(sorted(select_related), ['company', 'company__address'])
+        self.assertEqual(sorted(prefetch_related), [
+            'company__products',
+            'company__products__producer',
+            'dogs',
+            'dogs__bones',
+            'dogs__bones__dog',
+            'dogs__house',
+            'dogs__owner',
+        ])
+
+        # Reverse one-to-one relations can be joined in.
+        tr = api.canonical_resource_for('tag')
+        select_related, prefetch_related = tr.build_related_lookups(for_list=True)
+        self.assertEqual(sorted(select_related), ['extradata', 'extradata__tag'])
+        self.assertEqual(sorted(prefetch_related), ['taggabletags'])
+
+        # Self-referential relations don't recurse.
+        cr = api.canonical_resource_for('category')
+        self.assertEqual(cr.build_related_lookups(for_list=True), (['parent'], []))
+
+    def test_build_related_lookups_meta_options(self):
+        class ManualPersonResource(PersonResource):
+            class Meta:
+                queryset = Person.objects.all()
+                resource_name = 'person'
+                auto_related_lookups = False
+                select_related = ['company']
+                prefetch_related = ['dogs']
+
+        pr = ManualPersonResource()
+        self.assertEqual(pr.build_related_lookups(for_list=True), (['company'], ['dogs']))
+
+    def test_get_list_queries(self):
+        pr = api.canonical_resource_for('person')
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+
+        self.create_people(1)
+
+        # One count, one joined query & one for each prefetched relation
+        # not already cached by an earlier lookup.
+        with self.assertNumQueries(6):
+            resp = pr.get_list(request)
+
+        self.create_people(4)
+
+        with self.assertNumQueries(6):
+            resp = pr.get_list(request)
+
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(len(data['objects']), 5)
+        self.assertEqual(data['objects'][0]['company']['address']['line'], '0 Main Street')
+        self.assertEqual(data['objects'][0]['company']['products'][0]['name'], 'Widget 0')
+        self.assertEqual(data['objects'][0]['dogs'][0]['house']['color'], 'Red')
+        self.assertEqual(data['objects'][0]['dogs'][0]['bones'][0]['color'], 'White')
+
+    def test_get_list_related_lookups_after_pagination(self):
+        class ListPersonResource(PersonResource):
+            class Meta:
+                queryset = Person.objects.all()
+                resource_name = 'person'
+                limit = 2
+
+            def obj_get_list(self, bundle, **kwargs):
+                return list(super(ListPersonResource, self).obj_get_list(bundle, **kwargs))
+
+        self.create_people(5)
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+
+        with patch('tastypie.resources.prefetch_related_objects', wraps=prefetch_related_objects) as mocked:
+            resp = ListPersonResource().get_list(request)
+
+        # Only the page being sent is prefetched.
+        self.assertEqual(len(mocked.call_args[0][0]), 2)
+        self.assertEqual(len(json.loads(resp.content.decode('utf-8'))['objects']), 2)
+
+    def test_get_detail_related_lookups_use_in(self):
+        class NoDogsPersonResource(PersonResource):
+            dogs = fields.ToManyField('related_resource.api.resources.DogResource', 'dogs', full=True, null=True, use_in=lambda bundle: False)
+
+            class Meta:
+                queryset = Person.objects.all()
+                resource_name = 'person'
+
+        self.create_people(1)
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+
+        with patch('tastypie.resources.prefetch_related_objects', wraps=prefetch_related_objects) as mocked:
+            resp = NoDogsPersonResource().get_detail(request, pk=Person.objects.get().pk)
+
+        lookups = mocked.call_args[0][1]
+        self.assertTrue('company' in lookups)
+        self.assertFalse([lookup for lookup in lookups if lookup.startswith('dogs')])
+        self.assertFalse('dogs' in json.loads(resp.content.decode('utf-8')))
+
+    def test_get_detail_queries(self):
+        pr = api.canonical_resource_for('person')
+        self.create_people(1)
+        person = Person.objects.get()
+        Dog.objects.create(name='Another Dog', owner=person, house=DogHouse.objects.create(color='Blue'))
+
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+
+        # The dogs' houses & bones are fetched once, not once per dog.
+        with self.assertNumQueries(7):
+            resp = pr.get_detail(request, pk=person.pk)
+
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(sorted([dog['house']['color'] for dog in data['dogs']]), ['Blue', 'Red'])